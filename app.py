@@ -12,6 +12,9 @@ from modules.session_state import initialize_session_state
 from modules.ui.ui_start_screen import render_main_screen
 from modules.ui.ui_interview import render_interview_ui
 from modules.logging_config import setup_logging
+from modules.transcript import start_idle_sweeper
+from modules.profiling import phase, profile_rerun, profiling_requested
+from modules import hot_reload, tracing
 
 
 def main() -> None:
@@ -27,14 +30,38 @@ def main() -> None:
     logger = logging.getLogger(__name__)
     logger.info("Starting Interview Practice App")
 
+    # Trim transcripts of idle sessions in the background (once per process)
+    start_idle_sweeper()
+
+    # Pick up edited prompt templates and prompt settings without a restart (if enabled)
+    hot_reload.start_watcher()
+
+    # Profile this rerun if requested (no-op otherwise); each rerun is a trace.
+    # The whole rerun, including its background calls, uses one version of the prompts.
+    session_id = st.session_state.get("session_id", "new")
+    with profile_rerun(session_id, profiling_requested(st.query_params.to_dict())), \
+            tracing.trace("rerun", session_id=session_id), hot_reload.pinned():
+        render_app(logger)
+
+
+def render_app(logger: logging.Logger) -> None:
+    """
+    Initialize session state and render the welcome screen or the interview.
+    """
     # Initialize Streamlit session state with defaults
-    initialize_session_state()
+    with phase("initialize_session_state"):
+        initialize_session_state()
+    # A new session gets its ID above, after its first rerun trace was opened
+    rerun_trace = tracing.current_span()
+    if rerun_trace is not None:
+        rerun_trace.session_id = st.session_state.get("session_id")
     logger.debug("Session state initialized with default values")
 
     # ------------------- Main Screen (Welcome) -------------------
     if not st.session_state.started:
         logger.info("Rendering welcome screen")
-        render_main_screen()
+        with phase("render_main_screen"), tracing.span("render_main_screen"):
+            render_main_screen()
         return
 
     # ------------------- Interview Mode -------------------
@@ -44,8 +71,8 @@ def main() -> None:
             f"question_type={st.session_state.get('question_type')}, "
             f"difficulty={st.session_state.get('difficulty')}"
         )
-        render_interview_ui()
-
+        with phase("render_interview_ui"), tracing.span("render_interview_ui"):
+            render_interview_ui()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,248 @@
+"""
+load_test.py
+
+Concurrent multi-session load test for the Streamlit app.
+
+Drives N simulated users through `app.py` with `streamlit.testing` AppTest
+(welcome screen, Start, several answer submissions, Finish) against the fake
+LLM backend with realistic latency, and reports rerun latency percentiles,
+peak RSS and per-session `st.session_state` size for each N.
+
+Each concurrency level runs in its own subprocess so peak RSS is measured per level.
+
+Usage:
+    python -m benchmarks.load_test --users 1,4,16 --turns 5 --latency-ms 800 --jitter-ms 250
+"""
+
+import argparse
+import json
+import os
+import pickle
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# How often a simulated user reruns the script while background jobs are pending.
+JOB_POLL_SECONDS = 0.05
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+ANSWER = (
+    "In my last role I owned the migration of our billing service. I split the work into "
+    "three phases, agreed checkpoints with finance and support, and we shipped a week early "
+    "with a thirty percent drop in billing tickets."
+)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the pct-th percentile (0-100) using linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def session_state_size(at) -> int:
+    """Return the pickled size in bytes of a simulated session's state."""
+    size = 0
+    for key, value in at.session_state.items():
+        try:
+            size += len(pickle.dumps((key, value)))
+        except Exception:
+            size += len(repr(value))
+    return size
+
+
+def share_apptest_globals() -> None:
+    """
+    Let concurrent AppTests share process-wide state.
+
+    For each run, AppTest installs a mock `Runtime` singleton and turns on the
+    `global.appTest` config option, then resets both when the run ends. That
+    breaks other sessions still running in the same process. Keep the option on
+    for the whole load test, and fall back to the most recently installed mock
+    runtime instead of failing.
+    """
+    from streamlit import config
+    from streamlit.runtime import Runtime
+
+    config.set_option("global.appTest", True)
+    last = {"instance": None}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last["instance"] = cls._instance
+            return cls._instance
+        if last["instance"] is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last["instance"]
+
+    def exists(cls) -> bool:
+        return cls._instance is not None or last["instance"] is not None
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+
+
+def simulate_user(user_id: int, turns: int, timeout: float, results: Dict[str, Any]) -> None:
+    """Drive one user through a full interview and collect rerun timings."""
+    from streamlit.testing.v1 import AppTest
+
+    timings: List[float] = []
+
+    def run(at) -> None:
+        started = time.perf_counter()
+        at.run(timeout=timeout)
+        timings.append((time.perf_counter() - started) * 1000)
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+    def settle(at, ready: Callable[[], bool] = lambda: False) -> None:
+        # LLM work runs as background jobs, and AppTest never runs the fragment
+        # that polls them: rerun until the session has no pending jobs (or `ready`)
+        deadline = time.monotonic() + timeout
+        while "jobs" in at.session_state and at.session_state["jobs"]:
+            if ready():
+                return
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Jobs still pending after {timeout:.0f} s")
+            time.sleep(JOB_POLL_SECONDS)
+            run(at)
+
+    def answer_box(at, i: int):
+        return next((t for t in at.text_area if t.key == f"answer_{i}"), None)
+
+    try:
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        run(at)
+
+        at.text_input[0].input(f"Software Engineer {user_id}")
+        at.button(key="main_start_button").click()
+        run(at)
+
+        for i in range(turns):
+            settle(at, lambda: answer_box(at, i) is not None)
+            box = answer_box(at, i)
+            if box is None:
+                raise RuntimeError(f"No answer box for question {i + 1}")
+            box.input(ANSWER)
+            run(at)
+            at.button(key=f"submit_{i}").click()
+            run(at)
+
+        settle(at)
+        next(b for b in at.button if b.label == "Finish Interview").click()
+        run(at)
+        settle(at)
+
+        with results["lock"]:
+            results["timings"].extend(timings)
+            results["state_sizes"].append(session_state_size(at))
+    except Exception as exc:
+        with results["lock"]:
+            results["timings"].extend(timings)
+            results["errors"].append(f"user {user_id}: {type(exc).__name__}: {exc}")
+
+
+def run_level(users: int, turns: int, timeout: float) -> Dict[str, Any]:
+    """Run one concurrency level in this process and return its metrics."""
+    results: Dict[str, Any] = {"lock": threading.Lock(), "timings": [], "state_sizes": [], "errors": []}
+    share_apptest_globals()
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=simulate_user, args=(i, turns, timeout, results), daemon=True)
+        for i in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    timings = results["timings"]
+    sizes = results["state_sizes"]
+    return {
+        "users": users,
+        "reruns": len(timings),
+        "wall_s": round(wall, 2),
+        "p50_ms": round(percentile(timings, 50), 1),
+        "p90_ms": round(percentile(timings, 90), 1),
+        "p99_ms": round(percentile(timings, 99), 1),
+        "max_ms": round(max(timings, default=0.0), 1),
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "state_kb_mean": round(statistics.mean(sizes) / 1024, 1) if sizes else 0.0,
+        "state_kb_max": round(max(sizes) / 1024, 1) if sizes else 0.0,
+        "errors": results["errors"],
+    }
+
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    """Format level results as a plain-text table."""
+    header = f"{'users':>6}{'reruns':>8}{'wall s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}{'RSS MB':>9}{'state KB':>10}{'errors':>8}"
+    lines = [header]
+    for r in rows:
+        lines.append(
+            f"{r['users']:>6}{r['reruns']:>8}{r['wall_s']:>9}{r['p50_ms']:>9}{r['p90_ms']:>9}"
+            f"{r['p99_ms']:>9}{r['max_ms']:>9}{r['peak_rss_mb']:>9}{r['state_kb_max']:>10}{len(r['errors']):>8}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point. Returns a non-zero exit code if any simulated user failed."""
+    parser = argparse.ArgumentParser(description="Concurrent AppTest load test")
+    parser.add_argument("--users", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--turns", type=int, default=3, help="Answers submitted per user")
+    parser.add_argument("--latency-ms", type=float, default=800, help="Fake LLM base latency")
+    parser.add_argument("--jitter-ms", type=float, default=250, help="Fake LLM latency jitter")
+    parser.add_argument("--ms-per-token", type=float, default=5, help="Fake LLM latency per output token")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-rerun timeout in seconds")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON results")
+    parser.add_argument("--level", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.level is not None:
+        print(json.dumps(run_level(args.level, args.turns, args.timeout)))
+        return 0
+
+    env = dict(
+        os.environ,
+        LLM_BACKEND="fake",
+        FAKE_LLM_LATENCY_MS=str(args.latency_ms),
+        FAKE_LLM_JITTER_MS=str(args.jitter_ms),
+        FAKE_LLM_MS_PER_TOKEN=str(args.ms_per_token),
+    )
+    rows = []
+    for users in (int(u) for u in args.users.split(",")):
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.load_test", "--level", str(users),
+             "--turns", str(args.turns), "--timeout", str(args.timeout)],
+            env=env, capture_output=True, text=True,
+            cwd=os.path.dirname(APP_PATH),
+        )
+        if completed.returncode != 0:
+            print(completed.stderr[-2000:], file=sys.stderr)
+            return 1
+        rows.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+        print(format_table(rows[-1:]) if len(rows) == 1 else format_table(rows[-1:]).splitlines()[1], flush=True)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+
+    failures = [error for row in rows for error in row["errors"]]
+    for error in failures:
+        print(f"ERROR {error}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
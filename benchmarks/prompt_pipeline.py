@@ -0,0 +1,288 @@
+"""
+prompt_pipeline.py
+
+Micro-benchmarks and prompt-size tracking for the prompt pipeline.
+
+Runs `render_template`, `build_prompt`, `parse_summary` and
+`parse_evaluation_response` over synthetic sessions of increasing length for
+every question technique in `prompts/questions/` and every persona in
+`PERSONA_MAP`, then compares timings and rendered prompt sizes against the
+stored baseline in `benchmarks/baseline.json`.
+
+Usage:
+    python -m benchmarks.prompt_pipeline                    # compare against baseline
+    python -m benchmarks.prompt_pipeline --update-baseline  # record a new baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from modules.config import (
+    BASE_PROMPTS,
+    ENABLE_RUBRIC_SCORES,
+    PERSONA_MAP,
+    PROMPTS_TEMPLATE_DIR,
+    SYSTEM_PROMPTS,
+    ACTIVE_SUMMARY_TECHNIQUE,
+)
+from modules.interview_logic import parse_evaluation_response, parse_summary
+from modules.rubric import rubric_prompt_dimensions
+from modules.utils import build_prompt, estimate_tokens, render_template
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+SESSION_LENGTHS = (1, 10, 50)
+
+# Relative growth that counts as a regression.
+SIZE_TOLERANCE = 0.10
+TIME_TOLERANCE = 0.50
+
+# Timings below this (in microseconds) are too noisy to compare.
+MIN_COMPARABLE_US = 20.0
+
+JOB_TITLE = "Senior Software Engineer"
+QUESTION_TYPE = "Behavioral"
+DIFFICULTY = "Medium"
+
+
+# ---------------------------------------------------------------------
+# Synthetic sessions
+# ---------------------------------------------------------------------
+def question_techniques() -> List[str]:
+    """Return every question technique template shipped in `prompts/questions/`."""
+    folder = os.path.join(PROMPTS_TEMPLATE_DIR, "questions")
+    return sorted(
+        name for name in os.listdir(folder)
+        if name.endswith(".j2") and name != BASE_PROMPTS["question"]
+    )
+
+
+def synthetic_session(turns: int) -> Tuple[List[str], List[str]]:
+    """
+    Build a deterministic transcript with realistic question and answer lengths.
+
+    Args:
+        turns: Number of answered questions.
+
+    Returns:
+        (questions, answers)
+    """
+    questions = [
+        f"Question {i + 1}: Describe a time you had to balance competing priorities "
+        f"across several teams while delivering project number {i + 1} on a tight deadline."
+        for i in range(turns)
+    ]
+    answers = [
+        f"In project {i + 1} I coordinated three teams. I set up a shared backlog, agreed on "
+        "weekly checkpoints with each lead, and escalated one dependency early. We shipped two "
+        "days ahead of schedule and cut follow-up defects by about thirty percent compared to "
+        "the previous release, which the client called out in the quarterly review."
+        for i in range(turns)
+    ]
+    return questions, answers
+
+
+def _question_prompt(technique: str, questions: List[str], answers: List[str]) -> str:
+    return build_prompt(
+        category="questions",
+        base_instructions=BASE_PROMPTS["question"],
+        technique=technique,
+        job_title=JOB_TITLE,
+        question_type=QUESTION_TYPE,
+        difficulty=DIFFICULTY,
+        previous_answers=answers,
+        previous_questions=questions,
+    )
+
+
+def _evaluation_prompt(persona_template: str, questions: List[str], answers: List[str]) -> str:
+    index = len(answers) - 1
+    return build_prompt(
+        category="evaluation",
+        base_instructions=BASE_PROMPTS["evaluation"],
+        technique=persona_template,
+        job_title=JOB_TITLE,
+        question=questions[index],
+        answer=answers[index],
+        max_tokens_eval=250,
+        rubric_dimensions=rubric_prompt_dimensions() if ENABLE_RUBRIC_SCORES else {},
+        previous_answers=answers[: index + 1],
+        previous_questions=questions,
+        difficulty=DIFFICULTY,
+        question_type=QUESTION_TYPE,
+    )
+
+
+def _summary_prompt(questions: List[str], answers: List[str]) -> str:
+    return build_prompt(
+        category="summary",
+        base_instructions=BASE_PROMPTS["summary"],
+        technique=ACTIVE_SUMMARY_TECHNIQUE,
+        questions_and_answers=list(zip(questions, answers)),
+    )
+
+
+def build_cases() -> Dict[str, Tuple[Callable[[], Any], Optional[Callable[[], str]]]]:
+    """
+    Assemble all benchmark cases.
+
+    Returns:
+        Dict mapping case name -> (callable to time, callable returning the prompt to measure or None)
+    """
+    cases: Dict[str, Tuple[Callable[[], Any], Optional[Callable[[], str]]]] = {}
+
+    for key, template in SYSTEM_PROMPTS.items():
+        fn = (lambda t=template: render_template(t))
+        cases[f"render_template/system/{key}"] = (fn, fn)
+
+    for turns in SESSION_LENGTHS:
+        questions, answers = synthetic_session(turns)
+
+        for technique in question_techniques():
+            fn = (lambda t=technique, q=questions, a=answers: _question_prompt(t, q, a))
+            cases[f"build_prompt/questions/{technique}/turns={turns}"] = (fn, fn)
+
+        for persona, template in PERSONA_MAP.items():
+            fn = (lambda t=template, q=questions, a=answers: _evaluation_prompt(t, q, a))
+            cases[f"build_prompt/evaluation/{persona}/turns={turns}"] = (fn, fn)
+
+        fn = (lambda q=questions, a=answers: _summary_prompt(q, a))
+        cases[f"build_prompt/summary/turns={turns}"] = (fn, fn)
+
+        summary_json = json.dumps({"summary": " ".join(answers)[:2000], "recommendations": questions[:5]})
+        cases[f"parse_summary/turns={turns}"] = ((lambda s=summary_json: parse_summary(s)), None)
+
+    evaluation_json = json.dumps({"feedback": synthetic_session(1)[1][0] * 3, "next_question": "Next?"})
+    cases["parse_evaluation_response"] = ((lambda: parse_evaluation_response(evaluation_json)), None)
+
+    return cases
+
+
+# ---------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------
+def time_call(fn: Callable[[], Any], repeat: int = 7, min_seconds: float = 0.02) -> float:
+    """
+    Time a callable and return the median per-call duration in microseconds.
+
+    Each of `repeat` samples loops the callable until at least `min_seconds` have elapsed.
+    """
+    fn()  # warm template caches
+    samples = []
+    for _ in range(repeat):
+        loops = 0
+        started = time.perf_counter()
+        while True:
+            fn()
+            loops += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_seconds:
+                break
+        samples.append(elapsed / loops * 1_000_000)
+    return statistics.median(samples)
+
+
+def measure_sizes() -> Dict[str, Dict[str, int]]:
+    """Return rendered prompt sizes (characters and estimated tokens) for every prompt case."""
+    sizes = {}
+    for name, (_, prompt_fn) in build_cases().items():
+        if prompt_fn is None:
+            continue
+        text = prompt_fn()
+        sizes[name] = {"chars": len(text), "tokens": estimate_tokens(text)}
+    return sizes
+
+
+def run_benchmarks(repeat: int = 7) -> Dict[str, Any]:
+    """Measure timings and prompt sizes for all cases."""
+    timings = {name: round(time_call(fn, repeat=repeat), 2) for name, (fn, _) in build_cases().items()}
+    return {"timings_us": timings, "sizes": measure_sizes()}
+
+
+# ---------------------------------------------------------------------
+# Baseline comparison
+# ---------------------------------------------------------------------
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, Any]:
+    """Load the stored baseline, or an empty one if none was recorded yet."""
+    if not os.path.exists(path):
+        return {"timings_us": {}, "sizes": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    size_tolerance: float = SIZE_TOLERANCE,
+    time_tolerance: float = TIME_TOLERANCE,
+) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    Returns:
+        List[str]: One human-readable line per regression.
+    """
+    regressions = []
+
+    for name, size in current.get("sizes", {}).items():
+        old = baseline.get("sizes", {}).get(name)
+        if old and size["tokens"] > old["tokens"] * (1 + size_tolerance):
+            growth = size["tokens"] / old["tokens"] - 1
+            regressions.append(
+                f"SIZE  {name}: ~{old['tokens']} -> ~{size['tokens']} tokens (+{growth:.0%})"
+            )
+
+    for name, us in current.get("timings_us", {}).items():
+        old = baseline.get("timings_us", {}).get(name)
+        if old and max(us, old) >= MIN_COMPARABLE_US and us > old * (1 + time_tolerance):
+            regressions.append(f"TIME  {name}: {old:.1f}us -> {us:.1f}us (+{us / old - 1:.0%})")
+
+    return regressions
+
+
+def format_results(results: Dict[str, Any]) -> str:
+    """Format benchmark results as a plain-text table."""
+    lines = [f"{'case':<70}{'median us':>12}{'chars':>9}{'~tokens':>9}"]
+    for name, us in results["timings_us"].items():
+        size = results["sizes"].get(name, {})
+        lines.append(f"{name[:69]:<70}{us:>12.1f}{size.get('chars', ''):>9}{size.get('tokens', ''):>9}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point. Returns a non-zero exit code on regressions."""
+    parser = argparse.ArgumentParser(description="Prompt pipeline micro-benchmarks")
+    parser.add_argument("--update-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file path")
+    parser.add_argument("--repeat", type=int, default=7, help="Timing samples per case")
+    parser.add_argument("--size-tolerance", type=float, default=SIZE_TOLERANCE)
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(repeat=args.repeat)
+    print(format_results(results))
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, load_baseline(args.baseline), args.size_tolerance, args.time_tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against baseline:")
+        print("\n".join(regressions))
+        return 1
+
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
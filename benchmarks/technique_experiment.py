@@ -0,0 +1,259 @@
+"""
+technique_experiment.py
+
+Side-by-side comparison of the question techniques.
+
+Runs a matrix of techniques x job titles x question types x difficulties
+through the same prompt path as `generate_next_question`, generating a short
+question sequence per cell (each question sees the earlier questions and a
+stand-in answer, as in a real interview). Cells run in parallel with bounded
+concurrency. For each cell it reports latency, input/output tokens and cost from
+the usage records of its calls, plus local diversity metrics of the generated
+sequence, and then summarizes them per technique.
+
+Runs against the offline fake backend by default (prompt size and token cost
+only; its questions are canned) or against a real backend with `--backend openai`.
+
+Usage:
+    python -m benchmarks.technique_experiment
+    python -m benchmarks.technique_experiment --backend openai --questions 5 --workers 4 --output logs/techniques.json
+"""
+
+import argparse
+import itertools
+import json
+import re
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import streamlit as st
+
+from benchmarks.prompt_pipeline import question_techniques
+from modules import ledger
+from modules.interview_logic import generate_question
+from modules.llm_backends import FakeBackend, available_backends, create_backend, set_backend
+
+JOB_TITLES = ("Software Engineer", "Data Analyst", "Product Manager")
+QUESTION_TYPES = ("Behavioral", "Technical")
+DIFFICULTIES = ("Medium",)
+
+# Stand-in answers fed back as `previous_answers`, cycled per turn.
+ANSWERS = (
+    "In my last role I owned the migration of our billing service. I split the work into three "
+    "phases, agreed checkpoints with finance and support, and we shipped a week early.",
+    "I would start by clarifying the requirements with the stakeholders, then sketch two options, "
+    "compare their trade-offs on cost and risk, and validate the choice with a small prototype.",
+    "When two teammates disagreed on an approach, I set up a short session to list the facts, we "
+    "agreed on a measurable test, and the data settled it within a week.",
+)
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+# Words too common in interview questions to say anything about diversity.
+STOPWORDS = frozenset("""
+a about an and are as at be can could describe did do does for from give have how i in is it me of
+on or tell that the this to was what when where which who why with would you your
+""".split())
+
+
+# ---------------------------------------------------------------------
+# Diversity metrics
+# ---------------------------------------------------------------------
+def _content_words(text: str) -> set:
+    return {word for word in _WORD.findall(text.lower()) if word not in STOPWORDS}
+
+
+def jaccard(a: set, b: set) -> float:
+    """Jaccard similarity of two word sets (0 for two empty sets)."""
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def diversity_metrics(questions: Sequence[str]) -> Dict[str, float]:
+    """
+    Local diversity metrics of a generated question sequence.
+
+    Returns:
+        Dict with:
+            distinct_2: Unique word bigrams / total bigrams across the sequence (higher is more varied).
+            mean_similarity / max_similarity: Pairwise Jaccard similarity of content words (lower is more varied).
+            repeats: Questions identical to an earlier one after normalization.
+            mean_words: Average question length in words.
+    """
+    tokens = [_WORD.findall(question.lower()) for question in questions]
+    bigrams = [tuple(words[i:i + 2]) for words in tokens for i in range(len(words) - 1)]
+    distinct_2 = len(set(bigrams)) / len(bigrams) if bigrams else 0.0
+
+    word_sets = [_content_words(question) for question in questions]
+    similarities = [jaccard(a, b) for a, b in itertools.combinations(word_sets, 2)]
+
+    seen = set()
+    repeats = 0
+    for words in tokens:
+        key = " ".join(words)
+        repeats += key in seen
+        seen.add(key)
+
+    return {
+        "distinct_2": round(distinct_2, 3),
+        "mean_similarity": round(statistics.mean(similarities), 3) if similarities else 0.0,
+        "max_similarity": round(max(similarities), 3) if similarities else 0.0,
+        "repeats": repeats,
+        "mean_words": round(statistics.mean(len(words) for words in tokens), 1) if tokens else 0.0,
+    }
+
+
+# ---------------------------------------------------------------------
+# Experiment
+# ---------------------------------------------------------------------
+def run_cell(technique: str, job_title: str, question_type: str, difficulty: str, questions: int) -> Dict[str, Any]:
+    """Generate a question sequence for one matrix cell and measure it."""
+    generated: List[str] = []
+    latencies: List[float] = []
+    with ledger.collect_usage() as records:
+        for turn in range(questions):
+            started = time.perf_counter()
+            generated.append(generate_question(
+                job_title,
+                question_type,
+                difficulty,
+                previous_questions=list(generated),
+                previous_answers=[ANSWERS[i % len(ANSWERS)] for i in range(turn)],
+                technique=technique,
+            ))
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    calls = len(records) or 1
+    return {
+        "technique": technique,
+        "job_title": job_title,
+        "question_type": question_type,
+        "difficulty": difficulty,
+        "questions": generated,
+        "calls": len(records),
+        "ms_mean": round(statistics.mean(latencies), 1),
+        "ms_max": round(max(latencies), 1),
+        "in_tokens": sum(r["in"] for r in records),
+        "out_tokens": sum(r["out"] for r in records),
+        "in_per_call": round(sum(r["in"] for r in records) / calls, 1),
+        "out_per_call": round(sum(r["out"] for r in records) / calls, 1),
+        "cost": round(sum(r["cost"] for r in records), 6),
+        **diversity_metrics(generated),
+    }
+
+
+def run_experiment(
+    techniques: Sequence[str],
+    job_titles: Sequence[str] = JOB_TITLES,
+    question_types: Sequence[str] = QUESTION_TYPES,
+    difficulties: Sequence[str] = DIFFICULTIES,
+    questions: int = 3,
+    workers: int = 4,
+) -> List[Dict[str, Any]]:
+    """
+    Run every cell of the matrix with at most `workers` cells in flight.
+
+    Returns:
+        List of per-cell results, in matrix order.
+    """
+    cells = list(itertools.product(techniques, job_titles, question_types, difficulties))
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="experiment") as pool:
+        futures = [pool.submit(run_cell, *cell, questions) for cell in cells]
+        return [future.result() for future in futures]
+
+
+def summarize(cells: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Average the cell results per technique, cheapest input first."""
+    by_technique: Dict[str, List[Dict[str, Any]]] = {}
+    for cell in cells:
+        by_technique.setdefault(cell["technique"], []).append(cell)
+
+    rows = []
+    for technique, group in by_technique.items():
+        def mean(field: str) -> float:
+            return statistics.mean(cell[field] for cell in group)
+
+        rows.append({
+            "technique": technique,
+            "cells": len(group),
+            "ms_mean": round(mean("ms_mean"), 1),
+            "in_per_call": round(mean("in_per_call"), 1),
+            "out_per_call": round(mean("out_per_call"), 1),
+            "cost_per_cell": round(mean("cost"), 6),
+            "distinct_2": round(mean("distinct_2"), 3),
+            "mean_similarity": round(mean("mean_similarity"), 3),
+            "repeats": sum(cell["repeats"] for cell in group),
+        })
+    return sorted(rows, key=lambda row: row["in_per_call"])
+
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    """Format the per-technique summary as a plain-text table."""
+    header = (
+        f"{'technique':<28}{'cells':>6}{'ms/q':>9}{'in/q':>8}{'out/q':>7}"
+        f"{'$/cell':>11}{'dist-2':>8}{'sim':>7}{'repeats':>9}"
+    )
+    lines = [header]
+    for r in rows:
+        lines.append(
+            f"{r['technique']:<28}{r['cells']:>6}{r['ms_mean']:>9}{r['in_per_call']:>8}{r['out_per_call']:>7}"
+            f"{r['cost_per_cell']:>11.6f}{r['distinct_2']:>8}{r['mean_similarity']:>7}{r['repeats']:>9}"
+        )
+    return "\n".join(lines)
+
+
+def _csv(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Compare question techniques side by side")
+    parser.add_argument("--techniques", type=_csv, default=None, help="Comma-separated templates (default: all)")
+    parser.add_argument("--job-titles", type=_csv, default=list(JOB_TITLES))
+    parser.add_argument("--question-types", type=_csv, default=list(QUESTION_TYPES))
+    parser.add_argument("--difficulties", type=_csv, default=list(DIFFICULTIES))
+    parser.add_argument("--questions", type=int, default=3, help="Questions generated per cell")
+    parser.add_argument("--workers", type=int, default=4, help="Cells run in parallel")
+    parser.add_argument("--backend", choices=available_backends(), default="fake")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Fake backend base latency")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--temperature", type=float, default=0.7)
+    parser.add_argument("--output", help="Write per-cell results (including the questions) to this JSON file")
+    args = parser.parse_args(argv)
+
+    techniques = args.techniques or question_techniques()
+    unknown = set(techniques) - set(question_techniques())
+    if unknown:
+        parser.error(f"Unknown technique(s): {', '.join(sorted(unknown))}")
+
+    if args.backend == "fake":
+        set_backend(FakeBackend(latency_ms=args.latency_ms, seed=0))
+    else:
+        set_backend(create_backend(args.backend))
+    st.session_state["model"] = args.model
+    st.session_state["temperature"] = args.temperature
+    st.session_state["session_id"] = f"experiment-{uuid.uuid4().hex[:6]}"
+
+    started = time.perf_counter()
+    cells = run_experiment(
+        techniques, args.job_titles, args.question_types, args.difficulties, args.questions, args.workers
+    )
+    wall = time.perf_counter() - started
+
+    print(format_table(summarize(cells)))
+    print(f"\n{len(cells)} cells x {args.questions} questions on '{args.backend}' in {wall:.1f} s")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(cells, f, indent=2, ensure_ascii=False)
+        print(f"Per-cell results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+answer_screening.py
+
+Local pre-screening of interview answers.
+
+Catches the low-effort answers that the evaluation prompt would only sort into
+a category and answer with canned text (too short, nonsensical or joke,
+repeated), so they get the same feedback immediately and without an API call.
+Only clear-cut cases are screened: a near-empty answer, repetitive noise or an
+exact repeat. Anything borderline, such as an answer in another language or a
+dense list of technical terms, goes to the model.
+"""
+
+import logging
+import math
+import re
+from collections import Counter
+from typing import List, Optional
+
+from modules.config import ANSWER_MIN_WORDS
+
+logger = logging.getLogger(__name__)
+
+# Character entropy (bits per character) below which text is repetitive noise
+# such as "hahahaha" or "no no no no"; prose in any alphabet is around 4.
+MIN_CHAR_ENTROPY = 2.5
+
+# Shorter answers are not judged by entropy, which is naturally low for a few characters.
+MIN_ENTROPY_CHARS = 20
+
+# Consecutive low-effort answers (including this one) that trigger the pattern note.
+PATTERN_THRESHOLD = 3
+
+# Words in any script (accented and non-Latin letters included)
+_WORD = re.compile(r"\w+")
+
+CANNED_FEEDBACK = {
+    "too_short": (
+        "Your answer is too brief. Please elaborate with specific examples, context, "
+        "and details relevant to '{question}'."
+    ),
+    "nonsensical": (
+        "This answer does not demonstrate interview readiness. Please provide a serious, "
+        "professional response that addresses the question '{question}'."
+    ),
+    "repeated": (
+        "You already gave this answer to an earlier question. Please answer '{question}' "
+        "on its own terms, with an example that fits it."
+    ),
+}
+
+PATTERN_NOTE = "I notice a pattern of minimal effort. Serious practice requires thoughtful responses."
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def char_entropy(text: str) -> float:
+    """Return the Shannon entropy of the non-space characters in bits per character."""
+    chars = [c for c in text.lower() if not c.isspace()]
+    if not chars:
+        return 0.0
+    total = len(chars)
+    return -sum(n / total * math.log2(n / total) for n in Counter(chars).values())
+
+
+def classify_answer(answer: str, previous_answers: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Classify an answer that needs no LLM evaluation.
+
+    Args:
+        answer: The candidate's answer.
+        previous_answers: Earlier answers in this interview.
+
+    Returns:
+        Optional[str]: "too_short", "nonsensical" or "repeated", or None if the
+        answer should be evaluated by the model.
+    """
+    words = _WORD.findall(answer)
+    if len(words) < ANSWER_MIN_WORDS:
+        return "too_short"
+    if len("".join(answer.split())) >= MIN_ENTROPY_CHARS and char_entropy(answer) < MIN_CHAR_ENTROPY:
+        return "nonsensical"
+
+    normalized = _normalize(answer)
+    if any(_normalize(previous) == normalized for previous in previous_answers or []):
+        return "repeated"
+    return None
+
+
+def screen_answer(answer: str, question: str, previous_answers: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Return canned feedback for a low-effort answer, or None if it needs a real evaluation.
+
+    When this answer and the ones right before it were all low-effort, the
+    feedback also calls out the pattern.
+
+    Args:
+        answer: The candidate's answer.
+        question: The question being answered.
+        previous_answers: Earlier answers in this interview, oldest first.
+
+    Returns:
+        Optional[str]: Feedback text, or None.
+    """
+    previous_answers = previous_answers or []
+    category = classify_answer(answer, previous_answers)
+    if category is None:
+        return None
+
+    feedback = CANNED_FEEDBACK[category].format(question=question)
+
+    streak = 1
+    for index in range(len(previous_answers) - 1, -1, -1):
+        if classify_answer(previous_answers[index], previous_answers[:index]) is None:
+            break
+        streak += 1
+    if streak >= PATTERN_THRESHOLD:
+        feedback = f"{feedback} {PATTERN_NOTE}"
+
+    logger.info("Answer screened locally as %s (streak %s)", category, streak)
+    return feedback
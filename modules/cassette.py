@@ -0,0 +1,402 @@
+"""
+cassette.py
+
+Record-and-replay of LLM traffic.
+
+When `RECORD_LLM_TRAFFIC=True`, every request made by `_call_openai`
+(instructions, input, model, schema) and its response (text, usage, latency,
+or the error raised) is appended to a per-session cassette file in
+`CASSETTE_DIR`. Large, repeated system instructions are stored once per
+cassette and referenced by hash.
+
+A cassette can then be replayed without network access: `ReplayBackend`
+serves the recorded responses, indexed by request hash, with the original or
+scaled timing, and `replay_session` drives `interview_logic` through the same
+sequence of user actions.
+
+Usage:
+    python -m modules.cassette list
+    python -m modules.cassette replay logs/cassettes/<session_id>.jsonl --scale 0.5
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+from modules.config import RECORD_LLM_TRAFFIC, CASSETTE_DIR
+from modules.errors import LLMError
+from modules.llm_backends import LLMBackend, LLMResponse
+from modules import response_cache
+
+logger = logging.getLogger(__name__)
+
+# Session-state fields snapshotted with every call so a replay can restore them.
+CONTEXT_FIELDS = (
+    "job_title",
+    "question_type",
+    "difficulty",
+    "evaluation_style",
+    "fanout_personas",
+    "model",
+    "temperature",
+    "max_tokens_eval",
+    "max_tokens_question_and_summary",
+)
+
+_pending = threading.local()
+_write_lock = threading.Lock()
+_known_blobs: Dict[str, set] = defaultdict(set)
+
+
+def request_key(request_kwargs: Dict[str, Any]) -> str:
+    """
+    Return a stable hash identifying a request by everything that affects the response.
+
+    The output cap is left out: adaptive caps (modules/token_limits.py) vary
+    between otherwise identical requests, and only a response that completed
+    within its cap is cached.
+    """
+    material = {
+        key: request_kwargs.get(key)
+        for key in ("model", "instructions", "input", "temperature", "text")
+    }
+    # Chained turns depend on the conversation they continue
+    if request_kwargs.get("previous_response_id"):
+        material["previous_response_id"] = request_kwargs["previous_response_id"]
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()[:24]
+
+
+def cassette_path(session_id: str) -> str:
+    """Return the cassette file path for a session."""
+    return os.path.join(CASSETTE_DIR, f"{session_id}.jsonl")
+
+
+# ---------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------
+def note_input(name: str, value: Any) -> None:
+    """
+    Remember a user input (e.g. the answer being evaluated) for the next recorded call
+    in this thread, so a replay can repeat the same action.
+    """
+    if not RECORD_LLM_TRAFFIC:
+        return
+    inputs = getattr(_pending, "inputs", None)
+    if inputs is None:
+        inputs = _pending.inputs = {}
+    inputs[name] = value
+
+
+def record_exchange(
+    session_id: Optional[str],
+    request_kwargs: Dict[str, Any],
+    response: Optional[LLMResponse],
+    latency_ms: float,
+    task: str,
+    context: Dict[str, Any],
+    error: Optional[BaseException] = None,
+) -> None:
+    """
+    Append one request/response exchange to the session's cassette.
+
+    Failed attempts are recorded with their error so retries replay faithfully.
+    Noted user inputs are attached to the first successful exchange after them.
+    """
+    if not RECORD_LLM_TRAFFIC:
+        return
+
+    inputs = getattr(_pending, "inputs", None) or {}
+    if error is None:
+        _pending.inputs = {}
+
+    session_id = session_id or "unknown"
+    path = cassette_path(session_id)
+
+    request = {k: v for k, v in request_kwargs.items() if k != "instructions"}
+    instructions = request_kwargs.get("instructions") or ""
+    instructions_hash = hashlib.sha256(instructions.encode("utf-8")).hexdigest()[:16]
+    request["instructions_ref"] = instructions_hash
+
+    entry: Dict[str, Any] = {
+        "type": "call",
+        "ts": round(time.time(), 3),
+        "key": request_key(request_kwargs),
+        "task": task,
+        "ctx": context,
+        "request": request,
+        "latency_ms": round(latency_ms, 1),
+    }
+    if error is None and response is not None:
+        entry["response"] = asdict(response)
+        if inputs:
+            entry["inputs"] = inputs
+    else:
+        entry["error"] = f"{type(error).__name__}: {error}"
+
+    try:
+        with _write_lock:
+            os.makedirs(CASSETTE_DIR, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                if instructions_hash not in _known_blobs[path]:
+                    blob = {"type": "blob", "hash": instructions_hash, "text": instructions}
+                    f.write(json.dumps(blob, ensure_ascii=False) + "\n")
+                    _known_blobs[path].add(instructions_hash)
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning(f"Could not write cassette {path}: {e}")
+
+
+# ---------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------
+class Cassette:
+    """
+    A loaded cassette with its calls in recorded order and an index by request key.
+
+    Attributes:
+        path: Source file.
+        calls: Call entries in recorded order (instructions resolved).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.calls: List[Dict[str, Any]] = []
+        blobs: Dict[str, str] = {}
+
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("type") == "blob":
+                    blobs[entry["hash"]] = entry["text"]
+                elif entry.get("type") == "call":
+                    request = entry["request"]
+                    request["instructions"] = blobs.get(request.pop("instructions_ref", ""), "")
+                    entry["seq"] = len(self.calls)
+                    self.calls.append(entry)
+
+        # Keys are recomputed from the recorded requests, so cassettes recorded
+        # under an older `request_key` (e.g. one that still hashed the token cap) still match
+        self._by_key: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        for entry in self.calls:
+            self._by_key[request_key(entry["request"])].append(entry)
+        self._lock = threading.Lock()
+        self.consumed: set = set()
+        self.misses = 0
+
+    def take(self, request_kwargs: Dict[str, Any], strict: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Return the next unconsumed entry for a request.
+
+        Matches by request key first. Unless `strict`, falls back to the next
+        unconsumed entry in recorded order (prompts may drift after template edits).
+        """
+        with self._lock:
+            queue = self._by_key.get(request_key(request_kwargs))
+            while queue:
+                entry = queue.popleft()
+                if entry["seq"] not in self.consumed:
+                    self.consumed.add(entry["seq"])
+                    return entry
+
+            self.misses += 1
+            if strict:
+                return None
+            for entry in self.calls:
+                if entry["seq"] not in self.consumed:
+                    self.consumed.add(entry["seq"])
+                    return entry
+            return None
+
+
+class ReplayBackend(LLMBackend):
+    """
+    Backend that serves responses from a cassette.
+
+    Args:
+        cassette: Loaded cassette.
+        timing_scale: Multiplier for recorded latencies (0 = as fast as possible).
+        strict: Fail on requests whose key is not in the cassette.
+    """
+
+    name = "replay"
+    supports_conversation_state = True
+
+    def __init__(self, cassette: Cassette, timing_scale: float = 1.0, strict: bool = False):
+        self.cassette = cassette
+        self.timing_scale = timing_scale
+        self.strict = strict
+
+    def create(self, **request_kwargs: Any) -> LLMResponse:
+        entry = self.cassette.take(request_kwargs, strict=self.strict)
+        if entry is None:
+            raise LLMError("No recorded response for this request")
+
+        delay = entry.get("latency_ms", 0) * self.timing_scale / 1000
+        if delay > 0:
+            time.sleep(delay)
+
+        if "error" in entry:
+            raise LLMError(f"Replayed error: {entry['error']}")
+        return LLMResponse(**entry["response"])
+
+
+# ---------------------------------------------------------------------
+# Session replay
+# ---------------------------------------------------------------------
+def _apply_context(context: Dict[str, Any]) -> None:
+    import streamlit as st
+
+    for key, value in context.items():
+        if value is not None:
+            st.session_state[key] = value
+
+
+def _is_combined_validation(entry: Dict[str, Any]) -> bool:
+    text_format = (entry["request"].get("text") or {}).get("format") or {}
+    return text_format.get("name") == "validation_with_question"
+
+
+def replay_session(path: str, timing_scale: float = 1.0, strict: bool = False) -> Dict[str, Any]:
+    """
+    Drive `interview_logic` through the user actions recorded in a cassette.
+
+    Each unconsumed recorded call is turned back into the action that caused it
+    (validation, combined validation with first question, first question,
+    answer submission, summary). With the parallel evaluation pipeline, the
+    first feedback call stands for the answer submission, including the
+    feedback calls of other personas when the recorded session compared them. Calls made inside
+    an action, such as fallback question generation or retries, are served to
+    that action by the replay backend.
+
+    Args:
+        path: Cassette file.
+        timing_scale: Multiplier for recorded latencies.
+        strict: Fail on requests that are not in the cassette.
+
+    Returns:
+        dict: Replay statistics (actions, recorded and replayed milliseconds, misses).
+    """
+    from modules import interview_logic, validation
+    from modules.llm_backends import get_backend, set_backend
+    from modules.session_state import get_transcript, initialize_session_state
+
+    cassette = Cassette(path)
+    previous_backend = get_backend()
+    set_backend(ReplayBackend(cassette, timing_scale=timing_scale, strict=strict))
+
+    initialize_session_state()
+    interview_logic.initialize_interview_session("", "Behavioral", "Easy")
+    actions: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+
+    try:
+        # Every recorded call is replayed, not answered from responses cached earlier in this process
+        with response_cache.bypass():
+            for entry in cassette.calls:
+                if entry["seq"] in cassette.consumed or "error" in entry:
+                    continue
+
+                _apply_context(entry.get("ctx", {}))
+                inputs = entry.get("inputs", {})
+                task = entry["task"]
+                action_started = time.perf_counter()
+
+                if task == "validation" and _is_combined_validation(entry):
+                    _, _, question = validation.validate_job_title_and_generate_question(
+                        inputs.get("job_title", ""), inputs.get("question_type", ""), inputs.get("difficulty", "")
+                    )
+                    if question:
+                        if len(get_transcript()):
+                            interview_logic.restart_interview()
+                        get_transcript().add_question(question)
+                elif task == "validation":
+                    validation.validate_job_title_with_clarification(inputs.get("job_title", ""))
+                elif task == "question":
+                    if len(get_transcript()):
+                        interview_logic.restart_interview()
+                    get_transcript().add_question(interview_logic.generate_next_question())
+                elif task == "feedback" and "inputs" not in entry:
+                    # Feedback of another persona, recorded on a worker thread (possibly before the
+                    # selected persona's call, which carries the answer); served to that action
+                    continue
+                elif task in ("evaluation", "feedback"):
+                    answer = inputs.get("answer", "")
+                    personas = interview_logic.evaluation_personas()
+                    if len(personas) > 1:
+                        feedbacks, next_question = interview_logic.evaluate_answer_personas(answer, personas)
+                        feedback = feedbacks[personas[0]]
+                    else:
+                        feedbacks = None
+                        feedback, next_question = interview_logic.evaluate_answer_and_generate_next(answer)
+                    transcript = get_transcript()
+                    transcript.answer_current(answer, feedback, feedbacks)
+                    if next_question:
+                        transcript.add_question(next_question)
+                elif task == "summary":
+                    interview_logic.generate_interview_summary()
+                elif task == "next_question":
+                    # Served to the parallel evaluation action it belongs to
+                    continue
+                else:
+                    cassette.consumed.add(entry["seq"])
+                    continue
+
+                actions.append({
+                    "task": task,
+                    "recorded_ms": entry.get("latency_ms", 0),
+                    "replayed_ms": round((time.perf_counter() - action_started) * 1000, 1),
+                })
+    finally:
+        set_backend(previous_backend)
+
+    return {
+        "actions": actions,
+        "calls": len(cassette.calls),
+        "misses": cassette.misses,
+        "recorded_ms": round(sum(c.get("latency_ms", 0) for c in cassette.calls), 1),
+        "replayed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point: `python -m modules.cassette list|replay`."""
+    parser = argparse.ArgumentParser(description="LLM traffic cassettes")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="List recorded cassettes")
+    replay = sub.add_parser("replay", help="Replay a cassette through interview_logic")
+    replay.add_argument("path", help="Cassette file")
+    replay.add_argument("--scale", type=float, default=1.0, help="Latency multiplier (0 = no delay)")
+    replay.add_argument("--strict", action="store_true", help="Fail on requests missing from the cassette")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        if not os.path.isdir(CASSETTE_DIR):
+            print(f"No cassettes in {CASSETTE_DIR}")
+            return
+        for name in sorted(os.listdir(CASSETTE_DIR)):
+            path = os.path.join(CASSETTE_DIR, name)
+            print(f"{name:<40}{len(Cassette(path).calls):>6} calls")
+        return
+
+    stats = replay_session(args.path, timing_scale=args.scale, strict=args.strict)
+    for action in stats["actions"]:
+        print(f"{action['task']:<12} recorded {action['recorded_ms']:>9.1f} ms   replayed {action['replayed_ms']:>9.1f} ms")
+    print(
+        f"\n{len(stats['actions'])} actions from {stats['calls']} calls | "
+        f"recorded {stats['recorded_ms']:.0f} ms | replayed {stats['replayed_ms']:.0f} ms | "
+        f"misses {stats['misses']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
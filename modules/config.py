@@ -9,59 +9,317 @@ Includes:
 - Template paths and techniques
 - System prompts and base instructions
 - Persona mappings and evaluation descriptions
+
+Technique and prompt-template settings live in a reloadable `Settings`
+snapshot (`get_settings()`, re-read from `.env` by `reload_settings()`); their
+old module constants (`ACTIVE_QUESTION_TECHNIQUE`, `SYSTEM_PROMPTS`, ...) still
+resolve to the current snapshot. Everything else is read once at import.
 """
 
+import contextvars
 import os
-from dotenv import load_dotenv
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+from dotenv import dotenv_values, find_dotenv, load_dotenv
+
+# Variables set by the process environment take precedence over .env, also on reload
+_PROCESS_ENV = frozenset(os.environ)
 
 # Load environment variables from .env
-load_dotenv()
+ENV_FILE = find_dotenv()
+load_dotenv(ENV_FILE)
 
 # --- Configurable parameters from .env ---
 USE_MOCK_API = os.getenv("USE_MOCK_API", "False") == "True"
-ACTIVE_QUESTION_TECHNIQUE = os.getenv("ACTIVE_QUESTION_TECHNIQUE", "contextual_progression.j2")
-ACTIVE_SUMMARY_TECHNIQUE = os.getenv("ACTIVE_SUMMARY_TECHNIQUE", "default.j2")
-ACTIVE_VALIDATION_TECHNIQUE = os.getenv("ACTIVE_VALIDATION_TECHNIQUE", "validate_job_title.j2")
+# "separate": validate the job title, then generate the first question (two calls).
+# "combined": one structured call returns {valid, clarification, question}.
+VALIDATION_MODE = os.getenv("VALIDATION_MODE", "separate")
+# "combined": one call returns feedback and next question (serial fallback if the question is missing).
+# "parallel": feedback and next question are two concurrent calls with their own schema and token cap.
+EVALUATION_PIPELINE = os.getenv("EVALUATION_PIPELINE", "combined")
+NEXT_QUESTION_MAX_TOKENS = int(os.getenv("NEXT_QUESTION_MAX_TOKENS", "200"))
+# Answer low-effort replies (too short, nonsensical, repeated) locally without an LLM call.
+ENABLE_ANSWER_SCREENING = os.getenv("ENABLE_ANSWER_SCREENING", "True") == "True"
+# Only near-empty answers are rejected locally; short but real answers go to the model.
+ANSWER_MIN_WORDS = int(os.getenv("ANSWER_MIN_WORDS", "3"))
+# Let users compare feedback styles: each answer is evaluated under every selected persona concurrently.
+ENABLE_PERSONA_FANOUT = os.getenv("ENABLE_PERSONA_FANOUT", "False") == "True"
+MAX_FANOUT_PERSONAS = int(os.getenv("MAX_FANOUT_PERSONAS", "3"))
+# "stateless": every evaluation resends the full prompt with the transcript.
+# "chained": evaluations continue a server-side conversation (`previous_response_id`) and only send the new turn.
+CONVERSATION_MODE = os.getenv("CONVERSATION_MODE", "stateless")
+
+# --- LLM backend ---
+# "openai" (Responses API), "openai_compatible" (any /chat/completions endpoint) or "fake".
+# USE_MOCK_API=True selects the fake backend unless LLM_BACKEND is set explicitly.
+LLM_BACKEND = os.getenv("LLM_BACKEND", "fake" if USE_MOCK_API else "openai")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL") or None
+LLM_API_KEY = os.getenv("LLM_API_KEY") or os.getenv("OPENAI_API_KEY")
+
+# Fake backend behavior (latency in milliseconds, rates between 0 and 1)
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+FAKE_LLM_JITTER_MS = float(os.getenv("FAKE_LLM_JITTER_MS", "0"))
+FAKE_LLM_MS_PER_TOKEN = float(os.getenv("FAKE_LLM_MS_PER_TOKEN", "0"))
+FAKE_LLM_TRUNCATION_RATE = float(os.getenv("FAKE_LLM_TRUNCATION_RATE", "0"))
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+FAKE_LLM_SEED = int(os.environ["FAKE_LLM_SEED"]) if os.getenv("FAKE_LLM_SEED") else None
 
 # --- Base project directory ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+# --- Usage ledger ---
+ENABLE_USAGE_LEDGER = os.getenv("ENABLE_USAGE_LEDGER", "True") == "True"
+USAGE_LEDGER_PATH = os.getenv("USAGE_LEDGER_PATH", os.path.join(BASE_DIR, "logs", "usage_ledger.jsonl"))
+
+# --- Record and replay of LLM traffic ---
+RECORD_LLM_TRAFFIC = os.getenv("RECORD_LLM_TRAFFIC", "False") == "True"
+CASSETTE_DIR = os.getenv("CASSETTE_DIR", os.path.join(BASE_DIR, "logs", "cassettes"))
+
+# --- Transcript memory ---
+# Recent turns kept in memory per session (0 = keep all); older turns spill to disk.
+TRANSCRIPT_MEMORY_WINDOW = int(os.getenv("TRANSCRIPT_MEMORY_WINDOW", "0"))
+TRANSCRIPT_SPILL_DIR = os.getenv("TRANSCRIPT_SPILL_DIR", os.path.join(BASE_DIR, "logs", "transcripts"))
+# Sessions idle for longer than this have their whole transcript spilled (0 = off).
+TRANSCRIPT_IDLE_TTL_SECONDS = float(os.getenv("TRANSCRIPT_IDLE_TTL_SECONDS", "1800"))
+
+# --- Background work ---
+# Threads shared by all sessions for LLM calls made off the script thread.
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", "8"))
+# Generate the first question while the job title is being validated.
+SPECULATIVE_FIRST_QUESTION = os.getenv("SPECULATIVE_FIRST_QUESTION", "True") == "True"
+# Threads for background jobs (evaluations, questions and summaries started from
+# the interview screen). Kept apart from BACKGROUND_WORKERS so a job waiting on
+# its own parallel calls never holds the threads those calls need.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# How often the interview screen checks a running job.
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "0.5"))
+
+# --- Adaptive output token caps ---
+# Lower max_output_tokens per task, prompt template and model to a high percentile
+# of observed output lengths plus headroom. The configured cap stays the upper bound.
+ENABLE_ADAPTIVE_TOKEN_LIMITS = os.getenv("ENABLE_ADAPTIVE_TOKEN_LIMITS", "True") == "True"
+ADAPTIVE_TOKEN_PERCENTILE = float(os.getenv("ADAPTIVE_TOKEN_PERCENTILE", "99"))
+# Fraction added on top of the percentile.
+ADAPTIVE_TOKEN_HEADROOM = float(os.getenv("ADAPTIVE_TOKEN_HEADROOM", "0.25"))
+# Outputs observed before a cap is lowered, and outputs kept per task.
+ADAPTIVE_TOKEN_MIN_SAMPLES = int(os.getenv("ADAPTIVE_TOKEN_MIN_SAMPLES", "20"))
+ADAPTIVE_TOKEN_WINDOW = int(os.getenv("ADAPTIVE_TOKEN_WINDOW", "500"))
+ADAPTIVE_TOKEN_FLOOR = int(os.getenv("ADAPTIVE_TOKEN_FLOOR", "64"))
+# Most recent usage ledger lines learned from when a process starts (the ledger is never rotated).
+ADAPTIVE_TOKEN_LEDGER_LINES = int(os.getenv("ADAPTIVE_TOKEN_LEDGER_LINES", "10000"))
+
+# --- Truncated structured output ---
+# Repair JSON cut off at max_output_tokens locally, then ask only for the missing
+# part (up to CONTINUATION_MAX_TOKENS) instead of repeating the whole call.
+ENABLE_OUTPUT_RECOVERY = os.getenv("ENABLE_OUTPUT_RECOVERY", "True") == "True"
+CONTINUATION_MAX_TOKENS = int(os.getenv("CONTINUATION_MAX_TOKENS", "256"))
+CONTINUATION_TEMPLATE = os.getenv("CONTINUATION_TEMPLATE", "continuation/continue_output.j2")
+
+# --- Response cache ---
+# Identical requests (same prompt, model, temperature, schema) share one call and reuse its response.
+ENABLE_RESPONSE_CACHE = os.getenv("ENABLE_RESPONSE_CACHE", "True") == "True"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+# Requests sampled above this temperature always get a fresh response.
+RESPONSE_CACHE_MAX_TEMPERATURE = float(os.getenv("RESPONSE_CACHE_MAX_TEMPERATURE", "0.5"))
+
+# --- Job title dictionary ---
+# Known titles and close misspellings skip the LLM validator.
+ENABLE_JOB_TITLE_INDEX = os.getenv("ENABLE_JOB_TITLE_INDEX", "True") == "True"
+JOB_TITLES_PATH = os.getenv("JOB_TITLES_PATH", os.path.join(BASE_DIR, "data", "job_titles.txt"))
+
+# --- Question bank ---
+# Pre-generated first questions (built with `python -m modules.question_bank build`);
+# also used when live question generation fails.
+ENABLE_QUESTION_BANK = os.getenv("ENABLE_QUESTION_BANK", "True") == "True"
+QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH", os.path.join(BASE_DIR, "data", "question_bank.bin"))
+QUESTION_BANK_TITLES_PATH = os.getenv(
+    "QUESTION_BANK_TITLES_PATH", os.path.join(BASE_DIR, "data", "question_bank_titles.txt")
+)
+
+# --- Document grounding ---
+# Uploaded job descriptions and resumes are chunked and indexed (BM25) per session;
+# prompts carry only the best matching excerpts, within a fixed character budget.
+ENABLE_DOCUMENT_UPLOAD = os.getenv("ENABLE_DOCUMENT_UPLOAD", "True") == "True"
+MAX_DOCUMENT_CHARS = int(os.getenv("MAX_DOCUMENT_CHARS", "200000"))
+RETRIEVAL_CHUNK_WORDS = int(os.getenv("RETRIEVAL_CHUNK_WORDS", "80"))
+RETRIEVAL_CHUNK_OVERLAP_WORDS = int(os.getenv("RETRIEVAL_CHUNK_OVERLAP_WORDS", "20"))
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "3"))
+RETRIEVAL_MAX_CHARS = int(os.getenv("RETRIEVAL_MAX_CHARS", "1500"))
+
+# --- Rubric scores ---
+# Evaluations also score each answer 1-5 per rubric dimension; scores feed the progress view.
+# Off by default: the scores add output tokens to every evaluation.
+ENABLE_RUBRIC_SCORES = os.getenv("ENABLE_RUBRIC_SCORES", "False") == "True"
+RUBRIC_HISTORY_PATH = os.getenv("RUBRIC_HISTORY_PATH", os.path.join(BASE_DIR, "logs", "rubric_scores.bin"))
+# Turns in the rolling average of the progress view
+PROGRESS_WINDOW = int(os.getenv("PROGRESS_WINDOW", "5"))
+
+# --- Prompt archive ---
+# Each distinct rendered prompt is stored once (gzip) under its hash; logs carry only the hash.
+ENABLE_PROMPT_ARCHIVE = os.getenv("ENABLE_PROMPT_ARCHIVE", "True") == "True"
+PROMPT_ARCHIVE_DIR = os.getenv("PROMPT_ARCHIVE_DIR", os.path.join(BASE_DIR, "logs", "prompts"))
+PROMPT_ARCHIVE_RETENTION_DAYS = float(os.getenv("PROMPT_ARCHIVE_RETENTION_DAYS", "14"))
+PROMPT_ARCHIVE_MAX_MB = float(os.getenv("PROMPT_ARCHIVE_MAX_MB", "200"))
+
+# --- Profiling ---
+# Profile every rerun, or only reruns opened with ?profile=<PROFILING_TOKEN>.
+ENABLE_PROFILING = os.getenv("ENABLE_PROFILING", "False") == "True"
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_MODE = os.getenv("PROFILING_MODE", "sample")  # "sample" or "cprofile"
+PROFILING_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(BASE_DIR, "logs", "profiles"))
+
+# --- Tracing ---
+# Every user action is a trace; with tracing on, its spans (prompt building, LLM attempts,
+# parsing, rendering) are exported to a JSONL file ("jsonl") or an OTLP/HTTP JSON collector ("otlp").
+ENABLE_TRACING = os.getenv("ENABLE_TRACING", "False") == "True"
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "jsonl")
+TRACE_PATH = os.getenv("TRACE_PATH", os.path.join(BASE_DIR, "logs", "traces.jsonl"))
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+
 # Jinja2 template folder
 PROMPTS_TEMPLATE_DIR = os.getenv("PROMPTS_TEMPLATE_DIR", os.path.join(BASE_DIR, "prompts"))
 
-# System instruction templates
-SYSTEM_PROMPTS = {
-    "job_title_validator": os.getenv(
-        "SYSTEM_JOB_TITLE_VALIDATOR", "system/job_title_validator.j2"
-    ),
-    "question_generator": os.getenv(
-        "SYSTEM_QUESTION_GENERATOR", "system/question.j2"
-    ),
-    "answer_evaluator": os.getenv(
-        "SYSTEM_ANSWER_EVALUATOR", "system/evaluation.j2"
-    ),
-    "summary_generator": os.getenv(
-        "SYSTEM_SUMMARY_GENERATOR", "system/summary_generator.j2"
-    ),
-}
+# --- Hot reload ---
+# Watch PROMPTS_TEMPLATE_DIR and .env, and pick up template and prompt-setting changes without a restart.
+ENABLE_HOT_RELOAD = os.getenv("ENABLE_HOT_RELOAD", "False") == "True"
+HOT_RELOAD_INTERVAL_SECONDS = float(os.getenv("HOT_RELOAD_INTERVAL_SECONDS", "2"))
 
-# Base instruction templates per category
-BASE_PROMPTS = {
-    "evaluation": os.getenv("BASE_PROMPT_EVALUATION", "base_instructions.j2"),
-    "validation": os.getenv("BASE_PROMPT_VALIDATION", "base_instructions.j2"),
-    "summary": os.getenv("BASE_PROMPT_SUMMARY", "base_instructions.j2"),
-    "question": os.getenv("BASE_PROMPT_QUESTION", "base_instructions.j2"),
-}
 
-# Personas
-PERSONA_MAP = {
-    "Hiring Manager": os.getenv("PERSONA_HIRING_MANAGER", "personality_hiring_manager.j2"),
-    "HR Professional": os.getenv("PERSONA_HR", "personality_hr.j2"),
-    "Ideal Candidate": os.getenv("PERSONA_IDEAL_CANDIDATE", "personality_ideal_candidate.j2"),
-    "Mentor": os.getenv("PERSONA_MENTOR", "personality_mentor.j2"),
-    "Subject Matter Expert": os.getenv("PERSONA_SME", "personality_sme.j2"),
+# --- Reloadable prompt settings ---
+@dataclass(frozen=True)
+class Settings:
+    """
+    Snapshot of the technique and template settings.
+
+    A reload builds a new snapshot; code holding the old one (e.g. a rerun
+    that pinned it) keeps using it until it finishes.
+    """
+
+    active_question_technique: str
+    active_summary_technique: str
+    active_validation_technique: str
+    combined_validation_technique: str
+    chained_evaluation_template: str
+    # System instruction templates
+    system_prompts: Dict[str, str]
+    # Base instruction templates per category
+    base_prompts: Dict[str, str]
+    # Personas
+    persona_map: Dict[str, str]
+    version: int = field(default=1, compare=False)
+
+
+def _read_settings(version: int = 1) -> Settings:
+    return Settings(
+        active_question_technique=os.getenv("ACTIVE_QUESTION_TECHNIQUE", "contextual_progression.j2"),
+        active_summary_technique=os.getenv("ACTIVE_SUMMARY_TECHNIQUE", "default.j2"),
+        active_validation_technique=os.getenv("ACTIVE_VALIDATION_TECHNIQUE", "validate_job_title.j2"),
+        combined_validation_technique=os.getenv("COMBINED_VALIDATION_TECHNIQUE", "validate_with_question.j2"),
+        chained_evaluation_template=os.getenv("CHAINED_EVALUATION_TEMPLATE", "chained_turn.j2"),
+        system_prompts={
+            "job_title_validator": os.getenv(
+                "SYSTEM_JOB_TITLE_VALIDATOR", "system/job_title_validator.j2"
+            ),
+            "job_title_validator_with_question": os.getenv(
+                "SYSTEM_JOB_TITLE_VALIDATOR_WITH_QUESTION", "system/job_title_validator_with_question.j2"
+            ),
+            "question_generator": os.getenv(
+                "SYSTEM_QUESTION_GENERATOR", "system/question.j2"
+            ),
+            "answer_evaluator": os.getenv(
+                "SYSTEM_ANSWER_EVALUATOR", "system/evaluation.j2"
+            ),
+            "summary_generator": os.getenv(
+                "SYSTEM_SUMMARY_GENERATOR", "system/summary_generator.j2"
+            ),
+        },
+        base_prompts={
+            "evaluation": os.getenv("BASE_PROMPT_EVALUATION", "base_instructions.j2"),
+            "validation": os.getenv("BASE_PROMPT_VALIDATION", "base_instructions.j2"),
+            "summary": os.getenv("BASE_PROMPT_SUMMARY", "base_instructions.j2"),
+            "question": os.getenv("BASE_PROMPT_QUESTION", "base_instructions.j2"),
+        },
+        persona_map={
+            "Hiring Manager": os.getenv("PERSONA_HIRING_MANAGER", "personality_hiring_manager.j2"),
+            "HR Professional": os.getenv("PERSONA_HR", "personality_hr.j2"),
+            "Ideal Candidate": os.getenv("PERSONA_IDEAL_CANDIDATE", "personality_ideal_candidate.j2"),
+            "Mentor": os.getenv("PERSONA_MENTOR", "personality_mentor.j2"),
+            "Subject Matter Expert": os.getenv("PERSONA_SME", "personality_sme.j2"),
+        },
+        version=version,
+    )
+
+
+_settings = _read_settings()
+_settings_lock = threading.Lock()
+_pinned_settings: contextvars.ContextVar[Optional[Settings]] = contextvars.ContextVar("pinned_settings", default=None)
+_env_file_keys = frozenset(dotenv_values(ENV_FILE)) if ENV_FILE else frozenset()
+
+# Former module constants, resolved from the current snapshot by `__getattr__`
+_SETTINGS_CONSTANTS = {
+    "ACTIVE_QUESTION_TECHNIQUE": "active_question_technique",
+    "ACTIVE_SUMMARY_TECHNIQUE": "active_summary_technique",
+    "ACTIVE_VALIDATION_TECHNIQUE": "active_validation_technique",
+    "COMBINED_VALIDATION_TECHNIQUE": "combined_validation_technique",
+    "CHAINED_EVALUATION_TEMPLATE": "chained_evaluation_template",
+    "SYSTEM_PROMPTS": "system_prompts",
+    "BASE_PROMPTS": "base_prompts",
+    "PERSONA_MAP": "persona_map",
 }
 
+
+def get_settings() -> Settings:
+    """Return the settings pinned in this context, or the current snapshot."""
+    return _pinned_settings.get() or _settings
+
+
+@contextmanager
+def pinned_settings() -> Iterator[Settings]:
+    """Make `get_settings()` return the current snapshot in this context (and work submitted from it)."""
+    token = _pinned_settings.set(get_settings())
+    try:
+        yield _pinned_settings.get()
+    finally:
+        _pinned_settings.reset(token)
+
+
+def reload_settings() -> bool:
+    """
+    Re-read `.env` and rebuild the settings snapshot.
+
+    Variables set in the process environment keep precedence; variables
+    removed from `.env` fall back to their defaults.
+
+    Returns:
+        bool: True if the settings changed.
+    """
+    global _settings, _env_file_keys
+    values = {k: v for k, v in dotenv_values(ENV_FILE).items() if v is not None} if ENV_FILE else {}
+    with _settings_lock:
+        for key in _env_file_keys - set(values) - _PROCESS_ENV:
+            os.environ.pop(key, None)
+        for key, value in values.items():
+            if key not in _PROCESS_ENV:
+                os.environ[key] = value
+        _env_file_keys = frozenset(values)
+
+        settings = _read_settings(_settings.version + 1)
+        if settings == _settings:
+            return False
+        _settings = settings
+        return True
+
+
+def __getattr__(name: str):
+    if name in _SETTINGS_CONSTANTS:
+        return getattr(get_settings(), _SETTINGS_CONSTANTS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 EVALUATION_PERSONAS = {
     "Hiring Manager": "Focuses on how a candidate would be assessed for hiring suitability.",
     "HR Professional": "Evaluates answers using HR best practices, professionalism, and compliance.",
@@ -90,4 +348,11 @@ COST_PER_1M_OUTPUT_TOKENS = {
     "o3-mini": 4.40,
     "gpt-5": 10.00,
     "gpt-4.1":8.00
-}
\ No newline at end of file
+}
+COST_PER_1M_CACHED_INPUT_TOKENS = {
+    "gpt-4o-mini": 0.075,
+    "gpt-4o": 1.25,
+    "o3-mini": 0.55,
+    "gpt-5": 0.125,
+    "gpt-4.1": 0.50
+}
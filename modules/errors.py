@@ -58,3 +58,11 @@ class ParsingError(AppError):
     user_message = (
         "I could not understand the model's response. Please answer again or restart."
     )
+
+
+class JobCancelled(AppError):
+    """
+    Raised inside a background job that was cancelled (e.g. by a restart),
+    before it makes another LLM request.
+    """
+    user_message = "The request was cancelled."
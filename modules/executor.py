@@ -0,0 +1,75 @@
+"""
+executor.py
+
+Shared thread pool for running LLM calls off the Streamlit script thread.
+
+Work submitted here keeps access to the submitting session's
+`st.session_state` (the Streamlit script run context is attached to the
+worker thread) and sees the caller's context variables.
+"""
+
+import contextvars
+import copy
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from modules.config import BACKGROUND_WORKERS
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix="llm-worker")
+    return _executor
+
+
+def _background_ctx(script_ctx: Any) -> Any:
+    # Streamlit stops threads attached to a script run at their next
+    # session_state access once that run is stopped or rerun (through the run's
+    # fragment coordinator). Background work outlives the run that started it,
+    # so it gets a copy of the context without the coordinator.
+    if script_ctx is None or getattr(script_ctx, "parallel_coordinator", None) is None:
+        return script_ctx
+    background_ctx = copy.copy(script_ctx)
+    background_ctx.parallel_coordinator = None
+    return background_ctx
+
+
+def in_session(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Callable[[], Any]:
+    """
+    Bind `fn(*args, **kwargs)` to the caller's session for running on another thread.
+
+    The returned callable attaches the caller's Streamlit script run context to
+    the thread it runs on and runs `fn` in a copy of the caller's context variables.
+    """
+    script_ctx = _background_ctx(get_script_run_ctx(suppress_warning=True))
+    var_ctx = contextvars.copy_context()
+
+    def run() -> Any:
+        if script_ctx is not None:
+            add_script_run_ctx(threading.current_thread(), script_ctx)
+        return var_ctx.run(fn, *args, **kwargs)
+
+    return run
+
+
+def submit(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """
+    Run `fn(*args, **kwargs)` on the shared executor within the caller's session.
+
+    Returns:
+        Future: Resolves to the return value of `fn`.
+    """
+    return get_executor().submit(in_session(fn, *args, **kwargs))
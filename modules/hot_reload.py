@@ -0,0 +1,124 @@
+"""
+hot_reload.py
+
+Pick up prompt template and prompt setting changes without restarting the app.
+
+A background thread polls the files under `PROMPTS_TEMPLATE_DIR` and the
+`.env` file every `HOT_RELOAD_INTERVAL_SECONDS` (modification time and size).
+Changed, added or removed templates are invalidated in `utils`, and a changed
+`.env` rebuilds the prompt settings snapshot (`config.reload_settings`).
+
+Each rerun pins the templates and settings it started with (`pinned`), so a
+reload never mixes old and new prompts within one interaction; the next rerun
+uses the new version. Settings outside `config.Settings` (backends, feature
+flags, paths) still need a restart.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from modules import config, utils
+from modules.config import ENABLE_HOT_RELOAD, HOT_RELOAD_INTERVAL_SECONDS, PROMPTS_TEMPLATE_DIR
+
+logger = logging.getLogger(__name__)
+
+_Stamp = Tuple[float, int]
+
+
+def _stamp(path: str) -> Optional[_Stamp]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime, stat.st_size
+
+
+def snapshot_templates(template_dir: str) -> Dict[str, _Stamp]:
+    """Return (mtime, size) of every file under `template_dir`, keyed by template name ("category/file.j2")."""
+    stamps: Dict[str, _Stamp] = {}
+    for root, _, files in os.walk(template_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            stamp = _stamp(path)
+            if stamp is not None:
+                stamps[os.path.relpath(path, template_dir).replace(os.sep, "/")] = stamp
+    return stamps
+
+
+class Watcher:
+    """
+    Detects template and `.env` changes between two polls.
+
+    Args:
+        template_dir: Prompt template directory.
+        env_file: `.env` file ("" if there is none).
+    """
+
+    def __init__(self, template_dir: str, env_file: str):
+        self.template_dir = template_dir
+        self.env_file = env_file
+        self._templates = snapshot_templates(template_dir)
+        self._env = _stamp(env_file) if env_file else None
+
+    def check(self) -> Tuple[List[str], bool]:
+        """
+        Apply the changes since the last check.
+
+        Returns:
+            (templates, settings_changed): Names of changed, added or removed
+            templates, and whether the prompt settings changed.
+        """
+        templates = snapshot_templates(self.template_dir)
+        changed = sorted(
+            name for name in set(templates) | set(self._templates)
+            if templates.get(name) != self._templates.get(name)
+        )
+        self._templates = templates
+        if changed:
+            utils.invalidate_templates(changed)
+
+        settings_changed = False
+        env = _stamp(self.env_file) if self.env_file else None
+        if env != self._env:
+            self._env = env
+            settings_changed = config.reload_settings()
+            if settings_changed:
+                logger.info(f"Reloaded prompt settings from {self.env_file} (version {config.get_settings().version})")
+        return changed, settings_changed
+
+
+_watcher: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def start_watcher(interval_seconds: float = HOT_RELOAD_INTERVAL_SECONDS) -> None:
+    """Start the background watcher once per process (no-op unless `ENABLE_HOT_RELOAD`)."""
+    global _watcher
+    if not ENABLE_HOT_RELOAD or _watcher is not None:
+        return
+
+    def run() -> None:
+        watcher = Watcher(PROMPTS_TEMPLATE_DIR, config.ENV_FILE)
+        while True:
+            time.sleep(max(0.1, interval_seconds))
+            try:
+                watcher.check()
+            except Exception:
+                logger.exception("Hot reload check failed")
+
+    with _lock:
+        if _watcher is None:
+            _watcher = threading.Thread(target=run, name="hot-reload", daemon=True)
+            _watcher.start()
+            logger.info(f"Watching {PROMPTS_TEMPLATE_DIR} and .env for changes every {interval_seconds} s")
+
+
+@contextmanager
+def pinned() -> Iterator[None]:
+    """Use the current templates and prompt settings for everything in this context, including background work."""
+    with config.pinned_settings(), utils.pinned_templates():
+        yield
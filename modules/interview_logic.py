@@ -1,35 +1,33 @@
 import json
 import logging
-from typing import Tuple, Optional, List
+import time
+from typing import Dict, Tuple, Optional, List
 import streamlit as st
-from modules.utils import openai_call, load_prompt, build_prompt
-from modules.session_state import get_openai_settings
+from modules.utils import CALL_FAILED, openai_call, openai_chained_call, load_prompt, build_prompt
+from modules.llm_backends import get_backend
+from modules.question_bank import get_bank
+from modules.executor import submit
+from modules.answer_screening import screen_answer
+from modules import jobs, ledger, tracing
+from modules.cassette import note_input
+from modules.structured_output import loads as parse_json, repair_json
+from modules.session_state import get_openai_settings, get_transcript, get_user_id, clear_turn_widgets
+from modules.retrieval import query_text
+from modules.rubric import get_history, parse_scores, rubric_prompt_dimensions, rubric_schema
 from modules.config import (
-    USE_MOCK_API,
-    ACTIVE_QUESTION_TECHNIQUE,
-    ACTIVE_SUMMARY_TECHNIQUE,
-    SYSTEM_PROMPTS,
-    BASE_PROMPTS,
-    PERSONA_MAP
+    CONVERSATION_MODE,
+    ENABLE_ANSWER_SCREENING,
+    ENABLE_RUBRIC_SCORES,
+    EVALUATION_PIPELINE,
+    NEXT_QUESTION_MAX_TOKENS,
+    SPECULATIVE_FIRST_QUESTION,
+    get_settings,
 )
 
 logger = logging.getLogger(__name__)
 
-# --- MOCK API DATA FOR LOCAL TESTING ---
-mock_questions = [
-    "Mock Q1: Tell me about yourself.",
-    "Mock Q2: Why do you want this job?",
-    "Mock Q3: Describe a challenge you faced at work.",
-    "Mock Q4: How do you handle stress?"
-]
-
-mock_feedback = [
-    "Mock Feedback: Good answer! Try to be more concise.",
-    "Mock Feedback: Solid response. Could give more examples.",
-    "Mock Feedback: Excellent! Well-structured answer.",
-    "Mock Feedback: Nice! Consider elaborating on impact."
-]
-
+# Returned by `generate_question` when no question could be generated.
+QUESTION_FAILED = "Could not generate question. Please try again."
 
 # =====================================================================
 # CORE SESSION MANAGEMENT
@@ -43,13 +41,14 @@ def restart_interview() -> None:
     Notes:
         - Job title, difficulty, and question type remain unchanged.
         - Sidebar clarification state is reset as well.
+        - Background jobs of the previous interview are cancelled.
     """
     logger.info("Restarting interview: clearing questions, answers, and feedbacks.")
 
-    st.session_state.questions = []
-    st.session_state.answers = []
-    st.session_state.feedbacks = []
-    st.session_state.current_question_index = 0
+    jobs.cancel_session_jobs()
+    get_transcript().clear()
+    clear_turn_widgets()
+    st.session_state.pop("conversation", None)
     st.session_state.input_tokens_total = 0
     st.session_state.output_tokens_total = 0
     st.session_state.cost_so_far = 0.0
@@ -58,16 +57,13 @@ def restart_interview() -> None:
     st.session_state.sidebar_clarification_message = ""
     st.session_state.pending_sidebar_job_title = ""
 
-    logger.debug("Session after restart: %s", {
-        "questions": st.session_state.questions,
-        "answers": st.session_state.answers,
-        "feedbacks": st.session_state.feedbacks
-    })
+    logger.debug("Session after restart: %s turns in transcript", len(get_transcript()))
 
 
 def initialize_interview_session(job_title: str, question_type: str, difficulty: str) -> None:
     """
     Initialize a fresh interview session in Streamlit's session state.
+    Background jobs of a previous interview are cancelled.
 
     Args:
         job_title: Position being interviewed for.
@@ -84,10 +80,10 @@ def initialize_interview_session(job_title: str, question_type: str, difficulty:
     st.session_state.question_type = question_type
     st.session_state.difficulty = difficulty
 
-    st.session_state.questions = []
-    st.session_state.answers = []
-    st.session_state.feedbacks = []
-    st.session_state.current_question_index = 0
+    jobs.cancel_session_jobs()
+    get_transcript().clear()
+    clear_turn_widgets()
+    st.session_state.pop("conversation", None)
 
 
 # =====================================================================
@@ -99,6 +95,11 @@ def evaluate_answer_and_generate_next(user_answer: str) -> Tuple[str, Optional[s
     Evaluate the user's answer using the selected persona and optionally
     generate the next question.
 
+    Low-effort answers (too short, nonsensical, repeated) get canned feedback
+    without an API call and the same question is asked again. With
+    `EVALUATION_PIPELINE="parallel"`, other answers are evaluated by
+    `evaluate_answer_parallel`.
+
     Args:
         user_answer: The user's free-form text answer.
 
@@ -107,65 +108,374 @@ def evaluate_answer_and_generate_next(user_answer: str) -> Tuple[str, Optional[s
         - feedback: The evaluation of the answer.
         - next_question: Generated follow-up question or None.
     """
-    logger.info("Evaluating user answer for question index %s", st.session_state.current_question_index)
+    if ENABLE_ANSWER_SCREENING:
+        screened = _screen_answer(user_answer)
+        if screened is not None:
+            return screened
 
-    # --- MOCK MODE ---
-    if USE_MOCK_API:
-        logger.debug("Using mock feedback and question.")
-        return "Mock feedback: good answer.", "Mock next question."
+    if EVALUATION_PIPELINE == "parallel":
+        return evaluate_answer_parallel(user_answer)
 
-    index = st.session_state.current_question_index
-    sys_instructions = load_prompt(SYSTEM_PROMPTS["answer_evaluator"])
+    transcript = get_transcript()
+    logger.info("Evaluating user answer for question index %s", transcript.answered_count)
 
+    sys_instructions = load_prompt(get_settings().system_prompts["answer_evaluator"])
     selected_persona = st.session_state.evaluation_style
-    persona_template = PERSONA_MAP.get(selected_persona, "Hiring Manager")
-
     settings = get_openai_settings()
+    note_input("answer", user_answer)
 
-    prompt_text = build_prompt(
+    response_format = {
+        "format": {
+            "type": "json_schema",
+            "name": "evaluation_result",
+            "strict": True,
+            "schema": _with_rubric({
+                "type": "object",
+                "properties": {
+                    "feedback": {"type": "string"},
+                    "next_question": {"type": ["string", "null"]},
+                },
+                "required": ["feedback", "next_question"],
+                "additionalProperties": False,
+            }),
+        }
+    }
+    raw_response = None
+    if CONVERSATION_MODE == "chained" and get_backend().supports_conversation_state:
+        raw_response = _evaluate_chained(user_answer, settings, sys_instructions, response_format)
+    if raw_response is None:
+        prompt_text = _build_evaluation_prompt(user_answer, settings)
+        logger.debug("Built evaluation prompt.")
+        logger.debug("Evaluation prompt content: %s", prompt_text)
+        raw_response = openai_call(
+            sys_instructions=sys_instructions,
+            prompt_text=prompt_text,
+            max_tokens=settings["max_tokens"],
+            structured_output=response_format,
+            task="evaluation",
+            metadata={"persona": selected_persona},
+            # The response includes the next question
+            use_cache=False,
+        )
+
+    logger.debug("Raw evaluation response: %s", raw_response)
+
+    feedback, next_question = parse_evaluation_response(raw_response)
+    record_scores(raw_response, selected_persona)
+
+    # Fallback to ensure continuity
+    if not next_question:
+        logger.info("Model did not provide next question — generating manually.")
+        next_question = generate_next_question()
+
+    return feedback, next_question
+
+
+def _evaluate_chained(
+    user_answer: str,
+    settings: dict,
+    sys_instructions: str,
+    response_format: dict,
+) -> Optional[str]:
+    """
+    Evaluate the answer as the next turn of the session's server-side conversation.
+
+    The first evaluation (or the first after a persona change) sends the full
+    prompt and starts a chain; later ones send only the current question and
+    answer with `previous_response_id`. The chain is kept in
+    `st.session_state.conversation`.
+
+    Returns:
+        Optional[str]: The raw response, or None if the chained call failed
+        (the chain is dropped and the caller falls back to a stateless call).
+    """
+    persona = st.session_state.evaluation_style
+    conversation = st.session_state.get("conversation") or {}
+    previous_id = conversation.get("response_id") if conversation.get("persona") == persona else None
+
+    if previous_id:
+        question = get_transcript().current_turn.question
+        prompt_text = load_prompt(
+            f"evaluation/{get_settings().chained_evaluation_template}",
+            question=question,
+            answer=user_answer,
+            max_tokens_eval=settings["max_tokens_eval"],
+            context_snippets=document_context(question, user_answer),
+        )
+    else:
+        prompt_text = _build_evaluation_prompt(user_answer, settings)
+
+    raw_response, response_id = openai_chained_call(
+        sys_instructions=sys_instructions,
+        prompt_text=prompt_text,
+        previous_response_id=previous_id,
+        max_tokens=settings["max_tokens"],
+        structured_output=response_format,
+        task="evaluation",
+        metadata={"persona": persona},
+        # The response includes the next question and becomes the head of this session's chain
+        use_cache=False,
+    )
+    if raw_response is None or response_id is None:
+        logger.info("Conversation chain unavailable, falling back to a stateless evaluation.")
+        st.session_state.pop("conversation", None)
+        return None
+
+    st.session_state.conversation = {"response_id": response_id, "persona": persona}
+    return raw_response
+
+
+def _screen_answer(user_answer: str) -> Optional[Tuple[str, str]]:
+    """
+    Pre-screen the answer locally.
+
+    Returns:
+        (feedback, same question) for a low-effort answer, otherwise None.
+    """
+    transcript = get_transcript()
+    question = transcript.current_turn.question
+    feedback = screen_answer(user_answer, question, transcript.answers())
+    if feedback is None:
+        return None
+
+    # Zero-cost ledger entry so reports show how many calls screening saved
+    ledger.record_call(
+        session_id=st.session_state.get("session_id"),
+        task="screened",
+        model=get_openai_settings()["model"],
+        input_tokens=0,
+        cached_tokens=0,
+        output_tokens=0,
+        latency_ms=0.0,
+        cost=0.0,
+    )
+    return feedback, question
+
+
+def _build_evaluation_prompt(user_answer: str, settings: dict, persona: Optional[str] = None) -> str:
+    """Build the evaluation prompt for the current question and a persona (default: the selected one)."""
+    transcript = get_transcript()
+    prompt_settings = get_settings()
+    persona_template = prompt_settings.persona_map.get(persona or st.session_state.evaluation_style, "Hiring Manager")
+    question = transcript.current_turn.question
+    return build_prompt(
         category="evaluation",
-        base_instructions=BASE_PROMPTS["evaluation"],
+        base_instructions=prompt_settings.base_prompts["evaluation"],
         technique=persona_template,
         job_title=st.session_state.job_title,
-        question=st.session_state.questions[index],
+        question=question,
         answer=user_answer,
         max_tokens_eval=settings["max_tokens_eval"],
-        previous_answers=st.session_state.answers[: index + 1],
-        previous_questions=st.session_state.questions,
+        context_snippets=document_context(question, user_answer),
+        rubric_dimensions=rubric_prompt_dimensions() if ENABLE_RUBRIC_SCORES else {},
+        previous_answers=transcript.answers(),
+        previous_questions=transcript.questions(),
         difficulty=st.session_state.difficulty,
         question_type=st.session_state.question_type,
     )
 
-    logger.debug("Built evaluation prompt.")
-    logger.debug("Evaluation prompt content: %s", prompt_text)
 
+def evaluate_answer_parallel(user_answer: str) -> Tuple[str, Optional[str]]:
+    """
+    Evaluate the answer and generate the next question as two concurrent calls.
+
+    The next question is generated on a background thread from the transcript
+    plus the new answer, while the feedback call runs on the current thread.
+    Each call has its own schema and token cap, so a turn takes as long as the
+    slower call, and the ledger reports the "feedback" and "next_question"
+    stages separately.
+
+    Args:
+        user_answer: The user's free-form text answer.
+
+    Returns:
+        (feedback, next_question)
+    """
+    persona = st.session_state.evaluation_style
+    feedbacks, next_question = evaluate_answer_fanout(user_answer, [persona])
+    return feedbacks[persona], next_question
+
+
+def evaluation_personas() -> List[str]:
+    """Return the personas to evaluate the next answer under: the selected style, then any compared styles."""
+    selected = st.session_state.get("evaluation_style", "Hiring Manager")
+    compared = st.session_state.get("fanout_personas") or []
+    return list(dict.fromkeys([selected, *compared]))
+
+
+def evaluate_answer_personas(user_answer: str, personas: List[str]) -> Tuple[Dict[str, str], Optional[str]]:
+    """
+    Evaluate the user's answer under several personas and generate the next question.
+
+    Low-effort answers get the same canned feedback for every persona, without
+    an API call (see `evaluate_answer_and_generate_next`).
+
+    Args:
+        user_answer: The user's free-form text answer.
+        personas: Persona names from the settings' `persona_map`, selected one first.
+
+    Returns:
+        (feedback per persona, next_question)
+    """
+    if ENABLE_ANSWER_SCREENING:
+        screened = _screen_answer(user_answer)
+        if screened is not None:
+            feedback, question = screened
+            return {persona: feedback for persona in personas}, question
+    return evaluate_answer_fanout(user_answer, personas)
+
+
+def evaluate_answer_fanout(user_answer: str, personas: List[str]) -> Tuple[Dict[str, str], Optional[str]]:
+    """
+    Run one feedback call per persona and the next-question call concurrently.
+
+    The persona section comes last in the evaluation prompt, so all feedback
+    calls share the system instructions and base instructions as a prefix; they
+    carry the same `prompt_cache_key` so the provider serves that prefix from
+    its prompt cache. The provider only caches a prefix once a request with it
+    has completed, so the first persona's feedback call runs on the current
+    thread before the other personas' calls are sent, concurrently, on the
+    shared executor. The next-question call runs alongside from the start.
+
+    Args:
+        user_answer: The user's free-form text answer.
+        personas: Persona names from the settings' `persona_map`, selected one first.
+
+    Returns:
+        (feedback per persona, next_question)
+    """
+    transcript = get_transcript()
+    pipeline = "parallel" if len(personas) == 1 else "fanout"
+    logger.info("Evaluating user answer for question index %s (%s: %s)", transcript.answered_count, pipeline, personas)
+    started = time.perf_counter()
+
+    question_future = submit(
+        _timed,
+        generate_question,
+        st.session_state.job_title,
+        st.session_state.question_type,
+        st.session_state.difficulty,
+        previous_questions=transcript.questions(),
+        previous_answers=transcript.answers() + [user_answer],
+        max_tokens=NEXT_QUESTION_MAX_TOKENS,
+        task="next_question",
+        context_snippets=document_context(transcript.current_turn.question, user_answer),
+    )
+
+    settings = get_openai_settings()
+    note_input("answer", user_answer)
+    sys_instructions = load_prompt(get_settings().system_prompts["answer_evaluator"])
+    cache_key = f"evaluation-{st.session_state.get('session_id')}" if len(personas) > 1 else None
     response_format = {
         "format": {
             "type": "json_schema",
-            "name": "evaluation_result",
+            "name": "feedback_result",
             "strict": True,
-            "schema": {
+            "schema": _with_rubric({
                 "type": "object",
-                "properties": {
-                    "feedback": {"type": "string"},
-                    "next_question": {"type": ["string", "null"]},
-                },
-                "required": ["feedback", "next_question"],
+                "properties": {"feedback": {"type": "string"}},
+                "required": ["feedback"],
                 "additionalProperties": False,
-            },
+            }),
         }
     }
-    raw_response = openai_call(
-        sys_instructions=sys_instructions,
-        prompt_text=prompt_text,
-        max_tokens=st.session_state["max_tokens_question_and_summary"],
-        structured_output=response_format,
+
+    def request_feedback(persona: str) -> Tuple[object, float]:
+        # Built on the calling thread so the ledger attributes the rendered templates to this call
+        return _timed(
+            openai_call,
+            sys_instructions=sys_instructions,
+            prompt_text=_build_evaluation_prompt(user_answer, settings, persona),
+            # Headroom for the JSON wrapper around the feedback text
+            max_tokens=settings["max_tokens_eval"] + 50,
+            structured_output=response_format,
+            task="feedback",
+            metadata={"persona": persona, "pipeline": pipeline},
+            prompt_cache_key=cache_key,
+        )
+
+    # The first call puts the shared prefix into the provider's prompt cache for the others
+    raw_responses = {personas[0]: request_feedback(personas[0])}
+    feedback_futures = {persona: submit(request_feedback, persona) for persona in personas[1:]}
+    for persona, future in feedback_futures.items():
+        try:
+            raw_responses[persona] = future.result()
+        except Exception as e:
+            logger.error(f"Feedback for persona {persona} failed: {e}")
+            raw_responses[persona] = ("", 0.0)
+
+    feedbacks = {persona: parse_evaluation_response(raw)[0] for persona, (raw, _) in raw_responses.items()}
+    record_scores(raw_responses[personas[0]][0], personas[0])
+    # The first call, then the slowest of the rest
+    timings = [ms for _, ms in raw_responses.values()]
+    feedback_ms = timings[0] + max(timings[1:], default=0.0)
+
+    try:
+        next_question, question_ms = question_future.result()
+    except Exception as e:
+        logger.error(f"Next question generation failed: {e}")
+        next_question, question_ms = QUESTION_FAILED, 0.0
+    next_question = _bank_fallback(
+        next_question, st.session_state.job_title, st.session_state.question_type, st.session_state.difficulty
     )
 
-    logger.debug("Raw evaluation response: %s", raw_response)
+    logger.info(
+        "%s evaluation: feedback %.0f ms, next question %.0f ms, turn %.0f ms",
+        pipeline.capitalize(), feedback_ms, question_ms, (time.perf_counter() - started) * 1000,
+    )
+    return feedbacks, next_question
+
+
+def _with_rubric(schema: dict) -> dict:
+    """Add the rubric `scores` field to an evaluation output schema (if rubric scores are enabled)."""
+    if ENABLE_RUBRIC_SCORES:
+        schema["properties"]["scores"] = rubric_schema()
+        schema["required"].append("scores")
+    return schema
+
+
+def record_scores(raw_response: str, persona: str) -> Optional[List[int]]:
+    """
+    Append the rubric scores of an evaluation response to the score history.
+
+    Returns:
+        Optional[List[int]]: The scores, or None if the response had none.
+    """
+    if not ENABLE_RUBRIC_SCORES:
+        return None
+    scores = parse_scores(raw_response)
+    if scores is None:
+        logger.info("Evaluation returned no rubric scores.")
+        return None
+    try:
+        get_history().append(get_user_id(), scores, st.session_state.get("question_type"), persona)
+    except OSError as e:
+        logger.warning(f"Could not record rubric scores: {e}")
+    return scores
 
+
+def _timed(fn, *args, **kwargs) -> Tuple[object, float]:
+    """Call `fn` and return (result, elapsed milliseconds)."""
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+@tracing.traced("parse_evaluation")
+def parse_evaluation_response(raw_response: str) -> Tuple[str, Optional[str]]:
+    """
+    Parse the structured evaluation output returned by the LLM.
+
+    Args:
+        raw_response: Raw model output (JSON with "feedback" and "next_question").
+
+    Returns:
+        (feedback, next_question)
+        - feedback: The evaluation text, or an error message if parsing failed.
+        - next_question: The follow-up question, or None if missing.
+    """
     try:
-        data = json.loads(raw_response)
+        data = parse_json(raw_response)
         feedback = data.get("feedback", "No feedback returned.")
         next_question = data.get("next_question") or None
     except Exception as e:
@@ -173,11 +483,6 @@ def evaluate_answer_and_generate_next(user_answer: str) -> Tuple[str, Optional[s
         feedback = "Error parsing model response."
         next_question = None
 
-    # Fallback to ensure continuity
-    if not next_question:
-        logger.info("Model did not provide next question — generating manually.")
-        next_question = generate_next_question()
-
     return feedback, next_question
 
 
@@ -189,34 +494,149 @@ def generate_next_question() -> str:
     """
     Generate the next interview question using the configured prompt technique.
 
+    The first question is drawn from the question bank when it has a pool for
+    the interview settings and no documents were uploaded (never repeating a
+    question already served in this session). If live generation fails, the
+    bank is used as a fallback.
+
     Returns:
         The generated question as a string.
     """
-    try:
-        # --- MOCK MODE ---
-        if USE_MOCK_API:
-            index = len(st.session_state.questions)
-            return mock_questions[index % len(mock_questions)]
+    transcript = get_transcript()
+    job_title = st.session_state.job_title
+    question_type = st.session_state.question_type
+    difficulty = st.session_state.difficulty
+
+    if len(transcript) == 0 and not st.session_state.get("documents"):
+        question = draw_bank_question(job_title, question_type, difficulty)
+        if question:
+            logger.info("First question served from the question bank")
+            return question
+
+    previous_questions = transcript.questions()
+    previous_answers = transcript.answers()
+    if previous_questions:
+        context_snippets = document_context(previous_questions[-1], *previous_answers[-1:])
+    else:
+        context_snippets = first_question_context(job_title, question_type)
+
+    question = generate_question(
+        job_title,
+        question_type,
+        difficulty,
+        previous_questions=previous_questions,
+        previous_answers=previous_answers,
+        context_snippets=context_snippets,
+    )
+    return _bank_fallback(question, job_title, question_type, difficulty)
+
+
+def draw_bank_question(job_title: str, question_type: str, difficulty: str) -> Optional[str]:
+    """
+    Draw a question from the question bank that this session has not seen yet.
+
+    Returns:
+        Optional[str]: The question, or None if there is no bank or matching pool.
+    """
+    bank = get_bank()
+    if bank is None:
+        return None
+    served = st.session_state.setdefault("bank_served", [])
+    question = bank.draw(job_title, question_type, difficulty, exclude=set(served) | set(get_transcript().questions()))
+    if question:
+        served.append(question)
+    return question
+
+
+def _bank_fallback(question: str, job_title: str, question_type: str, difficulty: str) -> str:
+    """Replace a failed generation with a bank question (degraded mode) if one is available."""
+    if question != QUESTION_FAILED:
+        return question
+    fallback = draw_bank_question(job_title, question_type, difficulty)
+    if fallback:
+        logger.warning("Question generation failed; serving a question bank fallback")
+        return fallback
+    return question
+
+
+def build_question_prompt(
+    job_title: str,
+    question_type: str,
+    difficulty: str,
+    previous_questions: Optional[List[str]] = None,
+    previous_answers: Optional[List[str]] = None,
+    technique: Optional[str] = None,
+    context_snippets: Optional[List[str]] = None,
+) -> str:
+    """
+    Build the question generation prompt (base instructions + technique).
+
+    Args:
+        technique: Question technique template (defaults to the active question technique).
+        context_snippets: Excerpts of the uploaded documents to ground the question in.
+
+    Returns:
+        str: Prompt body without the MODE header.
+    """
+    prompt_settings = get_settings()
+    return build_prompt(
+        category="questions",
+        base_instructions=prompt_settings.base_prompts["question"],
+        technique=technique or prompt_settings.active_question_technique,
+        job_title=job_title,
+        question_type=question_type,
+        difficulty=difficulty,
+        previous_answers=previous_answers or [],
+        previous_questions=previous_questions or [],
+        context_snippets=context_snippets or [],
+    )
+
+
+def generate_question(
+    job_title: str,
+    question_type: str,
+    difficulty: str,
+    previous_questions: Optional[List[str]] = None,
+    previous_answers: Optional[List[str]] = None,
+    max_tokens: Optional[int] = None,
+    task: str = "question",
+    technique: Optional[str] = None,
+    context_snippets: Optional[List[str]] = None,
+) -> str:
+    """
+    Generate an interview question for explicit interview settings.
+
+    Unlike `generate_next_question`, this does not read the interview settings
+    or transcript from session state, so it can run before they are set.
+
+    Args:
+        job_title: Position being interviewed for.
+        question_type: Behavioral, Technical, or Role-specific.
+        difficulty: Selected difficulty level.
+        previous_questions: Questions already asked.
+        previous_answers: Answers given so far.
+        max_tokens: Output token cap (defaults to the question/summary setting).
+        task: Task name recorded in the usage ledger.
+        technique: Question technique template (defaults to the active question technique).
+        context_snippets: Excerpts of the uploaded documents (see `document_context`).
 
+    Returns:
+        The generated question as a string.
+    """
+    technique = technique or get_settings().active_question_technique
+    try:
         # --- Load system instructions ---
-        sys_instructions = load_prompt(SYSTEM_PROMPTS["question_generator"])
+        sys_instructions = load_prompt(get_settings().system_prompts["question_generator"])
 
         # --- Build full prompt ---
-        prompt_content = build_prompt(
-            category="questions",
-            base_instructions=BASE_PROMPTS["question"],
-            technique=ACTIVE_QUESTION_TECHNIQUE,
-            job_title=st.session_state.job_title,
-            question_type=st.session_state.question_type,
-            difficulty=st.session_state.difficulty,
-            previous_answers=st.session_state.answers,
-            previous_questions=st.session_state.questions,
+        prompt_content = build_question_prompt(
+            job_title, question_type, difficulty, previous_questions, previous_answers, technique, context_snippets
         )
         prompt_text = f"MODE: generate_question\n{prompt_content}"
 
         if not prompt_text:
             logger.error("Failed to build question prompt")
-            return "Could not generate question. Please try again."
+            return QUESTION_FAILED
 
         # --- Structured output for consistent parsing ---
         structured_output = {
@@ -237,24 +657,161 @@ def generate_next_question() -> str:
         response = openai_call(
             sys_instructions=sys_instructions,
             prompt_text=prompt_text,
-            max_tokens=st.session_state["max_tokens_question_and_summary"],
+            max_tokens=max_tokens or get_openai_settings()["max_tokens"],
             structured_output=structured_output,
+            task=task,
+            metadata={"technique": technique},
+            # Each interview gets its own questions, even for identical settings
+            use_cache=False,
         )
 
         # --- Parse JSON safely ---
+        if response == CALL_FAILED:
+            return QUESTION_FAILED
         if response:
-            try:
-                data = json.loads(response)
-                return data.get("question", "Could not generate question. Please try again.")
-            except Exception as e:
-                logger.error(f"Failed to parse question JSON: {e}")
-                return response
+            with tracing.span("parse_question"):
+                try:
+                    data = parse_json(response)
+                except json.JSONDecodeError as e:
+                    # A question cut off mid-sentence is dropped, not shown
+                    repaired = repair_json(response)
+                    if repaired is None:
+                        logger.error(f"Failed to parse question JSON: {e}")
+                        return QUESTION_FAILED
+                    data = parse_json(repaired)
+                    logger.info("Repaired question JSON.")
+            question = data.get("question") if isinstance(data, dict) else None
+            if isinstance(question, str) and question.strip():
+                return question
+            logger.error(f"Question JSON has no question: {response!r}")
+
+        return QUESTION_FAILED
+
+    except Exception as e:
+        logger.error(f"Error in generate_question: {e}")
+        return QUESTION_FAILED
+
+
+# =====================================================================
+# DOCUMENT CONTEXT
+# =====================================================================
+
+def document_context(*query_parts: Optional[str]) -> List[str]:
+    """
+    Return the excerpts of the session's uploaded documents that best match the query.
+
+    Args:
+        *query_parts: Texts to match, typically the current question and answer.
+
+    Returns:
+        List[str]: Excerpts for the `context_snippets` template variable (empty without documents).
+    """
+    index = st.session_state.get("documents")
+    if not index:
+        return []
+    with tracing.span("retrieve", chunks=len(index)) as retrieve_span:
+        snippets = index.snippets(query_text(query_parts))
+        retrieve_span.set(snippets=len(snippets), chars=sum(len(snippet) for snippet in snippets))
+    return snippets
+
+
+def first_question_context(job_title: str, question_type: str) -> List[str]:
+    """Return document excerpts for the first question, which has no question or answer to match yet."""
+    return document_context(job_title, question_type)
+
+
+def first_question_from_bank(job_title: str, question_type: str, difficulty: str) -> bool:
+    """Return True if the first question will be drawn from the question bank (never with uploaded documents)."""
+    if st.session_state.get("documents"):
+        return False
+    bank = get_bank()
+    return bank is not None and bank.has_pool(job_title, question_type, difficulty)
+
+
+# =====================================================================
+# SPECULATIVE FIRST QUESTION
+# =====================================================================
 
-        return "Could not generate question. Please try again."
+def _speculation_key(job_title: str, question_type: str, difficulty: str) -> Tuple[str, str, str]:
+    return (job_title.strip().lower(), question_type, difficulty)
 
+
+def prefetch_first_question(job_title: str, question_type: str, difficulty: str) -> None:
+    """
+    Start generating the first question in the background, typically while
+    the job title is still being validated.
+
+    The result is kept for these settings until `take_prefetched_question`
+    claims it, so it also serves a restart after clarifying the same title.
+    Any earlier prefetch for other settings is discarded.
+
+    Args:
+        job_title: Position being interviewed for.
+        question_type: Behavioral, Technical, or Role-specific.
+        difficulty: Selected difficulty level.
+    """
+    if not SPECULATIVE_FIRST_QUESTION or first_question_from_bank(job_title, question_type, difficulty):
+        return
+
+    key = _speculation_key(job_title, question_type, difficulty)
+    pending = st.session_state.get("prefetched_question")
+    if pending and pending["key"] == key:
+        return
+
+    logger.info("Prefetching first question for job_title=%s", job_title)
+    st.session_state.prefetched_question = {
+        "key": key,
+        "future": submit(
+            generate_question,
+            job_title.strip(),
+            question_type,
+            difficulty,
+            context_snippets=first_question_context(job_title, question_type),
+        ),
+    }
+
+
+def store_prefetched_question(job_title: str, question_type: str, difficulty: str, question: str) -> None:
+    """
+    Keep an already generated first question for these settings, to be claimed
+    by `take_prefetched_question` like a background prefetch.
+    """
+    st.session_state.prefetched_question = {
+        "key": _speculation_key(job_title, question_type, difficulty),
+        "question": question,
+    }
+
+
+def take_prefetched_question() -> Optional[str]:
+    """
+    Claim the prefetched first question if it matches the current interview settings.
+
+    Waits for the background call if it is still running. A prefetch for other
+    settings is dropped.
+
+    Returns:
+        The prefetched question, or None if there is none for these settings.
+    """
+    pending = st.session_state.pop("prefetched_question", None)
+    if not pending:
+        return None
+
+    key = _speculation_key(
+        st.session_state.job_title, st.session_state.question_type, st.session_state.difficulty
+    )
+    if pending["key"] != key:
+        logger.info("Discarding prefetched question for different settings.")
+        if "future" in pending:
+            pending["future"].cancel()
+        return None
+
+    if "question" in pending:
+        return pending["question"]
+    try:
+        return pending["future"].result()
     except Exception as e:
-        logger.error(f"Error in generate_next_question: {e}")
-        return "Could not generate question. Please try again."
+        logger.error(f"Prefetched question failed: {e}")
+        return None
 
 
 # =====================================================================
@@ -271,17 +828,15 @@ def generate_interview_summary() -> str:
     """
     logger.info("Generating interview summary.")
 
-    if USE_MOCK_API:
-        return "Mock summary: User performed well overall, needs improvement in problem-solving."
-
-    sys_instructions = load_prompt(SYSTEM_PROMPTS["summary_generator"])
+    sys_instructions = load_prompt(get_settings().system_prompts["summary_generator"])
 
-    questions_and_answers = list(zip(st.session_state.questions, st.session_state.answers))
+    questions_and_answers = get_transcript().answered_pairs()
 
+    prompt_settings = get_settings()
     prompt_text = build_prompt(
         category="summary",
-        base_instructions=BASE_PROMPTS["summary"],
-        technique=ACTIVE_SUMMARY_TECHNIQUE,
+        base_instructions=prompt_settings.base_prompts["summary"],
+        technique=prompt_settings.active_summary_technique,
         questions_and_answers=questions_and_answers,
     )
 
@@ -289,13 +844,15 @@ def generate_interview_summary() -> str:
 
     result = openai_call(
         sys_instructions=sys_instructions,
-        max_tokens=st.session_state["max_tokens_question_and_summary"],
+        max_tokens=get_openai_settings()["max_tokens"],
         prompt_text=prompt_text,
+        task="summary",
     )
 
     return result.strip()
 
 
+@tracing.traced("parse_summary")
 def parse_summary(summary_text: str) -> Tuple[str, List[str]]:
     """
     Parse the JSON-formatted interview summary returned by the LLM.
@@ -311,7 +868,15 @@ def parse_summary(summary_text: str) -> Tuple[str, List[str]]:
     logger.info("Parsing interview summary.")
 
     try:
-        data = json.loads(summary_text)
+        try:
+            data = parse_json(summary_text)
+        except json.JSONDecodeError:
+            # A summary cut off at the token cap keeps its completed text and recommendations
+            repaired = repair_json(summary_text, close_strings=True)
+            if repaired is None:
+                raise
+            data = parse_json(repaired)
+            logger.info("Repaired truncated summary JSON.")
         summary = data.get("summary", "No summary provided.")
         recommendations = data.get("recommendations", [])
 
@@ -0,0 +1,189 @@
+"""
+job_titles.py
+
+Bundled job-title dictionary with a trigram index for fuzzy lookup.
+
+Known titles and close misspellings are accepted locally, so only unknown
+titles need the LLM validator, and near matches are offered as "did you mean"
+suggestions in the clarification UI. The index is built lazily on first use
+from `JOB_TITLES_PATH` (one title per line, `#` comments allowed).
+"""
+
+import heapq
+import logging
+import re
+import time
+from collections import Counter, defaultdict
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, List, Optional, Set, Tuple
+
+from modules.config import JOB_TITLES_PATH
+
+logger = logging.getLogger(__name__)
+
+# Leading words that qualify a title without changing the occupation.
+SENIORITY_PREFIXES = {"senior", "sr", "junior", "jr", "lead", "principal", "staff", "entry", "level", "mid", "trainee"}
+
+# Fuzzy lookups remembered per index (cleared when full).
+MATCH_CACHE_SIZE = 4096
+
+# Minimum trigram (Dice) similarity for a title to be a suggestion candidate.
+MIN_SIMILARITY = 0.4
+
+_NON_ALNUM = re.compile(r"[^a-z0-9+#]+")
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return _NON_ALNUM.sub(" ", title.lower()).strip()
+
+
+def strip_seniority(normalized: str) -> str:
+    """Remove leading seniority words ("senior", "jr", ...) from a normalized title."""
+    words = normalized.split()
+    while len(words) > 1 and words[0] in SENIORITY_PREFIXES:
+        words.pop(0)
+    return " ".join(words)
+
+
+def trigrams(normalized: str) -> Set[str]:
+    """Return the character trigrams of a normalized title, padded at word boundaries."""
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance between `a` and `b`, computed only within `limit` of the diagonal.
+
+    Returns:
+        int: The distance, or `limit + 1` if it is larger than `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, start=1):
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= limit else over
+        for j in range(low, high + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != b[j - 1]), over)
+        if min(current[low - 1:high + 1]) > limit:
+            return over
+        previous = current
+    return previous[-1]
+
+
+def max_typos(normalized: str) -> int:
+    """Number of typos tolerated for a title of this length."""
+    if len(normalized) < 5:
+        return 0
+    if len(normalized) < 10:
+        return 1
+    return 2
+
+
+class JobTitleIndex:
+    """
+    Trigram index over job titles.
+
+    Args:
+        titles: Canonical job titles.
+    """
+
+    def __init__(self, titles: List[str]):
+        self.titles: List[str] = []
+        self._normalized: List[str] = []
+        self._exact: Dict[str, int] = {}
+        self._grams: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._matches: Dict[str, Optional[str]] = {}
+
+        for title in titles:
+            normalized = normalize_title(title)
+            if not normalized or normalized in self._exact:
+                continue
+            index = len(self.titles)
+            self.titles.append(title)
+            self._normalized.append(normalized)
+            self._exact[normalized] = index
+            grams = trigrams(normalized)
+            self._grams.append(grams)
+            for gram in grams:
+                self._postings[gram].append(index)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def _candidates(self, normalized: str, limit: int) -> List[Tuple[float, int]]:
+        """Return up to `limit` (similarity, title index) pairs for titles sharing trigrams, best first."""
+        grams = trigrams(normalized)
+        shared = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in grams))
+        return heapq.nlargest(
+            limit,
+            ((2 * count / (len(grams) + len(self._grams[index])), index) for index, count in shared.items()),
+        )
+
+    def match(self, title: str) -> Optional[str]:
+        """
+        Return the canonical title if `title` is a known title or a close misspelling of one.
+
+        Seniority prefixes are ignored, so "Senior Sofware Engineer" matches
+        "Software Engineer".
+        """
+        normalized = normalize_title(title)
+        if normalized in self._matches:
+            return self._matches[normalized]
+        match = self._match(normalized)
+        if len(self._matches) >= MATCH_CACHE_SIZE:
+            self._matches.clear()
+        self._matches[normalized] = match
+        return match
+
+    def _match(self, normalized: str) -> Optional[str]:
+        for query in dict.fromkeys((normalized, strip_seniority(normalized))):
+            if not query:
+                continue
+            exact = self._exact.get(query)
+            if exact is not None:
+                return self.titles[exact]
+
+            limit = max_typos(query)
+            if not limit:
+                continue
+            for similarity, index in self._candidates(query, 5):
+                if similarity < MIN_SIMILARITY:
+                    break
+                candidate = self._normalized[index]
+                # Typos rarely hit the first letter; requiring it avoids e.g. "purse" -> "nurse"
+                if candidate[0] == query[0] and edit_distance(query, candidate, limit) <= limit:
+                    return self.titles[index]
+        return None
+
+    def suggest(self, title: str, limit: int = 3) -> List[str]:
+        """Return up to `limit` known titles similar to `title`, most similar first."""
+        normalized = strip_seniority(normalize_title(title))
+        if not normalized:
+            return []
+        return [
+            self.titles[index]
+            for similarity, index in self._candidates(normalized, limit)
+            if similarity >= MIN_SIMILARITY
+        ]
+
+
+@lru_cache(maxsize=1)
+def get_index(path: str = JOB_TITLES_PATH) -> JobTitleIndex:
+    """Load and index the bundled job titles (once per process)."""
+    started = time.perf_counter()
+    try:
+        with open(path, encoding="utf-8") as f:
+            titles = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    except OSError as e:
+        logger.warning(f"Could not load job titles from {path}: {e}")
+        titles = []
+    index = JobTitleIndex(titles)
+    logger.info(f"Indexed {len(index)} job titles in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return index
@@ -0,0 +1,293 @@
+"""
+jobs.py
+
+Background jobs for LLM work started from the interview screen.
+
+A job runs a function on a bounded per-process pool (`JOB_WORKERS` threads)
+and is identified by an ID that the session keeps. The UI submits a job,
+shows its progress, and polls it from a fragment that reruns every
+`JOB_POLL_INTERVAL_SECONDS`. When the job is done, its result is applied on
+the script thread, so the page never waits on the model.
+
+Cancellation is cooperative. A queued job never starts. A running job stops
+before its next LLM request, because `check_cancelled` raises `JobCancelled`
+from `_request_llm`. A request already in flight finishes, but its result is
+discarded.
+
+Token usage is counted on the job while it runs. When the job ends, the usage
+is added to the session totals (`input_tokens_total`, `output_tokens_total`,
+`cost_so_far`), including the usage of a cancelled job, since it was billed.
+Work the job started but did not wait for (e.g. a prefetched first question)
+adds its later usage to the session totals directly.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import streamlit as st
+
+from modules import tracing
+from modules.config import JOB_WORKERS
+from modules.errors import JobCancelled
+from modules.executor import in_session
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Finished jobs nobody collected (e.g. the tab was closed) are dropped after this long.
+_FINISHED_JOB_TTL_SECONDS = 600
+
+_current_job: contextvars.ContextVar[Optional["Job"]] = contextvars.ContextVar("current_job", default=None)
+
+# Session totals are also updated from job threads.
+_totals_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------
+# Jobs
+# ---------------------------------------------------------------------
+class Job:
+    """
+    One unit of background LLM work.
+
+    Attributes:
+        id: Job ID, kept in the session's `jobs` list.
+        kind: What the job does (e.g. "evaluate"); the UI applies the result by kind.
+        status: One of QUEUED, RUNNING, DONE, FAILED, CANCELLED.
+        result: Return value of the job function (when DONE).
+        error: Exception raised by the job function (when FAILED).
+    """
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.status = QUEUED
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.submitted = time.time()
+        self.finished_at: Optional[float] = None
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost = 0.0
+        # Set once the usage has been added to the session totals
+        self._settled = False
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._future: Optional[Future] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def elapsed(self) -> float:
+        """Seconds since the job was submitted (until it finished)."""
+        return (self.finished_at or time.time()) - self.submitted
+
+    def cancel(self) -> bool:
+        """
+        Ask the job to stop. Returns False if it had already finished.
+        """
+        with self._lock:
+            if self.finished:
+                return False
+            self._cancel.set()
+            if self._future is not None and self._future.cancel():
+                # Never started
+                self._finish(CANCELLED)
+        logger.info(f"Cancelled job {self.id} ({self.kind})")
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job has finished. Returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def add_usage(self, input_tokens: int, output_tokens: int, cost: float) -> bool:
+        """
+        Count usage on the job. Returns False if the job's usage was already
+        added to the session totals, so the caller has to add it there itself.
+        """
+        with self._lock:
+            if self._settled:
+                return False
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.cost += cost
+            return True
+
+    def _settle(self) -> None:
+        with self._lock:
+            self._settled = True
+            usage = (self.input_tokens, self.output_tokens, self.cost)
+        add_to_totals(*usage)
+
+    def _finish(self, status: str, result: Any = None, error: Optional[BaseException] = None) -> None:
+        # Called with self._lock held
+        self.status = CANCELLED if self._cancel.is_set() else status
+        if self.status == DONE:
+            self.result = result
+        elif self.status == FAILED:
+            self.error = error
+        self.finished_at = time.time()
+        self._done.set()
+
+
+# ---------------------------------------------------------------------
+# Process-wide registry and pool
+# ---------------------------------------------------------------------
+_jobs: Dict[str, Job] = {}
+_registry_lock = threading.Lock()
+_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _registry_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="llm-job")
+    return _pool
+
+
+def _prune() -> None:
+    cutoff = time.time() - _FINISHED_JOB_TTL_SECONDS
+    with _registry_lock:
+        for job_id in [i for i, job in _jobs.items() if job.finished and job.finished_at < cutoff]:
+            del _jobs[job_id]
+
+
+def submit_job(kind: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Job:
+    """
+    Run `fn(*args, **kwargs)` as a background job of the current session.
+
+    The job sees the session's `st.session_state` and the caller's context
+    variables (prompt versions, trace), like `executor.submit`.
+
+    Args:
+        kind: What the job does; the UI applies the result by kind.
+        fn: Job function.
+
+    Returns:
+        Job: The submitted job; its ID is added to the session's `jobs` list.
+    """
+    _prune()
+    job = Job(kind)
+    with _registry_lock:
+        _jobs[job.id] = job
+    st.session_state.setdefault("jobs", []).append(job.id)
+    with job._lock:
+        job._future = _get_pool().submit(in_session(_run, job, fn, args, kwargs))
+    logger.info(f"Submitted job {job.id} ({kind})")
+    return job
+
+
+def _run(job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+    with job._lock:
+        if job.finished:
+            return
+        if job.cancelled:
+            job._finish(CANCELLED)
+            return
+        job.status = RUNNING
+    token = _current_job.set(job)
+    status, result, error = DONE, None, None
+    try:
+        with tracing.trace(f"job:{job.kind}", job_id=job.id):
+            result = fn(*args, **kwargs)
+    except JobCancelled:
+        status = CANCELLED
+    except BaseException as e:
+        # Including Streamlit control flow exceptions: a job must always finish
+        logger.exception(f"Job {job.id} ({job.kind}) failed: {e!r}")
+        status, error = FAILED, e
+    finally:
+        _current_job.reset(token)
+        job._settle()
+    with job._lock:
+        job._finish(status, result, error)
+    logger.info(f"Job {job.id} ({job.kind}) {job.status} after {job.elapsed():.2f} s")
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    """Return a job by ID, or None if it is unknown or was forgotten."""
+    with _registry_lock:
+        return _jobs.get(job_id)
+
+
+def session_jobs() -> List[Job]:
+    """Return the current session's jobs that have not been forgotten, oldest first."""
+    jobs = [get_job(job_id) for job_id in st.session_state.get("jobs", [])]
+    return [job for job in jobs if job is not None]
+
+
+def forget(job: Job) -> None:
+    """Drop a job from the registry and the session (after its result was applied)."""
+    with _registry_lock:
+        _jobs.pop(job.id, None)
+    ids = st.session_state.get("jobs", [])
+    if job.id in ids:
+        ids.remove(job.id)
+
+
+def cancel_session_jobs() -> int:
+    """
+    Cancel and forget all of the current session's jobs.
+
+    Returns:
+        int: Number of jobs that were still queued or running.
+    """
+    count = 0
+    for job in session_jobs():
+        count += job.cancel()
+        forget(job)
+    st.session_state["jobs"] = []
+    return count
+
+
+# ---------------------------------------------------------------------
+# Hooks for LLM calls
+# ---------------------------------------------------------------------
+def check_cancelled() -> None:
+    """Raise `JobCancelled` if the calling code runs in a cancelled job."""
+    job = _current_job.get()
+    if job is not None and job.cancelled:
+        raise JobCancelled(f"Job {job.id} ({job.kind}) was cancelled")
+
+
+def record_usage(input_tokens: int, output_tokens: int, cost: float) -> None:
+    """
+    Count the usage of one LLM call.
+
+    Inside a job, the usage is added to the job and reaches the session totals
+    when the job ends. Outside a job, or after the job it was started from has
+    ended, it is added to the session totals directly.
+    """
+    job = _current_job.get()
+    if job is None or not job.add_usage(input_tokens, output_tokens, cost):
+        add_to_totals(input_tokens, output_tokens, cost)
+
+
+def add_to_totals(input_tokens: int, output_tokens: int, cost: float) -> None:
+    """Add usage to the session's token and cost totals."""
+    ss = st.session_state
+    with _totals_lock:
+        ss["input_tokens_total"] = ss.get("input_tokens_total", 0) + input_tokens
+        ss["output_tokens_total"] = ss.get("output_tokens_total", 0) + output_tokens
+        ss["cost_so_far"] = ss.get("cost_so_far", 0.0) + cost
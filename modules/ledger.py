@@ -0,0 +1,349 @@
+"""
+ledger.py
+
+Compact usage ledger for LLM calls.
+
+Every call made through `modules.utils` is appended as one JSON line with
+session ID, task, the templates that built the prompt, model, token counts,
+latency and cost. Template renders are noted per thread and attached to the
+next call made from that thread, so callers do not have to pass template names
+around explicitly.
+
+Run `python -m modules.ledger report` to aggregate the ledger by template,
+persona and task and to list variables that are rendered more than once.
+"""
+
+import argparse
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from modules.config import ENABLE_USAGE_LEDGER, USAGE_LEDGER_PATH
+
+logger = logging.getLogger(__name__)
+
+# Variables shorter than this are too generic ("Easy", "Technical") to flag as repeated.
+REPEAT_MIN_CHARS = 12
+
+# Renders that never reach a call (benchmarks, previews) are dropped past this size.
+MAX_PENDING_RENDERS = 32
+
+_pending = threading.local()
+_write_lock = threading.Lock()
+_collector: contextvars.ContextVar[Optional[List[Dict[str, Any]]]] = contextvars.ContextVar(
+    "usage_collector", default=None
+)
+
+
+# ---------------------------------------------------------------------
+# Render tracking
+# ---------------------------------------------------------------------
+def find_repeated_variables(rendered: str, variables: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Count how often each template variable's value appears in the rendered text.
+
+    Strings are matched directly; for lists, the most repeated string item is
+    reported under the list's name (e.g. `previous_answers` already holding the
+    current answer).
+
+    Args:
+        rendered: Fully rendered template text.
+        variables: Variables passed to the template.
+
+    Returns:
+        Dict[str, int]: Variable name -> occurrences, only for values seen more than once.
+    """
+    repeated: Dict[str, int] = {}
+    for name, value in variables.items():
+        if isinstance(value, str):
+            candidates = [value]
+        elif isinstance(value, (list, tuple)):
+            candidates = [item for item in value if isinstance(item, str)]
+        else:
+            continue
+
+        count = max(
+            (rendered.count(item) for item in candidates if len(item) >= REPEAT_MIN_CHARS),
+            default=0,
+        )
+        if count > 1:
+            repeated[name] = count
+    return repeated
+
+
+def note_render(template_name: str, rendered: str, variables: Dict[str, Any]) -> None:
+    """
+    Remember a template render so the next LLM call in this thread is attributed to it.
+
+    Args:
+        template_name: Template path relative to the prompt directory.
+        rendered: Rendered text.
+        variables: Variables used for rendering.
+    """
+    if not ENABLE_USAGE_LEDGER:
+        return
+
+    renders = getattr(_pending, "renders", None)
+    if renders is None or len(renders) >= MAX_PENDING_RENDERS:
+        renders = []
+        _pending.renders = renders
+
+    renders.append({
+        "tpl": template_name,
+        "chars": len(rendered),
+        "rep": find_repeated_variables(rendered, variables),
+    })
+
+
+def pending_templates() -> List[str]:
+    """Return the templates noted in the current thread for the next call, without clearing them."""
+    return [r["tpl"] for r in getattr(_pending, "renders", None) or []]
+
+
+def pop_renders() -> List[Dict[str, Any]]:
+    """Return and clear the renders noted in the current thread."""
+    renders = getattr(_pending, "renders", None) or []
+    _pending.renders = []
+    return renders
+
+
+# ---------------------------------------------------------------------
+# Call recording
+# ---------------------------------------------------------------------
+def record_call(
+    session_id: Optional[str],
+    task: str,
+    model: str,
+    input_tokens: int,
+    cached_tokens: int,
+    output_tokens: int,
+    latency_ms: float,
+    cost: float,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Append one LLM call to the ledger file.
+
+    Templates rendered in this thread since the previous call are attached
+    to the record and cleared.
+
+    Returns:
+        Optional[dict]: The written record, or None if the ledger is disabled.
+    """
+    renders = pop_renders()
+    collector = _collector.get()
+    if not ENABLE_USAGE_LEDGER and collector is None:
+        return None
+
+    record: Dict[str, Any] = {
+        "ts": round(time.time(), 3),
+        "sid": session_id,
+        "task": task,
+        "model": model,
+        "in": input_tokens,
+        "cin": cached_tokens,
+        "out": output_tokens,
+        "ms": round(latency_ms, 1),
+        "cost": round(cost, 8),
+        "tpl": [r["tpl"] for r in renders],
+        "chars": {r["tpl"]: r["chars"] for r in renders},
+    }
+    repeated = {r["tpl"]: r["rep"] for r in renders if r["rep"]}
+    if repeated:
+        record["rep"] = repeated
+    if metadata:
+        record.update({k: v for k, v in metadata.items() if v is not None})
+
+    if collector is not None:
+        collector.append(record)
+    if not ENABLE_USAGE_LEDGER:
+        return record
+
+    try:
+        with _write_lock:
+            os.makedirs(os.path.dirname(USAGE_LEDGER_PATH) or ".", exist_ok=True)
+            with open(USAGE_LEDGER_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning(f"Could not write usage ledger: {e}")
+
+    return record
+
+
+@contextmanager
+def collect_usage() -> Iterator[List[Dict[str, Any]]]:
+    """
+    Collect the records of calls made in this context (also when the ledger file is disabled).
+
+    Work submitted through `modules.executor` inherits the collector.
+
+    Yields:
+        List[dict]: Records appended as calls complete.
+    """
+    records: List[Dict[str, Any]] = []
+    token = _collector.set(records)
+    try:
+        yield records
+    finally:
+        _collector.reset(token)
+
+
+def read_ledger(path: str = USAGE_LEDGER_PATH, last: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Load records from a ledger file, skipping malformed lines.
+
+    Args:
+        path: Ledger file path.
+        last: Only read the last this many lines (the ledger is never rotated;
+            the file is read backwards from its end, so the cost does not grow with it).
+
+    Returns:
+        List[dict]: Ledger records in file order.
+    """
+    records: List[Dict[str, Any]] = []
+    if not os.path.exists(path):
+        return records
+
+    if last is None:
+        with open(path, encoding="utf-8") as f:
+            lines: Iterable[str] = list(f)
+    else:
+        lines = _tail_lines(path, last)
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return records
+
+
+def _tail_lines(path: str, count: int, block_size: int = 1 << 16) -> List[str]:
+    if count <= 0:
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        # One extra newline: the first line of the tail may be cut
+        while position > 0 and data.count(b"\n") <= count:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    if position > 0:
+        lines = lines[1:]
+    return lines[-count:]
+
+
+# ---------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------
+def _empty_bucket() -> Dict[str, float]:
+    return {"calls": 0, "in": 0.0, "cin": 0.0, "out": 0.0, "ms": 0.0, "cost": 0.0}
+
+
+def aggregate(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate ledger records by template, persona and task.
+
+    Input tokens and cost of a call are split across its templates in
+    proportion to each template's rendered size, so shrinking a large
+    template shows up directly in its share.
+
+    Args:
+        records: Ledger records.
+
+    Returns:
+        dict: {"templates", "personas", "tasks", "repeated"} aggregates.
+    """
+    templates: Dict[str, Dict[str, float]] = defaultdict(_empty_bucket)
+    personas: Dict[str, Dict[str, float]] = defaultdict(_empty_bucket)
+    tasks: Dict[str, Dict[str, float]] = defaultdict(_empty_bucket)
+    repeated: Dict[str, Dict[str, int]] = defaultdict(dict)
+
+    for rec in records:
+        call = {key: rec.get(key, 0) for key in ("in", "cin", "out", "ms", "cost")}
+
+        for bucket in (tasks[rec.get("task", "unknown")], personas[rec.get("persona") or "-"]):
+            bucket["calls"] += 1
+            for key, value in call.items():
+                bucket[key] += value
+
+        chars = rec.get("chars", {})
+        total_chars = sum(chars.values()) or 1
+        for name in rec.get("tpl", []):
+            share = chars.get(name, 0) / total_chars
+            bucket = templates[name]
+            bucket["calls"] += 1
+            bucket["in"] += call["in"] * share
+            bucket["cin"] += call["cin"] * share
+            bucket["cost"] += call["cost"] * share
+            bucket["ms"] += call["ms"]
+
+        for name, variables in rec.get("rep", {}).items():
+            for var, count in variables.items():
+                repeated[name][var] = max(repeated[name].get(var, 0), count)
+
+    return {
+        "templates": dict(templates),
+        "personas": dict(personas),
+        "tasks": dict(tasks),
+        "repeated": dict(repeated),
+    }
+
+
+def format_report(summary: Dict[str, Any]) -> str:
+    """Render aggregates from `aggregate` as plain-text tables."""
+    lines: List[str] = []
+
+    def table(title: str, rows: Dict[str, Dict[str, float]]) -> None:
+        lines.append(f"\n== {title} ==")
+        lines.append(f"{'name':<48}{'calls':>7}{'in tok':>11}{'cached':>9}{'out tok':>10}{'avg ms':>9}{'cost $':>11}")
+        for name, b in sorted(rows.items(), key=lambda kv: kv[1]["cost"], reverse=True):
+            avg_ms = b["ms"] / b["calls"] if b["calls"] else 0
+            lines.append(
+                f"{name[:47]:<48}{b['calls']:>7}{b['in']:>11.0f}{b['cin']:>9.0f}"
+                f"{b['out']:>10.0f}{avg_ms:>9.0f}{b['cost']:>11.5f}"
+            )
+
+    table("By template (input share by rendered size)", summary["templates"])
+    table("By persona", summary["personas"])
+    table("By task", summary["tasks"])
+
+    lines.append("\n== Variables rendered more than once ==")
+    if not summary["repeated"]:
+        lines.append("none")
+    for name, variables in sorted(summary["repeated"].items()):
+        flagged = ", ".join(f"{var} x{count}" for var, count in sorted(variables.items()))
+        lines.append(f"{name}: {flagged}")
+
+    return "\n".join(lines).lstrip("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point: `python -m modules.ledger report`."""
+    parser = argparse.ArgumentParser(description="LLM usage ledger tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="Aggregate usage by template, persona and task")
+    report.add_argument("--path", default=USAGE_LEDGER_PATH, help="Ledger file to read")
+    report.add_argument("--session", default=None, help="Only include this session ID")
+    args = parser.parse_args(argv)
+
+    records = read_ledger(args.path)
+    if args.session:
+        records = [r for r in records if r.get("sid") == args.session]
+    if not records:
+        print(f"No ledger records found in {args.path}")
+        return
+    print(format_report(aggregate(records)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,490 @@
+"""
+llm_backends.py
+
+Pluggable LLM backends behind `modules.utils.openai_call`.
+
+Backends:
+- OpenAIBackend: the OpenAI Responses API (optionally against another base URL).
+- ChatCompletionsBackend: any OpenAI-compatible endpoint that only speaks
+  `/chat/completions` (vLLM, Ollama, LM Studio, ...).
+- FakeBackend: offline stand-in that honors structured-output schemas, reports
+  plausible token counts and injects configurable latency, jitter, truncation
+  and errors, so prompt building, parsing, retries and cost tracking all run.
+
+The active backend is chosen by `LLM_BACKEND` (see config.py) and created lazily.
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from modules.config import (
+    LLM_BACKEND,
+    LLM_BASE_URL,
+    LLM_API_KEY,
+    FAKE_LLM_LATENCY_MS,
+    FAKE_LLM_JITTER_MS,
+    FAKE_LLM_MS_PER_TOKEN,
+    FAKE_LLM_TRUNCATION_RATE,
+    FAKE_LLM_ERROR_RATE,
+    FAKE_LLM_SEED,
+)
+from modules.errors import LLMError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LLMResponse:
+    """
+    Backend-independent result of one LLM request.
+
+    Attributes:
+        text: Output text (JSON string for structured outputs).
+        input_tokens: Input tokens billed, including cached ones.
+        output_tokens: Output tokens generated.
+        cached_tokens: Input tokens served from the provider prompt cache.
+        status: "completed" or "incomplete".
+        incomplete_reason: Why the response stopped early (e.g. "max_output_tokens").
+        response_id: Provider response ID, if any.
+    """
+    text: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    status: str = "completed"
+    incomplete_reason: Optional[str] = None
+    response_id: Optional[str] = None
+
+
+class LLMBackend(ABC):
+    """
+    Interface for LLM providers. `create` takes Responses API keyword arguments.
+
+    Backends with `supports_conversation_state` honour `previous_response_id`.
+    """
+
+    name = "base"
+    supports_conversation_state = False
+
+    @abstractmethod
+    def create(self, **request_kwargs: Any) -> LLMResponse:
+        """Make one request and return its normalized response."""
+
+
+# ---------------------------------------------------------------------
+# OpenAI Responses API
+# ---------------------------------------------------------------------
+class OpenAIBackend(LLMBackend):
+    """OpenAI Responses API. The client is created on first use."""
+
+    name = "openai"
+    supports_conversation_state = True
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+        self._api_key = api_key
+        self._base_url = base_url
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    self._client = OpenAI(api_key=self._api_key, base_url=self._base_url)
+        return self._client
+
+    def create(self, **request_kwargs: Any) -> LLMResponse:
+        response = self.client.responses.create(**request_kwargs)
+
+        text = getattr(response, "output_text", None) or _output_text(response)
+
+        usage = getattr(response, "usage", None)
+        incomplete = getattr(response, "incomplete_details", None)
+        return LLMResponse(
+            text=text,
+            input_tokens=getattr(usage, "input_tokens", 0) or 0,
+            output_tokens=getattr(usage, "output_tokens", 0) or 0,
+            cached_tokens=getattr(getattr(usage, "input_tokens_details", None), "cached_tokens", 0) or 0,
+            status=getattr(response, "status", None) or "completed",
+            incomplete_reason=getattr(incomplete, "reason", None),
+            response_id=getattr(response, "id", None),
+        )
+
+
+def _output_text(response: Any) -> str:
+    # Output items are SDK objects; reasoning items have no content, and refusals have no text
+    parts = []
+    for item in getattr(response, "output", None) or []:
+        for block in getattr(item, "content", None) or []:
+            parts.append(getattr(block, "text", None) or "")
+    return "".join(parts)
+
+
+# ---------------------------------------------------------------------
+# OpenAI-compatible /chat/completions endpoints
+# ---------------------------------------------------------------------
+class ChatCompletionsBackend(OpenAIBackend):
+    """
+    Maps Responses-style requests onto `/chat/completions` for local
+    OpenAI-compatible servers.
+    """
+
+    name = "openai_compatible"
+    # /chat/completions is stateless
+    supports_conversation_state = False
+
+    def create(self, **request_kwargs: Any) -> LLMResponse:
+        messages = []
+        if request_kwargs.get("instructions"):
+            messages.append({"role": "system", "content": request_kwargs["instructions"]})
+        messages.append({"role": "user", "content": request_kwargs["input"]})
+
+        chat_kwargs: Dict[str, Any] = {
+            "model": request_kwargs["model"],
+            "messages": messages,
+            "temperature": request_kwargs.get("temperature"),
+            "max_tokens": request_kwargs.get("max_output_tokens"),
+        }
+        text_format = (request_kwargs.get("text") or {}).get("format")
+        if text_format and text_format.get("type") == "json_schema":
+            chat_kwargs["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": text_format["name"],
+                    "schema": text_format["schema"],
+                    "strict": text_format.get("strict", True),
+                },
+            }
+
+        response = self.client.chat.completions.create(**chat_kwargs)
+        choice = response.choices[0]
+        usage = getattr(response, "usage", None)
+        truncated = choice.finish_reason == "length"
+        return LLMResponse(
+            text=choice.message.content or "",
+            input_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            output_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            cached_tokens=getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", 0) or 0,
+            status="incomplete" if truncated else "completed",
+            incomplete_reason="max_output_tokens" if truncated else None,
+            response_id=getattr(response, "id", None),
+        )
+
+
+# ---------------------------------------------------------------------
+# Offline fake provider
+# ---------------------------------------------------------------------
+# Job titles the fake validator asks to clarify, to exercise the clarification flow.
+FAKE_CLARIFICATION_TITLES = ["Wizard of Light", "Dragon Tamer"]
+
+_FAKE_QUESTIONS = [
+    "Tell me about a time you had to deliver results as a {job_title} under a tight deadline.",
+    "How would you explain a complex decision you made as a {job_title} to a non-expert stakeholder?",
+    "Describe a situation where you disagreed with a colleague and how you resolved it.",
+    "What process improvement have you driven, and how did you measure its impact?",
+    "Walk me through how you prioritize competing requests in a typical week.",
+    "Describe a mistake you made at work and what you changed afterwards.",
+]
+
+_FAKE_FEEDBACK = (
+    "Your answer addresses the question and shows relevant experience. "
+    "It would be stronger with a concrete example, the specific actions you took, "
+    "and a measurable result. Try structuring it as situation, task, action and result."
+)
+
+# Provider prompt caching only applies to prefixes of at least this many tokens.
+_CACHE_MIN_TOKENS = 1024
+
+# Prompt cache keys remembered by the fake backend (cleared when full).
+_CACHE_KEYS = 1024
+
+# Responses the fake backend keeps for `previous_response_id` (cleared when full).
+_STORED_RESPONSES = 4096
+
+
+def _estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+class FakeBackend(LLMBackend):
+    """
+    Offline LLM stand-in with configurable latency and failure injection.
+
+    A continuation request (see prompts/continuation/) of a truncated response
+    returns the part that was cut off.
+
+    Args:
+        latency_ms: Mean base latency per request.
+        jitter_ms: Standard deviation of the latency.
+        ms_per_token: Extra latency per generated output token.
+        truncation_rate: Probability of cutting the response short ("incomplete").
+        error_rate: Probability of raising LLMError (exercises retries).
+        seed: Optional RNG seed for reproducible runs.
+    """
+
+    name = "fake"
+    supports_conversation_state = True
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        ms_per_token: float = 0.0,
+        truncation_rate: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.ms_per_token = ms_per_token
+        self.truncation_rate = truncation_rate
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._seen_instructions: set = set()
+        self._prompts_by_cache_key: Dict[str, str] = {}
+        # Response ID -> context tokens (input + output) of stored responses
+        self._conversations: Dict[str, int] = {}
+        # Response ID -> (text, cut-off rest) of truncated responses, for continuations
+        self._cut_responses: Dict[str, Tuple[str, str]] = {}
+        self._question_counter = 0
+
+    def _random(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    # --- content generation ---
+    def _fake_string(self, field: str, prompt: str) -> str:
+        if "question" in field:
+            match = re.search(r"Job title: (.+)", prompt, re.IGNORECASE)
+            job_title = match.group(1).strip() if match else "candidate"
+            with self._lock:
+                template = _FAKE_QUESTIONS[self._question_counter % len(_FAKE_QUESTIONS)]
+                self._question_counter += 1
+            return template.format(job_title=job_title)
+        if "feedback" in field:
+            return _FAKE_FEEDBACK
+        if "summary" in field:
+            return "The candidate gave relevant answers but should add more concrete, measurable examples."
+        if "clarification" in field:
+            return ""
+        return f"Fake {field or 'text'}."
+
+    def _fake_value(self, schema: Dict[str, Any], field: str, prompt: str) -> Any:
+        types = schema.get("type", "string")
+        if isinstance(types, list):
+            types = next((t for t in types if t != "null"), "null")
+
+        if types == "object":
+            return {
+                name: self._fake_value(sub, name, prompt)
+                for name, sub in schema.get("properties", {}).items()
+            }
+        if types == "array":
+            item_schema = schema.get("items", {"type": "string"})
+            return [self._fake_value(item_schema, field, prompt) for _ in range(3)]
+        if types == "integer":
+            low, high = schema.get("minimum", 1), schema.get("maximum", 5)
+            return low + int(self._random() * (high - low + 1))
+        if types == "number":
+            low, high = schema.get("minimum", 0.0), schema.get("maximum", 1.0)
+            return round(low + self._random() * (high - low), 2)
+        if types == "boolean":
+            return True
+        if types == "null":
+            return None
+        return self._fake_string(field, prompt)
+
+    @staticmethod
+    def _needs_clarification(prompt: str) -> bool:
+        return any(title.lower() in prompt.lower() for title in FAKE_CLARIFICATION_TITLES)
+
+    def _fake_continuation(self, request_kwargs: Dict[str, Any]) -> str:
+        # The rest of the cut-off response the continuation prompt refers to
+        prompt = request_kwargs.get("input", "")
+        with self._lock:
+            cut = self._cut_responses.get(request_kwargs.get("previous_response_id"))
+            if cut is None:
+                cut = next((c for c in self._cut_responses.values() if c[0] and c[0] in prompt), None)
+        return cut[1] if cut else "Fake response."
+
+    def _fake_text(self, request_kwargs: Dict[str, Any]) -> str:
+        prompt = request_kwargs.get("input", "")
+        if "MODE: continue_output" in prompt:
+            return self._fake_continuation(request_kwargs)
+        text_format = (request_kwargs.get("text") or {}).get("format")
+        if text_format and text_format.get("type") == "json_schema":
+            value = self._fake_value(text_format["schema"], "", prompt)
+            if "MODE: validate_and_generate_question" in prompt:
+                value.update(valid=True, clarification=None)
+                if self._needs_clarification(prompt):
+                    value.update(
+                        valid=False,
+                        clarification="Clarification needed: This job title seems unusual. Please confirm what role you mean.",
+                        question=None,
+                    )
+            return json.dumps(value)
+
+        if "MODE: validate_job_title" in prompt:
+            if self._needs_clarification(prompt):
+                return "Clarification needed: This job title seems unusual. Please confirm what role you mean."
+            return "The job title is valid."
+        if "recommendations" in prompt:
+            return json.dumps({
+                "summary": self._fake_string("summary", prompt),
+                "recommendations": [
+                    "Use the STAR structure for behavioral answers.",
+                    "Quantify the impact of your work.",
+                    "Keep answers focused on the question asked.",
+                ],
+            })
+        return "Fake response."
+
+    # --- request ---
+    def create(self, **request_kwargs: Any) -> LLMResponse:
+        if self.error_rate and self._random() < self.error_rate:
+            self._sleep(self.latency_ms / 2)
+            raise LLMError("Injected fake backend error")
+
+        instructions = request_kwargs.get("instructions") or ""
+        previous_id = request_kwargs.get("previous_response_id")
+        with self._lock:
+            context_tokens = self._conversations.get(previous_id, -1) if previous_id else 0
+        if context_tokens < 0:
+            self._sleep(self.latency_ms / 2)
+            raise LLMError(f"Previous response '{previous_id}' not found")
+        text = self._fake_text(request_kwargs)
+        max_tokens = request_kwargs.get("max_output_tokens") or 0
+
+        status, reason = "completed", None
+        full_text = text
+        output_tokens = _estimate_tokens(text)
+        if max_tokens and output_tokens > max_tokens:
+            text = text[: max_tokens * 4]
+            status, reason = "incomplete", "max_output_tokens"
+        elif self.truncation_rate and self._random() < self.truncation_rate:
+            text = text[: max(1, int(len(text) * self._random()))]
+            status, reason = "incomplete", "max_output_tokens"
+        output_tokens = _estimate_tokens(text)
+
+        prompt = instructions + request_kwargs.get("input", "")
+        # Earlier turns of a chained conversation are billed as input, like the real API
+        input_tokens = context_tokens + _estimate_tokens(prompt)
+        cache_key = request_kwargs.get("prompt_cache_key")
+        with self._lock:
+            cached = instructions in self._seen_instructions
+            previous = self._prompts_by_cache_key.get(cache_key) if cache_key else None
+        prefix_tokens = _estimate_tokens(instructions) if cached else 0
+        if previous:
+            # Requests routed by the same cache key also reuse the prompt prefix they share
+            prefix_tokens = max(prefix_tokens, _estimate_tokens(os.path.commonprefix([previous, prompt])))
+        # The stored context of a chained conversation is served from the prompt cache
+        prefix_tokens = max(prefix_tokens, context_tokens)
+        cached_tokens = (prefix_tokens // 128) * 128 if prefix_tokens >= _CACHE_MIN_TOKENS else 0
+
+        response_id = f"fake_{uuid.uuid4().hex}"
+        with self._lock:
+            if len(self._conversations) >= _STORED_RESPONSES:
+                self._conversations.clear()
+            self._conversations[response_id] = input_tokens + output_tokens
+            if status == "incomplete":
+                if len(self._cut_responses) >= _STORED_RESPONSES:
+                    self._cut_responses.clear()
+                self._cut_responses[response_id] = (text, full_text[len(text):])
+
+        self._sleep(self._latency(output_tokens))
+        # Like the provider's, the prompt cache only holds a prefix once its request has completed
+        with self._lock:
+            self._seen_instructions.add(instructions)
+            if cache_key:
+                if len(self._prompts_by_cache_key) >= _CACHE_KEYS:
+                    self._prompts_by_cache_key.clear()
+                self._prompts_by_cache_key[cache_key] = prompt
+        return LLMResponse(
+            text=text,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cached_tokens=cached_tokens,
+            status=status,
+            incomplete_reason=reason,
+            response_id=response_id,
+        )
+
+    def forget_responses(self) -> None:
+        """Drop stored responses, as if they had expired (breaks `previous_response_id` chains)."""
+        with self._lock:
+            self._conversations.clear()
+
+    def _latency(self, output_tokens: int) -> float:
+        with self._lock:
+            jitter = self._rng.gauss(0, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter + self.ms_per_token * output_tokens)
+
+    @staticmethod
+    def _sleep(ms: float) -> None:
+        if ms > 0:
+            time.sleep(ms / 1000)
+
+
+# ---------------------------------------------------------------------
+# Backend selection
+# ---------------------------------------------------------------------
+_backend: Optional[LLMBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name: str = LLM_BACKEND) -> LLMBackend:
+    """
+    Create a backend by name ("openai", "openai_compatible" or "fake").
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if name == "openai":
+        return OpenAIBackend(api_key=LLM_API_KEY, base_url=LLM_BASE_URL)
+    if name == "openai_compatible":
+        return ChatCompletionsBackend(api_key=LLM_API_KEY or "not-needed", base_url=LLM_BASE_URL)
+    if name == "fake":
+        return FakeBackend(
+            latency_ms=FAKE_LLM_LATENCY_MS,
+            jitter_ms=FAKE_LLM_JITTER_MS,
+            ms_per_token=FAKE_LLM_MS_PER_TOKEN,
+            truncation_rate=FAKE_LLM_TRUNCATION_RATE,
+            error_rate=FAKE_LLM_ERROR_RATE,
+            seed=FAKE_LLM_SEED,
+        )
+    raise ValueError(f"Unknown LLM backend '{name}'. Use one of: {', '.join(available_backends())}")
+
+
+def available_backends() -> List[str]:
+    """Return the backend names accepted by `create_backend`."""
+    return ["openai", "openai_compatible", "fake"]
+
+
+def get_backend() -> LLMBackend:
+    """Return the process-wide backend, creating it from configuration on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend()
+                logger.info(f"Using LLM backend: {_backend.name}")
+    return _backend
+
+
+def set_backend(backend: Optional[LLMBackend]) -> None:
+    """Replace the process-wide backend (None recreates it from configuration on next use)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
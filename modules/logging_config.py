@@ -1,6 +1,7 @@
 import logging
 import os
 from logging.handlers import RotatingFileHandler
+from modules.tracing import TraceContextFilter
 
 LOG_DIR = "logs"
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -13,9 +14,12 @@ def setup_logging():
         return
 
     # ---------- Format ----------
+    # session_id / trace_id / span_id come from TraceContextFilter
     formatter = logging.Formatter(
-        "%(asctime)s [%(levelname)s] %(name)s (%(funcName)s:%(lineno)d): %(message)s"
+        "%(asctime)s [%(levelname)s] [sid=%(session_id)s trace=%(trace_id)s span=%(span_id)s] "
+        "%(name)s (%(funcName)s:%(lineno)d): %(message)s"
     )
+    trace_filter = TraceContextFilter()
 
     # ---------- Handlers ----------
     debug_handler = RotatingFileHandler(
@@ -25,6 +29,7 @@ def setup_logging():
     )
     debug_handler.setLevel(logging.DEBUG)
     debug_handler.setFormatter(formatter)
+    debug_handler.addFilter(trace_filter)
 
     info_handler = RotatingFileHandler(
         os.path.join(LOG_DIR, "app_info.log"),
@@ -33,6 +38,7 @@ def setup_logging():
     )
     info_handler.setLevel(logging.INFO)
     info_handler.setFormatter(formatter)
+    info_handler.addFilter(trace_filter)
 
     error_handler = RotatingFileHandler(
         os.path.join(LOG_DIR, "app_error.log"),
@@ -41,11 +47,13 @@ def setup_logging():
     )
     error_handler.setLevel(logging.WARNING)  # WARNING, ERROR, CRITICAL
     error_handler.setFormatter(formatter)
+    error_handler.addFilter(trace_filter)
 
     # Console for development
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
+    console_handler.addFilter(trace_filter)
 
     # ---------- Root logger ----------
     root = logging.getLogger()
@@ -0,0 +1,338 @@
+"""
+profiling.py
+
+Opt-in per-rerun profiling.
+
+When enabled (`ENABLE_PROFILING=True`, or the `?profile=<PROFILING_TOKEN>`
+query parameter for admins), each Streamlit rerun is profiled and written to
+`PROFILE_DIR` with its session ID and the wall time of labelled phases
+(`initialize_session_state`, `display_sidebar`, `render_interview_ui`,
+LLM calls, ...):
+
+- "sample" mode samples the script thread's stack every few milliseconds and
+  writes collapsed stacks (flame graph input) prefixed with the active phase.
+- "cprofile" mode runs the deterministic `cProfile` profiler and writes a
+  `.prof` file readable by `pstats`, snakeviz and similar tools.
+
+When profiling is off, `phase()` costs a single context variable lookup.
+
+Usage:
+    python -m modules.profiling report --top 20
+    python -m modules.profiling report --collapsed logs/profiles/all.collapsed
+"""
+
+import argparse
+import contextvars
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from modules.config import (
+    ENABLE_PROFILING,
+    PROFILE_DIR,
+    PROFILING_MODE,
+    PROFILING_SAMPLE_INTERVAL_MS,
+    PROFILING_TOKEN,
+)
+
+logger = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar[Optional["RerunProfile"]] = contextvars.ContextVar("rerun_profile", default=None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{os.path.basename(code.co_filename)}:{name}"
+
+
+class _Sampler(threading.Thread):
+    """Background thread that samples another thread's stack at a fixed interval."""
+
+    def __init__(self, profile: "RerunProfile", thread_id: int, interval_s: float):
+        super().__init__(name="rerun-profiler", daemon=True)
+        self.profile = profile
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(f"phase:{self.profile.current_phase}")
+            self.stacks[";".join(reversed(labels))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class RerunProfile:
+    """
+    Profile of one rerun: phase timings plus sampled stacks or cProfile stats.
+
+    Args:
+        session_id: Session the rerun belongs to.
+        mode: "sample" or "cprofile" (defaults to `PROFILING_MODE`).
+    """
+
+    def __init__(self, session_id: str, mode: Optional[str] = None):
+        self.session_id = session_id
+        self.mode = mode or PROFILING_MODE
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.phase_stack: List[str] = ["rerun"]
+        self._lock = threading.Lock()
+        self._sampler: Optional[_Sampler] = None
+        self._profiler: Optional[cProfile.Profile] = None
+        self._started = 0.0
+        self.thread_id = threading.get_ident()
+        self.total_ms = 0.0
+
+    @property
+    def current_phase(self) -> str:
+        return self.phase_stack[-1]
+
+    def add_phase(self, name: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self.phases[name] += elapsed_ms
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self.thread_id = threading.get_ident()
+        if self.mode == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._sampler = _Sampler(self, self.thread_id, PROFILING_SAMPLE_INTERVAL_MS / 1000)
+            self._sampler.start()
+
+    def stop(self) -> None:
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        self.total_ms = (time.perf_counter() - self._started) * 1000
+
+    def write(self, directory: Optional[str] = None) -> str:
+        """
+        Write the profile files for this rerun.
+
+        Args:
+            directory: Output directory (defaults to `PROFILE_DIR`).
+
+        Returns:
+            str: Path of the JSON summary (profile data sits next to it).
+        """
+        directory = directory or PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}_{self.session_id}_{uuid.uuid4().hex[:6]}")
+
+        summary: Dict[str, Any] = {
+            "sid": self.session_id,
+            "ts": round(time.time(), 3),
+            "mode": self.mode,
+            "total_ms": round(self.total_ms, 1),
+            "phases": {name: round(ms, 1) for name, ms in self.phases.items()},
+        }
+        if self._profiler is not None:
+            self._profiler.dump_stats(f"{stem}.prof")
+        if self._sampler is not None:
+            summary["samples"] = sum(self._sampler.stacks.values())
+            with open(f"{stem}.collapsed", "w", encoding="utf-8") as f:
+                for stack, count in self._sampler.stacks.items():
+                    f.write(f"{stack} {count}\n")
+
+        with open(f"{stem}.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f)
+        return f"{stem}.json"
+
+
+# ---------------------------------------------------------------------
+# Hooks
+# ---------------------------------------------------------------------
+def profiling_requested(query_params: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Return True if this rerun should be profiled.
+
+    Profiling is on for every rerun with `ENABLE_PROFILING=True`, or for a single
+    rerun whose `profile` query parameter equals `PROFILING_TOKEN` (if set).
+    """
+    if ENABLE_PROFILING:
+        return True
+    if not PROFILING_TOKEN or not query_params:
+        return False
+    return query_params.get("profile") == PROFILING_TOKEN
+
+
+@contextmanager
+def profile_rerun(session_id: str, enabled: bool) -> Iterator[Optional[RerunProfile]]:
+    """
+    Profile the enclosed rerun if `enabled`, writing its files when it ends.
+
+    Streamlit ends a rerun early by raising from `st.rerun()` / `st.stop()`;
+    the profile is still written in that case.
+    """
+    if not enabled:
+        yield None
+        return
+
+    profile = RerunProfile(session_id)
+    token = _current.set(profile)
+    profile.start()
+    try:
+        yield profile
+    finally:
+        profile.stop()
+        _current.reset(token)
+        try:
+            path = profile.write()
+            logger.info(f"Rerun profile written to {path} ({profile.total_ms:.0f} ms)")
+        except OSError as e:
+            logger.warning(f"Could not write rerun profile: {e}")
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Label the enclosed block as a phase of the current rerun profile (no-op when not profiling)."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+
+    # Phases on worker threads (e.g. background LLM calls) are timed but not put on the stack
+    on_script_thread = profile.thread_id == threading.get_ident()
+    if on_script_thread:
+        profile.phase_stack.append(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_phase(name, (time.perf_counter() - started) * 1000)
+        if on_script_thread:
+            profile.phase_stack.pop()
+
+
+# ---------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------
+def load_summaries(directory: str = PROFILE_DIR, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Load the JSON summaries in `directory`, optionally for one session."""
+    summaries = []
+    if not os.path.isdir(directory):
+        return summaries
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            summary = json.load(f)
+        if session_id is None or summary.get("sid") == session_id:
+            summary["stem"] = os.path.join(directory, name[: -len(".json")])
+            summaries.append(summary)
+    return summaries
+
+
+def merge_collapsed(summaries: List[Dict[str, Any]]) -> Counter:
+    """Merge the collapsed stacks of the given reruns."""
+    stacks: Counter = Counter()
+    for summary in summaries:
+        path = f"{summary['stem']}.collapsed"
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                if stack:
+                    stacks[stack] += int(count)
+    return stacks
+
+
+def hot_functions(stacks: Counter, top: int = 20) -> List[Dict[str, Any]]:
+    """
+    Rank functions by samples from collapsed stacks.
+
+    Returns:
+        List of {"function", "self", "total"} dicts, by self samples then total samples.
+    """
+    own: Counter = Counter()
+    total: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = [f for f in stack.split(";") if not f.startswith("phase:")]
+        if not frames:
+            continue
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    ranked = sorted(total, key=lambda f: (own[f], total[f]), reverse=True)[:top]
+    return [{"function": f, "self": own[f], "total": total[f]} for f in ranked]
+
+
+def format_report(summaries: List[Dict[str, Any]], top: int = 20) -> str:
+    """Format phase timings and hot functions for the given reruns."""
+    if not summaries:
+        return "No profiles found."
+
+    lines = [f"{len(summaries)} profiled reruns, mean {sum(s['total_ms'] for s in summaries) / len(summaries):.1f} ms", ""]
+    phases: Dict[str, List[float]] = defaultdict(list)
+    for summary in summaries:
+        for name, ms in summary["phases"].items():
+            phases[name].append(ms)
+    lines.append(f"{'phase':<40}{'reruns':>8}{'mean ms':>10}{'max ms':>10}")
+    for name, values in sorted(phases.items(), key=lambda item: -sum(item[1])):
+        lines.append(f"{name[:39]:<40}{len(values):>8}{sum(values) / len(values):>10.1f}{max(values):>10.1f}")
+
+    stacks = merge_collapsed(summaries)
+    if stacks:
+        lines += ["", f"{'function (sampled)':<70}{'self':>8}{'total':>8}"]
+        for row in hot_functions(stacks, top):
+            lines.append(f"{row['function'][:69]:<70}{row['self']:>8}{row['total']:>8}")
+
+    prof_files = [f"{s['stem']}.prof" for s in summaries if os.path.exists(f"{s['stem']}.prof")]
+    if prof_files:
+        out = io.StringIO()
+        stats = pstats.Stats(*prof_files, stream=out)
+        stats.sort_stats("cumulative").print_stats(top)
+        lines += ["", out.getvalue().strip()]
+
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point: `python -m modules.profiling report`."""
+    parser = argparse.ArgumentParser(description="Per-rerun profiles")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="Aggregate rerun profiles")
+    report.add_argument("--dir", default=PROFILE_DIR, help="Profile directory")
+    report.add_argument("--session", help="Only include this session ID")
+    report.add_argument("--top", type=int, default=20, help="Number of hot functions to show")
+    report.add_argument("--collapsed", help="Write merged collapsed stacks to this file (flamegraph.pl / speedscope input)")
+    args = parser.parse_args(argv)
+
+    summaries = load_summaries(args.dir, args.session)
+    print(format_report(summaries, args.top))
+
+    if args.collapsed:
+        with open(args.collapsed, "w", encoding="utf-8") as f:
+            for stack, count in merge_collapsed(summaries).most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"\nCollapsed stacks written to {args.collapsed}")
+
+
+if __name__ == "__main__":
+    main()
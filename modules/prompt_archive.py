@@ -0,0 +1,228 @@
+"""
+prompt_archive.py
+
+Content-addressed archive of rendered prompts.
+
+Each distinct rendered prompt is stored once, gzip-compressed, under its
+SHA-256 content hash in `PROMPT_ARCHIVE_DIR`; logs only carry the hash and
+size. Prompts not rendered for `PROMPT_ARCHIVE_RETENTION_DAYS` are pruned, and
+the archive is kept under `PROMPT_ARCHIVE_MAX_MB` by removing the least
+recently used prompts.
+
+Usage:
+    python -m modules.prompt_archive show <hash-prefix>
+    python -m modules.prompt_archive list --limit 20
+    python -m modules.prompt_archive prune
+"""
+
+import argparse
+import gzip
+import hashlib
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from modules.config import (
+    ENABLE_PROMPT_ARCHIVE,
+    PROMPT_ARCHIVE_DIR,
+    PROMPT_ARCHIVE_MAX_MB,
+    PROMPT_ARCHIVE_RETENTION_DAYS,
+)
+
+logger = logging.getLogger(__name__)
+
+HASH_LENGTH = 16
+SUFFIX = ".txt.gz"
+
+# Prune after this many newly archived prompts (and on the first one per process).
+PRUNE_EVERY = 500
+
+# Re-touch an archived prompt at most this often so its mtime tracks last use.
+TOUCH_INTERVAL_SECONDS = 3600
+# Bound on remembered touch times (cleared when full).
+TOUCH_CACHE_SIZE = 10_000
+
+_lock = threading.Lock()
+_last_touch: Dict[str, float] = {}
+_writes = 0
+
+
+def prompt_hash(text: str) -> str:
+    """Return the content hash used as the archive key."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:HASH_LENGTH]
+
+
+def _path(digest: str, directory: str) -> str:
+    return os.path.join(directory, digest[:2], f"{digest}{SUFFIX}")
+
+
+def archive_prompt(text: str, directory: Optional[str] = None) -> str:
+    """
+    Store a rendered prompt once under its content hash.
+
+    Args:
+        text: Rendered prompt.
+        directory: Archive directory (defaults to `PROMPT_ARCHIVE_DIR`).
+
+    Returns:
+        str: The prompt's hash (returned even if archiving is disabled or fails).
+    """
+    global _writes
+    digest = prompt_hash(text)
+    if not ENABLE_PROMPT_ARCHIVE:
+        return digest
+
+    directory = directory or PROMPT_ARCHIVE_DIR
+    path = _path(digest, directory)
+    now = time.time()
+
+    with _lock:
+        last = _last_touch.get(path)
+        if last is not None and now - last < TOUCH_INTERVAL_SECONDS:
+            return digest
+        if len(_last_touch) >= TOUCH_CACHE_SIZE:
+            _last_touch.clear()
+        _last_touch[path] = now
+
+    try:
+        if os.path.exists(path):
+            os.utime(path, (now, now))
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not archive prompt {digest}: {e}")
+        return digest
+
+    with _lock:
+        _writes += 1
+        should_prune = _writes % PRUNE_EVERY == 1
+    if should_prune:
+        prune(directory)
+    return digest
+
+
+def _entries(directory: str) -> List[Tuple[str, float, int]]:
+    """Return (path, mtime, size) of every archived prompt."""
+    entries = []
+    if not os.path.isdir(directory):
+        return entries
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(SUFFIX):
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_mtime, stat.st_size))
+    return entries
+
+
+def prune(
+    directory: Optional[str] = None,
+    retention_days: float = PROMPT_ARCHIVE_RETENTION_DAYS,
+    max_mb: float = PROMPT_ARCHIVE_MAX_MB,
+) -> int:
+    """
+    Apply the retention policy.
+
+    Removes prompts not used for `retention_days`, then the least recently used
+    prompts until the archive is below `max_mb` (0 disables either limit).
+
+    Returns:
+        int: Number of prompts removed.
+    """
+    directory = directory or PROMPT_ARCHIVE_DIR
+    entries = sorted(_entries(directory), key=lambda entry: entry[1])
+    cutoff = time.time() - retention_days * 86400 if retention_days else None
+    budget = max_mb * 1024 * 1024 if max_mb else None
+    total = sum(size for _, _, size in entries)
+
+    removed = 0
+    for path, mtime, size in entries:
+        too_old = cutoff is not None and mtime < cutoff
+        too_big = budget is not None and total > budget
+        if not (too_old or too_big):
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+        with _lock:
+            _last_touch.pop(path, None)
+
+    if removed:
+        logger.info(f"Pruned {removed} archived prompt(s)")
+    return removed
+
+
+def find_prompts(prefix: str, directory: Optional[str] = None) -> List[str]:
+    """Return the hashes of archived prompts starting with `prefix`."""
+    directory = directory or PROMPT_ARCHIVE_DIR
+    folder = os.path.join(directory, prefix[:2])
+    if len(prefix) < 2 or not os.path.isdir(folder):
+        return [
+            os.path.basename(path)[: -len(SUFFIX)]
+            for path, _, _ in _entries(directory)
+            if os.path.basename(path).startswith(prefix)
+        ]
+    return sorted(name[: -len(SUFFIX)] for name in os.listdir(folder) if name.startswith(prefix) and name.endswith(SUFFIX))
+
+
+def load_prompt_text(digest: str, directory: Optional[str] = None) -> str:
+    """
+    Return an archived prompt by its full hash or a unique prefix.
+
+    Raises:
+        KeyError: If no prompt or more than one prompt matches.
+    """
+    directory = directory or PROMPT_ARCHIVE_DIR
+    matches = find_prompts(digest, directory)
+    if len(matches) != 1:
+        raise KeyError(f"{len(matches)} archived prompts match '{digest}'")
+    with gzip.open(_path(matches[0], directory), "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: `python -m modules.prompt_archive show|list|prune`."""
+    parser = argparse.ArgumentParser(description="Rendered prompt archive")
+    parser.add_argument("--dir", default=PROMPT_ARCHIVE_DIR, help="Archive directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="Print an archived prompt")
+    show.add_argument("hash", help="Prompt hash or unique prefix (from the logs)")
+    listing = sub.add_parser("list", help="List archived prompts, most recently used first")
+    listing.add_argument("--limit", type=int, default=20)
+    sub.add_parser("prune", help="Apply the retention policy now")
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        try:
+            print(load_prompt_text(args.hash, args.dir))
+        except KeyError as e:
+            print(e.args[0])
+            return 1
+    elif args.command == "list":
+        entries = sorted(_entries(args.dir), key=lambda entry: -entry[1])
+        total = sum(size for _, _, size in entries)
+        for path, mtime, size in entries[: args.limit]:
+            used = time.strftime("%Y-%m-%d %H:%M", time.localtime(mtime))
+            print(f"{os.path.basename(path)[: -len(SUFFIX)]}  {used}  {size:>8} B")
+        print(f"\n{len(entries)} prompts, {total / 1024:.1f} KB compressed")
+    else:
+        print(f"Removed {prune(args.dir)} prompt(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
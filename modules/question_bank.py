@@ -0,0 +1,292 @@
+"""
+question_bank.py
+
+Pre-generated interview questions in a memory-mapped, indexed file.
+
+The first question of an interview depends only on the job title, question
+type and difficulty, so for popular titles it is drawn from a bank built
+offline instead of being generated live. The bank is also the fallback when
+live question generation fails (degraded mode).
+
+File layout (`QUESTION_BANK_PATH`):
+
+    b"IQB1" | index length (uint32, little endian) | JSON index | question data
+
+The index maps "title|question_type|difficulty" to (offset, length) pairs into
+the UTF-8 question data. The app maps the file read-only and only decodes the
+questions it draws, so all processes on a host share one copy in the page cache.
+
+Usage:
+    python -m modules.question_bank build --per-pool 8 --workers 4
+    python -m modules.question_bank info
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import mmap
+import os
+import random
+import re
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Collection, Dict, List, Optional, Sequence, Tuple
+
+from modules.config import (
+    ENABLE_JOB_TITLE_INDEX,
+    ENABLE_QUESTION_BANK,
+    QUESTION_BANK_PATH,
+    QUESTION_BANK_TITLES_PATH,
+)
+from modules.job_titles import get_index, normalize_title
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"IQB1"
+_HEADER = struct.Struct("<4sI")
+
+QUESTION_TYPES = ("Behavioral", "Role-specific", "Technical")
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+
+# Questions whose words overlap this much (Jaccard) with a kept question are duplicates.
+DUPLICATE_SIMILARITY = 0.7
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def pool_key(job_title: str, question_type: str, difficulty: str) -> str:
+    """Return the index key of a pool; known titles and their misspellings share the canonical title's pool."""
+    canonical = get_index().match(job_title) if ENABLE_JOB_TITLE_INDEX else None
+    return f"{normalize_title(canonical or job_title)}|{question_type}|{difficulty}"
+
+
+class QuestionBank:
+    """
+    Read-only view of a question bank file.
+
+    Args:
+        path: Bank file written by `write_bank`.
+
+    Raises:
+        ValueError: If the file is not a question bank.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_length = _HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a question bank")
+        index = json.loads(self._data[_HEADER.size:_HEADER.size + index_length])
+        self.meta: Dict[str, object] = index.get("meta", {})
+        self._pools: Dict[str, List[List[int]]] = index["pools"]
+        self._base = _HEADER.size + index_length
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._pools.values())
+
+    @property
+    def pools(self) -> List[str]:
+        return list(self._pools)
+
+    def pool_sizes(self) -> Dict[str, int]:
+        return {key: len(entries) for key, entries in self._pools.items()}
+
+    def has_pool(self, job_title: str, question_type: str, difficulty: str) -> bool:
+        return pool_key(job_title, question_type, difficulty) in self._pools
+
+    def questions(self, job_title: str, question_type: str, difficulty: str) -> List[str]:
+        """Return every question of a pool (empty if there is none)."""
+        return [self._read(entry) for entry in self._pools.get(pool_key(job_title, question_type, difficulty), [])]
+
+    def _read(self, entry: List[int]) -> str:
+        offset, length = entry
+        start = self._base + offset
+        return self._data[start:start + length].decode("utf-8")
+
+    def draw(
+        self,
+        job_title: str,
+        question_type: str,
+        difficulty: str,
+        exclude: Collection[str] = (),
+    ) -> Optional[str]:
+        """
+        Return a random question of the pool that is not in `exclude`.
+
+        Returns:
+            Optional[str]: A question, or None if there is no pool or it is used up.
+        """
+        entries = list(self._pools.get(pool_key(job_title, question_type, difficulty), []))
+        random.shuffle(entries)
+        for entry in entries:
+            question = self._read(entry)
+            if question not in exclude:
+                return question
+        return None
+
+
+@lru_cache(maxsize=1)
+def _load(path: str, mtime: float) -> Optional[QuestionBank]:
+    try:
+        bank = QuestionBank(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Could not load question bank {path}: {e}")
+        return None
+    logger.info(f"Loaded question bank with {len(bank)} questions in {len(bank.pools)} pools")
+    return bank
+
+
+def get_bank(path: Optional[str] = None) -> Optional[QuestionBank]:
+    """Return the question bank (reloaded when the file changes), or None if it is disabled or missing."""
+    path = path or QUESTION_BANK_PATH
+    if not ENABLE_QUESTION_BANK:
+        return None
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    return _load(path, mtime)
+
+
+# ---------------------------------------------------------------------
+# Builder
+# ---------------------------------------------------------------------
+def _words(text: str) -> set:
+    return set(_WORD.findall(text.lower()))
+
+
+def is_duplicate(question: str, kept: Sequence[str]) -> bool:
+    """Return True if `question` repeats or closely paraphrases one of `kept`."""
+    words = _words(question)
+    for other in kept:
+        other_words = _words(other)
+        union = words | other_words
+        if union and len(words & other_words) / len(union) >= DUPLICATE_SIMILARITY:
+            return True
+    return False
+
+
+def build_pool(job_title: str, question_type: str, difficulty: str, size: int) -> List[str]:
+    """
+    Generate up to `size` distinct questions for one pool.
+
+    Each request sees the questions kept so far, and duplicates or failed
+    generations are dropped (at most `2 * size` attempts).
+    """
+    from modules.interview_logic import QUESTION_FAILED, generate_question
+
+    kept: List[str] = []
+    for _ in range(size * 2):
+        if len(kept) >= size:
+            break
+        question = generate_question(job_title, question_type, difficulty, previous_questions=kept).strip()
+        if question and question != QUESTION_FAILED and not is_duplicate(question, kept):
+            kept.append(question)
+    return kept
+
+
+def write_bank(pools: Dict[str, List[str]], path: str, meta: Optional[Dict[str, object]] = None) -> None:
+    """Write pools (key -> questions) as a bank file, replacing any existing file atomically."""
+    data = bytearray()
+    index: Dict[str, List[Tuple[int, int]]] = {}
+    for key, questions in pools.items():
+        if not questions:
+            continue
+        entries = []
+        for question in questions:
+            encoded = question.encode("utf-8")
+            entries.append((len(data), len(encoded)))
+            data += encoded
+        index[key] = entries
+
+    encoded_index = json.dumps({"meta": meta or {}, "pools": index}, separators=(",", ":")).encode("utf-8")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(encoded_index)))
+        f.write(encoded_index)
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_bank(
+    titles: Sequence[str],
+    question_types: Sequence[str] = QUESTION_TYPES,
+    difficulties: Sequence[str] = DIFFICULTIES,
+    per_pool: int = 8,
+    workers: int = 4,
+) -> Dict[str, List[str]]:
+    """
+    Generate the pools for every title x question type x difficulty with at most `workers` pools in flight.
+
+    Returns:
+        Dict[str, List[str]]: Pool key -> questions.
+    """
+    cells = list(itertools.product(titles, question_types, difficulties))
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="question-bank") as pool:
+        futures = {pool_key(*cell): pool.submit(build_pool, *cell, per_pool) for cell in cells}
+        return {key: future.result() for key, future in futures.items()}
+
+
+def load_titles(path: str) -> List[str]:
+    """Read one job title per line (`#` comments allowed)."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def _csv(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: `python -m modules.question_bank build|info`."""
+    parser = argparse.ArgumentParser(description="Pre-generated question bank")
+    parser.add_argument("--path", default=QUESTION_BANK_PATH, help="Bank file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Generate the bank with the configured LLM backend")
+    build.add_argument("--titles-file", default=QUESTION_BANK_TITLES_PATH)
+    build.add_argument("--titles", type=_csv, help="Comma-separated titles (overrides --titles-file)")
+    build.add_argument("--question-types", type=_csv, default=list(QUESTION_TYPES))
+    build.add_argument("--difficulties", type=_csv, default=list(DIFFICULTIES))
+    build.add_argument("--per-pool", type=int, default=8, help="Questions per title/type/difficulty")
+    build.add_argument("--workers", type=int, default=4, help="Pools generated in parallel")
+    build.add_argument("--model", default="gpt-4o-mini")
+    build.add_argument("--temperature", type=float, default=0.9, help="Sampling temperature (higher = more varied pools)")
+    sub.add_parser("info", help="Show the pools in the bank")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        if not os.path.exists(args.path):
+            print(f"No question bank at {args.path}")
+            return 1
+        bank = QuestionBank(args.path)
+        print(f"{len(bank)} questions in {len(bank.pools)} pools, {os.path.getsize(args.path) / 1024:.1f} KB ({bank.meta})")
+        for key, size in bank.pool_sizes().items():
+            print(f"  {key}: {size}")
+        return 0
+
+    import streamlit as st
+
+    titles = args.titles or load_titles(args.titles_file)
+    st.session_state["model"] = args.model
+    st.session_state["temperature"] = args.temperature
+    st.session_state["session_id"] = "question-bank"
+
+    started = time.perf_counter()
+    pools = build_bank(titles, args.question_types, args.difficulties, args.per_pool, args.workers)
+    meta = {"built": time.strftime("%Y-%m-%d %H:%M"), "model": args.model, "temperature": args.temperature}
+    write_bank(pools, args.path, meta)
+    total = sum(len(questions) for questions in pools.values())
+    print(f"Wrote {total} questions in {sum(bool(q) for q in pools.values())} pools to {args.path} "
+          f"in {time.perf_counter() - started:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+response_cache.py
+
+Process-wide cache of LLM responses with single-flight request coalescing.
+
+Responses are keyed on a hash of the full request (rendered prompt, system
+instructions, model, temperature and output schema; see
+`cassette.request_key`). The token cap is not part of the key, because
+adaptive caps vary between otherwise identical requests. While a request is in flight, identical requests
+from other reruns or threads wait for it instead of making their own call.
+Only completed responses are stored, and requests above
+`RESPONSE_CACHE_MAX_TEMPERATURE` are not cached because a fresh sample is
+expected. Calls that generate interview questions opt out
+(`openai_call(..., use_cache=False)`), so two interviews with the same
+settings do not get the same questions. Entries are evicted least recently used beyond
+`RESPONSE_CACHE_MAX_ENTRIES` and after `RESPONSE_CACHE_TTL_SECONDS`.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from modules.config import (
+    ENABLE_RESPONSE_CACHE,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_MAX_TEMPERATURE,
+    RESPONSE_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("response_cache_bypass", default=False)
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache whose misses are coalesced per key.
+
+    Args:
+        max_entries: Maximum number of stored responses (0 disables storing).
+        ttl_seconds: Lifetime of a stored response (0 keeps it until evicted).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get_or_create(
+        self,
+        key: str,
+        create: Callable[[], Any],
+        should_store: Callable[[Any], bool] = lambda value: True,
+    ) -> Tuple[Any, bool]:
+        """
+        Return the cached value for `key`, or call `create` once for all concurrent callers.
+
+        Args:
+            key: Request hash.
+            create: Makes the actual call on a miss.
+            should_store: Whether a fresh value may be cached (e.g. only complete responses).
+
+        Returns:
+            (value, shared): `shared` is True if the value came from the cache or
+            from another caller's in-flight request.
+
+        Raises:
+            Exception: Whatever `create` raised, for the caller that made the
+            call and for everyone waiting on it. Failures are not cached.
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value, True
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            value = create()
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(exc)
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            if self.max_entries > 0 and should_store(value):
+                self._entries[key] = (time.monotonic(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        future.set_result(value)
+        return value, False
+
+    def clear(self) -> None:
+        """Drop all stored responses (in-flight requests are unaffected)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, coalesced and miss counters and the number of stored responses."""
+        return {"hits": self.hits, "coalesced": self.coalesced, "misses": self.misses, "entries": len(self)}
+
+
+_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS)
+
+
+def get_cache() -> ResponseCache:
+    """Return the process-wide response cache."""
+    return _cache
+
+
+def cacheable(temperature: float) -> bool:
+    """Return True if a request at this temperature may be served from the cache."""
+    return ENABLE_RESPONSE_CACHE and not _bypass.get() and temperature <= RESPONSE_CACHE_MAX_TEMPERATURE
+
+
+@contextmanager
+def bypass() -> Iterator[None]:
+    """Make every call in this context (and work submitted from it) skip the cache."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
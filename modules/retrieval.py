@@ -0,0 +1,253 @@
+"""
+retrieval.py
+
+Local retrieval over documents uploaded for an interview (job description, resume).
+
+Documents are split into chunks of about `RETRIEVAL_CHUNK_WORDS` words and
+indexed per session with BM25. Prompts then carry only the top-k excerpts
+that match the current question or answer (at most `RETRIEVAL_MAX_CHARS`),
+so their size stays bounded however long the documents are.
+
+Indexing is incremental: adding or replacing one document only touches that
+document's chunks, and re-submitting unchanged text (every Streamlit rerun)
+is a hash comparison.
+"""
+
+import hashlib
+import heapq
+import logging
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from modules.config import (
+    MAX_DOCUMENT_CHARS,
+    RETRIEVAL_CHUNK_OVERLAP_WORDS,
+    RETRIEVAL_CHUNK_WORDS,
+    RETRIEVAL_MAX_CHARS,
+    RETRIEVAL_TOP_K,
+)
+
+logger = logging.getLogger(__name__)
+
+# Keeps terms like "c++", "c#" and "node.js" in one piece
+_TERM = re.compile(r"[a-z0-9]+(?:[+#]+|(?:\.[a-z0-9]+)+)?")
+
+STOPWORDS = frozenset("""
+a about all also an and any are as at be been but by can could did do does for from had has have how i if in
+into is it its me more my not of on or our so than that the their them then there these they this to
+too up was we were what when where which who why will with would you your
+""".split())
+
+# BM25 parameters (the usual defaults)
+K1 = 1.5
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase terms without stopwords; simple plurals are folded ("projects" -> "project")."""
+    terms = []
+    for term in _TERM.findall(text.lower()):
+        if term in STOPWORDS:
+            continue
+        if len(term) > 4 and term.isalpha() and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+def chunk_text(
+    text: str,
+    chunk_words: int = RETRIEVAL_CHUNK_WORDS,
+    overlap_words: int = RETRIEVAL_CHUNK_OVERLAP_WORDS,
+) -> List[str]:
+    """
+    Split text into chunks of at most `chunk_words` words.
+
+    Lines (resume bullets, job description requirements) are packed whole into
+    a chunk while they fit. A line longer than a chunk is split into windows
+    that overlap by `overlap_words`.
+
+    Returns:
+        List[str]: Chunks with whitespace collapsed within each line.
+    """
+    chunk_words = max(1, chunk_words)
+    step = max(1, chunk_words - max(0, overlap_words))
+    chunks: List[str] = []
+    current: List[str] = []
+    current_words = 0
+
+    def flush() -> None:
+        nonlocal current, current_words
+        if current:
+            chunks.append("\n".join(current))
+        current, current_words = [], 0
+
+    for line in text.splitlines():
+        words = line.split()
+        if not words:
+            continue
+        if len(words) > chunk_words:
+            flush()
+            for start in range(0, len(words), step):
+                chunks.append(" ".join(words[start:start + chunk_words]))
+                if start + chunk_words >= len(words):
+                    break
+            continue
+        if current_words + len(words) > chunk_words:
+            flush()
+        current.append(" ".join(words))
+        current_words += len(words)
+    flush()
+    return chunks
+
+
+class Chunk:
+    """One indexed piece of a document."""
+
+    __slots__ = ("source", "text", "length")
+
+    def __init__(self, source: str, text: str, length: int):
+        self.source = source
+        self.text = text
+        self.length = length
+
+
+class DocumentIndex:
+    """
+    BM25 index over the chunks of a session's documents.
+
+    Args:
+        chunk_words: Maximum words per chunk.
+        overlap_words: Overlap between windows of a line longer than a chunk.
+    """
+
+    def __init__(self, chunk_words: int = RETRIEVAL_CHUNK_WORDS, overlap_words: int = RETRIEVAL_CHUNK_OVERLAP_WORDS):
+        self.chunk_words = chunk_words
+        self.overlap_words = overlap_words
+        self._chunks: Dict[int, Chunk] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._sources: Dict[str, Tuple[str, List[int]]] = {}
+        self._next_id = 0
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    @property
+    def sources(self) -> List[str]:
+        return list(self._sources)
+
+    def add(self, source: str, text: str) -> int:
+        """
+        Index a document, replacing any earlier document of the same source.
+
+        Text beyond `MAX_DOCUMENT_CHARS` is ignored.
+
+        Returns:
+            int: Number of chunks indexed.
+        """
+        self.remove(source)
+        text = text[:MAX_DOCUMENT_CHARS]
+        ids = []
+        for chunk in chunk_text(text, self.chunk_words, self.overlap_words):
+            terms = tokenize(chunk)
+            if not terms:
+                continue
+            chunk_id = self._next_id
+            self._next_id += 1
+            self._chunks[chunk_id] = Chunk(source, chunk, len(terms))
+            self._total_length += len(terms)
+            for term in terms:
+                postings = self._postings.setdefault(term, {})
+                postings[chunk_id] = postings.get(chunk_id, 0) + 1
+            ids.append(chunk_id)
+        self._sources[source] = (_digest(text), ids)
+        logger.info(f"Indexed {source}: {len(text)} chars in {len(ids)} chunks")
+        return len(ids)
+
+    def remove(self, source: str) -> bool:
+        """Drop a document from the index. Returns False if it was not indexed."""
+        entry = self._sources.pop(source, None)
+        if entry is None:
+            return False
+        for chunk_id in entry[1]:
+            chunk = self._chunks.pop(chunk_id)
+            self._total_length -= chunk.length
+            for term in set(tokenize(chunk.text)):
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(chunk_id, None)
+                    if not postings:
+                        del self._postings[term]
+        return True
+
+    def update(self, source: str, text: Optional[str]) -> bool:
+        """
+        Bring a document up to date: index new or changed text, drop emptied documents.
+
+        Returns:
+            bool: True if the index changed.
+        """
+        text = (text or "").strip()
+        if not text:
+            return self.remove(source)
+        entry = self._sources.get(source)
+        if entry is not None and entry[0] == _digest(text[:MAX_DOCUMENT_CHARS]):
+            return False
+        self.add(source, text)
+        return True
+
+    def search(self, query: str, k: int = RETRIEVAL_TOP_K) -> List[Tuple[float, Chunk]]:
+        """
+        Return the `k` chunks that best match the query, best first.
+
+        Only the postings of the query terms are scored, so a query costs
+        time proportional to the chunks sharing a term with it.
+
+        Returns:
+            List of (BM25 score, chunk); chunks without a matching term are left out.
+        """
+        if not self._chunks or k <= 0:
+            return []
+        count = len(self._chunks)
+        average_length = self._total_length / count
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, tf in postings.items():
+                norm = K1 * (1 - B + B * self._chunks[chunk_id].length / average_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(score, self._chunks[chunk_id]) for chunk_id, score in best]
+
+    def snippets(self, query: str, k: int = RETRIEVAL_TOP_K, max_chars: int = RETRIEVAL_MAX_CHARS) -> List[str]:
+        """
+        Return the best matching excerpts for a prompt, labeled with their source.
+
+        Returns:
+            List[str]: At most `k` excerpts totalling at most `max_chars` characters.
+        """
+        results = []
+        budget = max_chars
+        for _, chunk in self.search(query, k):
+            text = f"[{chunk.source}] {' '.join(chunk.text.split())}"
+            if len(text) > budget:
+                if results or budget < 80:
+                    break
+                text = text[:budget - 4].rsplit(" ", 1)[0] + " ..."
+            results.append(text)
+            budget -= len(text)
+        return results
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def query_text(parts: Iterable[Optional[str]]) -> str:
+    """Join the non-empty parts of a retrieval query."""
+    return "\n".join(part for part in parts if part)
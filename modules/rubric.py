@@ -0,0 +1,380 @@
+"""
+rubric.py
+
+Numeric rubric scores per answer and cross-session progress analytics.
+
+Every evaluation also returns a 1-5 score per rubric dimension (structure,
+relevance, specificity, impact). Scores are appended to a columnar history:
+one NumPy array per column in memory, fixed-size binary records on disk
+(`RUBRIC_HISTORY_PATH`), so tens of thousands of turns load with a single
+`np.fromfile` and cost about 20 bytes each.
+
+Progress is computed with vectorized NumPy operations over the history:
+rolling averages, per-dimension trends and percentiles against the cohort
+(all users in the history).
+
+Usage:
+    python -m modules.rubric report --user <user id>
+    python -m modules.rubric report --synthetic 50000
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.config import EVALUATION_PERSONAS, PROGRESS_WINDOW, RUBRIC_HISTORY_PATH
+from modules.structured_output import loads as parse_json
+
+logger = logging.getLogger(__name__)
+
+RUBRIC_DIMENSIONS = ("structure", "relevance", "specificity", "impact")
+# What each dimension means, shown to the model next to its name
+RUBRIC_DESCRIPTIONS = {
+    "structure": "clear, logical flow (e.g., situation, task, action, result)",
+    "relevance": "addresses the question asked for this job title",
+    "specificity": "concrete examples, details and numbers",
+    "impact": "results, ownership and what was learned",
+}
+SCORE_MIN, SCORE_MAX = 1, 5
+
+QUESTION_TYPES = ("Behavioral", "Role-specific", "Technical")
+PERSONAS = tuple(EVALUATION_PERSONAS)
+UNKNOWN = 255
+
+# On-disk record; in memory each field is its own array
+RECORD = np.dtype([
+    ("ts", "<f8"),
+    ("user", "<u8"),
+    ("question_type", "u1"),
+    ("persona", "u1"),
+    ("scores", "u1", (len(RUBRIC_DIMENSIONS),)),
+])
+
+
+def rubric_prompt_dimensions() -> Dict[str, str]:
+    """
+    Return the rubric dimensions and their descriptions for the evaluation
+    prompt, in `RUBRIC_DIMENSIONS` order, so the prompt always names the
+    fields `rubric_schema` requires.
+    """
+    return {name: RUBRIC_DESCRIPTIONS.get(name, "") for name in RUBRIC_DIMENSIONS}
+
+
+def rubric_schema() -> Dict[str, Any]:
+    """Return the JSON schema of the `scores` field of an evaluation."""
+    return {
+        "type": "object",
+        "properties": {
+            name: {"type": "integer", "minimum": SCORE_MIN, "maximum": SCORE_MAX}
+            for name in RUBRIC_DIMENSIONS
+        },
+        "required": list(RUBRIC_DIMENSIONS),
+        "additionalProperties": False,
+    }
+
+
+def parse_scores(raw_response: str) -> Optional[List[int]]:
+    """
+    Extract the rubric scores from a structured evaluation response.
+
+    Returns:
+        Optional[List[int]]: Scores in `RUBRIC_DIMENSIONS` order (clipped to
+        the scale), or None if the response has no complete scores.
+    """
+    try:
+        scores = parse_json(raw_response)["scores"]
+        values = [int(scores[name]) for name in RUBRIC_DIMENSIONS]
+    except (TypeError, ValueError, KeyError):
+        return None
+    return [min(SCORE_MAX, max(SCORE_MIN, value)) for value in values]
+
+
+def user_key(user_id: str) -> int:
+    """Stable 64-bit key of a user id (the history stores no names)."""
+    return int.from_bytes(hashlib.blake2b(user_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _code(value: Optional[str], values: Sequence[str]) -> int:
+    return values.index(value) if value in values else UNKNOWN
+
+
+# ---------------------------------------------------------------------
+# History
+# ---------------------------------------------------------------------
+class ScoreHistory:
+    """
+    Columnar, append-only history of rubric scores.
+
+    Args:
+        path: Record file, appended on every score and read back on `refresh`
+            (None keeps the history in memory only).
+    """
+
+    def __init__(self, path: Optional[str] = None, capacity: int = 1024):
+        self.path = path
+        self._lock = threading.Lock()
+        self._size = 0
+        self._columns = {name: np.zeros((capacity,) + RECORD[name].shape, RECORD[name].base) for name in RECORD.names}
+        self._file_records = 0
+        if path:
+            self.refresh()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def column(self, name: str) -> np.ndarray:
+        """Return a read-only view of a column ("ts", "user", "question_type", "persona", "scores")."""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        capacity = len(self._columns["ts"])
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2)
+        for name, column in self._columns.items():
+            grown = np.zeros((capacity,) + column.shape[1:], column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def _extend(self, records: np.ndarray) -> None:
+        self._reserve(len(records))
+        end = self._size + len(records)
+        for name in RECORD.names:
+            self._columns[name][self._size:end] = records[name]
+        self._size = end
+
+    def append(
+        self,
+        user_id: str,
+        scores: Sequence[int],
+        question_type: Optional[str] = None,
+        persona: Optional[str] = None,
+        ts: Optional[float] = None,
+    ) -> None:
+        """Record the scores of one answer."""
+        record = np.zeros(1, RECORD)
+        record["ts"] = time.time() if ts is None else ts
+        record["user"] = user_key(user_id)
+        record["question_type"] = _code(question_type, QUESTION_TYPES)
+        record["persona"] = _code(persona, PERSONAS)
+        record["scores"] = scores
+        with self._lock:
+            if self.path:
+                self._read_new_records()
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "ab") as f:
+                    f.write(record.tobytes())
+                self._file_records += 1
+            self._extend(record)
+
+    def extend(self, records: np.ndarray) -> None:
+        """Append many records (a `RECORD` array) in memory, e.g. for imports and benchmarks."""
+        with self._lock:
+            self._extend(records)
+
+    def refresh(self) -> int:
+        """Load records appended to the file by other processes. Returns how many were added."""
+        with self._lock:
+            return self._read_new_records()
+
+    def _read_new_records(self) -> int:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return 0
+        available = size // RECORD.itemsize
+        if available <= self._file_records:
+            return 0
+        records = np.fromfile(
+            self.path, dtype=RECORD, count=available - self._file_records, offset=self._file_records * RECORD.itemsize
+        )
+        self._file_records += len(records)
+        self._extend(records)
+        return len(records)
+
+
+_history: Optional[ScoreHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_history() -> ScoreHistory:
+    """Return the process-wide score history, loading `RUBRIC_HISTORY_PATH` on first use."""
+    global _history
+    with _history_lock:
+        if _history is None or _history.path != RUBRIC_HISTORY_PATH:
+            _history = ScoreHistory(RUBRIC_HISTORY_PATH)
+            logger.info(f"Loaded {len(_history)} rubric score records from {RUBRIC_HISTORY_PATH}")
+        return _history
+
+
+# ---------------------------------------------------------------------
+# Analytics
+# ---------------------------------------------------------------------
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing mean over `window` rows (fewer for the first rows), per column.
+
+    Uses one cumulative sum, so it costs O(n) whatever the window.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    cumulative = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - max(1, window), 0)
+    counts = (end - start).reshape((-1,) + (1,) * (values.ndim - 1))
+    return (cumulative[end] - cumulative[start]) / counts
+
+
+def trends(scores: np.ndarray) -> np.ndarray:
+    """Least-squares slope of each column over the row index (score points per turn)."""
+    n = len(scores)
+    if n < 2:
+        return np.zeros(scores.shape[1])
+    x = np.arange(n, dtype=np.float64)
+    x -= x.mean()
+    y = scores - scores.mean(axis=0)
+    return x @ y / (x @ x)
+
+
+def user_means(users: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Mean scores per user.
+
+    Returns:
+        (user keys, means with one row per user, turns per user)
+    """
+    keys, inverse, counts = np.unique(users, return_inverse=True, return_counts=True)
+    dims = scores.shape[1]
+    flat = (inverse[:, None] * dims + np.arange(dims)).ravel()
+    sums = np.bincount(flat, weights=scores.ravel(), minlength=len(keys) * dims).reshape(len(keys), dims)
+    return keys, sums / counts[:, None], counts
+
+
+def percentile_of(cohort: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Percentile rank of each value in its cohort column (ties count half)."""
+    below = (cohort < values).sum(axis=0)
+    ties = (cohort == values).sum(axis=0)
+    return 100.0 * (below + 0.5 * ties) / len(cohort)
+
+
+def progress(
+    history: ScoreHistory,
+    user_id: str,
+    window: int = PROGRESS_WINDOW,
+    question_type: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Compute a user's progress against the cohort.
+
+    Args:
+        history: Score history.
+        user_id: User whose turns are analyzed.
+        window: Turns in the rolling average.
+        question_type: Only use turns of this question type.
+
+    Returns:
+        Optional[Dict]: None if the user has no scored turns, otherwise:
+            turns: Number of scored turns.
+            rolling: Rolling average per turn and dimension (turns x dimensions).
+            latest: Rolling average of the last turn per dimension.
+            trend: Score points per turn per dimension.
+            percentile: Percentile of the user's mean per dimension among all users.
+            cohort_users: Users in the cohort.
+    """
+    users = history.column("user")
+    scores = history.column("scores")
+    if question_type is not None:
+        mask = history.column("question_type") == _code(question_type, QUESTION_TYPES)
+        users, scores = users[mask], scores[mask]
+
+    mine = scores[users == np.uint64(user_key(user_id))].astype(np.float64)
+    if not len(mine):
+        return None
+
+    rolling = rolling_mean(mine, window)
+    _, cohort, _ = user_means(users, scores)
+    return {
+        "dimensions": RUBRIC_DIMENSIONS,
+        "turns": len(mine),
+        "rolling": rolling,
+        "latest": rolling[-1],
+        "trend": trends(mine),
+        "percentile": percentile_of(cohort, mine.mean(axis=0)),
+        "cohort_users": len(cohort),
+    }
+
+
+def format_progress(report: Dict[str, Any]) -> str:
+    """Format a `progress` result as a plain-text table."""
+    lines = [f"{report['turns']} scored turns, cohort of {report['cohort_users']} users",
+             f"{'dimension':<14}{'latest':>8}{'trend':>9}{'pctile':>8}"]
+    for i, name in enumerate(report["dimensions"]):
+        lines.append(
+            f"{name:<14}{report['latest'][i]:>8.2f}{report['trend'][i]:>+9.3f}{report['percentile'][i]:>8.0f}"
+        )
+    return "\n".join(lines)
+
+
+def synthetic_records(turns: int, users: int, seed: int = 0) -> np.ndarray:
+    """Random records with per-user skill and learning rates, for benchmarks and tests."""
+    rng = np.random.default_rng(seed)
+    records = np.zeros(turns, RECORD)
+    user_index = rng.integers(0, users, turns)
+    keys = np.array([user_key(f"user-{i}") for i in range(users)], dtype=np.uint64)
+    turn_index = np.arange(turns) / max(1, turns) * 20
+    skill = rng.normal(3, 0.6, (users, len(RUBRIC_DIMENSIONS)))
+    learning = rng.normal(0.03, 0.02, users)
+    raw = skill[user_index] + learning[user_index, None] * turn_index[:, None] + rng.normal(0, 0.7, skill[user_index].shape)
+    records["ts"] = time.time() - (turns - np.arange(turns)) * 60
+    records["user"] = keys[user_index]
+    records["question_type"] = rng.integers(0, len(QUESTION_TYPES), turns)
+    records["persona"] = rng.integers(0, len(PERSONAS), turns)
+    records["scores"] = np.clip(np.rint(raw), SCORE_MIN, SCORE_MAX)
+    return records
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: `python -m modules.rubric report`."""
+    parser = argparse.ArgumentParser(description="Rubric score progress analytics")
+    parser.add_argument("--path", default=RUBRIC_HISTORY_PATH, help="Score history file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="Show a user's progress against the cohort")
+    report.add_argument("--user", help="User id (default: the first user of a synthetic history)")
+    report.add_argument("--window", type=int, default=PROGRESS_WINDOW)
+    report.add_argument("--question-type", choices=QUESTION_TYPES)
+    report.add_argument("--synthetic", type=int, default=0, help="Analyze N synthetic turns instead of the file")
+    report.add_argument("--users", type=int, default=500, help="Users in the synthetic history")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        history = ScoreHistory()
+        history.extend(synthetic_records(args.synthetic, args.users))
+        user_id = args.user or "user-0"
+    else:
+        history = ScoreHistory(args.path)
+        if not args.user:
+            parser.error("--user is required unless --synthetic is given")
+        user_id = args.user
+
+    started = time.perf_counter()
+    result = progress(history, user_id, args.window, args.question_type)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if result is None:
+        print(f"No scored turns for {user_id} in {len(history)} records")
+        return 1
+    print(format_progress(result))
+    print(f"\nAnalyzed {len(history)} records in {elapsed_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,18 @@
 import streamlit as st
 import logging
-from typing import Any, Dict
+import re
+import secrets
+import uuid
+from typing import Any, Dict, Optional
+from modules.config import ENABLE_RUBRIC_SCORES
+from modules.retrieval import DocumentIndex
+from modules.transcript import Transcript
 
 logger = logging.getLogger(__name__)
 
+# Progress link tokens are issued by the server (`secrets.token_urlsafe(16)`, 22 characters)
+_PROGRESS_TOKEN = re.compile(r"[A-Za-z0-9_-]{22,64}")
+
 def initialize_session_state() -> None:
     """
     Initialize all required Streamlit session state variables with default values.
@@ -13,20 +22,17 @@ def initialize_session_state() -> None:
     
     Defaults include:
         - Interview state: started, job_title, question_type, difficulty
-        - Questions, answers, feedback tracking
+        - Interview transcript (questions, answers, feedback)
         - Sidebar and welcome screen clarification flags
     """
     defaults: Dict[str, Any] = {
         # Core interview state
+        "session_id": uuid.uuid4().hex[:12],
         "started": False,
         "job_title": "",
         "question_type": "Behavioral",
         "difficulty": "Easy",
-        "questions": [],
-        "answers": [],
-        "current_question_index": 0,
         "job_error": "",
-        "feedbacks": [],
 
         # Welcome screen clarification
         "needs_clarification": False,
@@ -54,6 +60,11 @@ def initialize_session_state() -> None:
 
     for key, value in defaults.items():
         st.session_state.setdefault(key, value)
+
+    if "user_id" not in st.session_state:
+        st.session_state.user_id = _progress_token() if ENABLE_RUBRIC_SCORES else st.session_state.session_id
+
+    get_transcript()
     
     logger.info("Session state initialized with default values.")
 
@@ -64,4 +75,71 @@ def get_openai_settings() -> dict:
         "model": st.session_state.get("model", "gpt-4o-mini"),
         "temperature": st.session_state.get("temperature", 0.2),
         "max_tokens_eval": st.session_state.get("max_tokens_eval", 250),
-    }
\ No newline at end of file
+        "max_tokens": st.session_state.get("max_tokens_question_and_summary", 800),
+    }
+
+
+def get_transcript() -> Transcript:
+    """
+    Return the session's interview transcript, creating it if needed.
+
+    Also marks the transcript as recently used for the idle sweeper.
+    """
+    transcript = st.session_state.get("transcript")
+    if transcript is None:
+        session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex[:12])
+        transcript = Transcript(session_id)
+        st.session_state.transcript = transcript
+    transcript.touch()
+    return transcript
+
+
+def _progress_token() -> str:
+    """
+    Return the `?progress=` token of this browser's progress link, issuing a new one if needed.
+
+    The token is random and issued by the server, so progress cannot be looked
+    up by guessing a name. It is a bearer link: whoever has the URL sees its scores.
+    """
+    token = st.query_params.get("progress")
+    if not token or not _PROGRESS_TOKEN.fullmatch(token):
+        token = secrets.token_urlsafe(16)
+        st.query_params["progress"] = token
+    return token
+
+
+def get_user_id() -> str:
+    """
+    Return the id under which rubric scores are recorded across sessions.
+
+    With rubric scores enabled, this is the session's progress link token
+    (`?progress=`), otherwise the session id.
+    """
+    user_id = st.session_state.get("user_id")
+    if not user_id:
+        user_id = st.session_state.setdefault("session_id", uuid.uuid4().hex[:12])
+    return user_id
+
+
+def get_document_index() -> DocumentIndex:
+    """Return the session's index of uploaded documents, creating it if needed."""
+    index = st.session_state.get("documents")
+    if index is None:
+        index = DocumentIndex()
+        st.session_state.documents = index
+    return index
+
+
+_TURN_WIDGET_KEY = re.compile(r"^(answer|submit)_\d+$")
+
+
+def clear_turn_widgets(keep_index: Optional[int] = None) -> None:
+    """
+    Remove per-turn widget state (`answer_{i}`, `submit_{i}`) left behind by past turns.
+
+    Args:
+        keep_index: Turn index whose widgets should be kept, if any.
+    """
+    for key in list(st.session_state.keys()):
+        if _TURN_WIDGET_KEY.match(key) and key.rsplit("_", 1)[1] != str(keep_index):
+            del st.session_state[key]
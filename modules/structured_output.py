@@ -0,0 +1,285 @@
+"""
+structured_output.py
+
+Parsing, validation and repair of structured (JSON) model output.
+
+- `loads` uses orjson when it is installed and falls back to the standard
+  library. Both raise `json.JSONDecodeError` on invalid input.
+- `validator` compiles a response's JSON schema once into a checking
+  function, which is cached for later responses with the same schema.
+- `repair_json` completes a JSON document cut off at `max_output_tokens`.
+  It keeps the members and items that were completed and closes the open
+  objects and arrays.
+
+`modules.utils` uses these to recover truncated structured responses locally
+and, only if a required field is still missing, to ask for a short
+continuation instead of repeating the whole call.
+"""
+
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Returns the problems found in a parsed response (empty if it matches the schema).
+Validator = Callable[[Any], List[str]]
+
+
+def loads(text: Any) -> Any:
+    """Parse JSON text with the fastest available parser."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+# ---------------------------------------------------------------------
+# Schema validation
+# ---------------------------------------------------------------------
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+_validators: Dict[str, Validator] = {}
+_validators_lock = threading.Lock()
+
+
+def compile_schema(schema: Dict[str, Any]) -> Validator:
+    """
+    Compile a JSON schema into a validation function.
+
+    Supports the keywords used by strict structured outputs: type (single or
+    list), properties, required, additionalProperties, items, enum,
+    minLength, minimum and maximum.
+    """
+    checks: List[Callable[[Any, str], List[str]]] = []
+
+    types = schema.get("type")
+    if types is not None:
+        names = [types] if isinstance(types, str) else list(types)
+        type_checks = [_TYPE_CHECKS[name] for name in names if name in _TYPE_CHECKS]
+        expected = " or ".join(names)
+
+        def check_type(value: Any, path: str) -> List[str]:
+            if any(check(value) for check in type_checks):
+                return []
+            return [f"{path}: expected {expected}, got {type(value).__name__}"]
+
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+        checks.append(lambda value, path: [] if value in allowed else [f"{path}: {value!r} not allowed"])
+
+    if "minLength" in schema:
+        min_length = schema["minLength"]
+        checks.append(
+            lambda value, path: [f"{path}: shorter than {min_length}"]
+            if isinstance(value, str) and len(value) < min_length else []
+        )
+
+    for keyword, fails in (("minimum", lambda v, bound: v < bound), ("maximum", lambda v, bound: v > bound)):
+        if keyword in schema:
+            bound = schema[keyword]
+            checks.append(
+                lambda value, path, bound=bound, fails=fails, keyword=keyword: [f"{path}: {keyword} is {bound}"]
+                if _TYPE_CHECKS["number"](value) and fails(value, bound) else []
+            )
+
+    properties = {name: compile_schema(sub) for name, sub in schema.get("properties", {}).items()}
+    required = list(schema.get("required", []))
+    closed = schema.get("additionalProperties") is False
+    if properties or required or closed:
+
+        def check_object(value: Any, path: str) -> List[str]:
+            if not isinstance(value, dict):
+                return []
+            problems = [f"{path}.{name}: missing" for name in required if name not in value]
+            for name, item in value.items():
+                sub = properties.get(name)
+                if sub is not None:
+                    problems.extend(sub(item, f"{path}.{name}"))
+                elif closed:
+                    problems.append(f"{path}.{name}: not allowed")
+            return problems
+
+        checks.append(check_object)
+
+    if "items" in schema:
+        item_check = compile_schema(schema["items"])
+
+        def check_items(value: Any, path: str) -> List[str]:
+            if not isinstance(value, list):
+                return []
+            problems: List[str] = []
+            for i, item in enumerate(value):
+                problems.extend(item_check(item, f"{path}[{i}]"))
+            return problems
+
+        checks.append(check_items)
+
+    def validate(value: Any, path: str = "$") -> List[str]:
+        problems: List[str] = []
+        for check in checks:
+            problems.extend(check(value, path))
+        return problems
+
+    return validate
+
+
+def validator(structured_output: Optional[Dict[str, Any]]) -> Optional[Validator]:
+    """
+    Return the compiled validator for a `text` request parameter (a `json_schema` format).
+
+    Returns:
+        The validator, or None if the request has no JSON schema.
+    """
+    fmt = (structured_output or {}).get("format") or {}
+    schema = fmt.get("schema")
+    if fmt.get("type") != "json_schema" or not schema:
+        return None
+    key = json.dumps(schema, sort_keys=True)
+    compiled = _validators.get(key)
+    if compiled is None:
+        with _validators_lock:
+            compiled = _validators.get(key)
+            if compiled is None:
+                compiled = _validators[key] = compile_schema(schema)
+                logger.debug(f"Compiled validator for {fmt.get('name', 'schema')}")
+    return compiled
+
+
+def parse_valid(text: str, validate: Validator) -> Optional[Any]:
+    """Parse `text` and return the data if it matches the schema, otherwise None."""
+    try:
+        data = loads(text)
+    except (TypeError, ValueError):
+        return None
+    return data if not validate(data) else None
+
+
+# ---------------------------------------------------------------------
+# Repair of truncated JSON
+# ---------------------------------------------------------------------
+def repair_json(text: str, close_strings: bool = False) -> Optional[str]:
+    """
+    Complete a JSON object or array that was cut off.
+
+    Members and items that were completed before the cut are kept, the one
+    being written is dropped, and open containers are closed. With
+    `close_strings`, a string value cut off mid-way is kept and closed instead.
+
+    Args:
+        text: Truncated JSON text.
+        close_strings: Keep a partial string value.
+
+    Returns:
+        The repaired JSON text, or None if nothing could be salvaged.
+    """
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        return None
+
+    stack: List[str] = []
+    # Per open object: whether the next string is a key
+    expect_key: List[bool] = []
+    in_string = escaped = is_key = False
+    # End of the last prefix that is valid JSON once closed, and the stack at that point
+    safe_end, safe_stack = -1, ""
+    string_start = -1
+
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+                if not is_key:
+                    safe_end, safe_stack = i + 1, "".join(stack)
+            continue
+
+        if char == '"':
+            in_string, string_start = True, i
+            is_key = bool(stack) and stack[-1] == "{" and expect_key[-1]
+        elif char in "{[":
+            stack.append(char)
+            expect_key.append(char == "{")
+            safe_end, safe_stack = i + 1, "".join(stack)
+        elif char in "}]":
+            if not stack:
+                break
+            stack.pop()
+            expect_key.pop()
+            safe_end, safe_stack = i + 1, "".join(stack)
+            if not stack:
+                break
+        elif char == ",":
+            # The value before the comma is complete
+            if text[safe_end:i].strip() and not text[safe_end:i].strip().startswith(":"):
+                safe_end, safe_stack = i, "".join(stack)
+            if stack and stack[-1] == "{":
+                expect_key[-1] = True
+        elif char == ":":
+            if stack and stack[-1] == "{":
+                expect_key[-1] = False
+
+    if not stack and safe_end > start:
+        # Nothing was left open
+        return text[start:safe_end]
+
+    if in_string and not is_key and close_strings:
+        partial = text[start:]
+        if escaped:
+            partial = partial[:-1]
+        # A cut \\uXXXX escape cannot be closed
+        tail = partial[string_start - start:]
+        cut_escape = tail.rfind("\\u")
+        if cut_escape >= 0 and len(tail) - cut_escape < 6:
+            partial = partial[:len(partial) - (len(tail) - cut_escape)]
+        return partial + '"' + _closers("".join(stack))
+
+    if safe_end < 0:
+        return None
+    prefix = text[start:safe_end].rstrip()
+    # A completed key without its value (`"key":`) or a trailing comma is dropped
+    while prefix.endswith((",", ":")):
+        prefix = prefix[:-1].rstrip()
+        if prefix.endswith('"') and prefix[-2:] != '\\"':
+            key_start = _string_start(prefix)
+            prefix = prefix[:key_start].rstrip()
+    return prefix + _closers(safe_stack)
+
+
+def _closers(stack: str) -> str:
+    return "".join("}" if opener == "{" else "]" for opener in reversed(stack))
+
+
+def _string_start(text: str) -> int:
+    # Index of the opening quote of the string that ends `text`
+    i = len(text) - 2
+    while i >= 0:
+        if text[i] == '"':
+            backslashes = 0
+            j = i - 1
+            while j >= 0 and text[j] == "\\":
+                backslashes += 1
+                j -= 1
+            if backslashes % 2 == 0:
+                return i
+        i -= 1
+    return 0
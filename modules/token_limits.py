@@ -0,0 +1,250 @@
+"""
+token_limits.py
+
+Adaptive `max_output_tokens` per task, prompt template and model.
+
+The configured caps are sized for the longest output a task could need, for
+example 800 tokens for a question that is one sentence of JSON. A cap that
+is far too high costs nothing on normal responses, but it lets a rambling
+response run long, which raises tail latency and worst-case cost. The
+limiter learns the output lengths of each (task, templates, model) from the
+usage ledger and from calls made by this process. It then lowers the cap to
+the `ADAPTIVE_TOKEN_PERCENTILE` of those lengths plus `ADAPTIVE_TOKEN_HEADROOM`.
+The configured cap remains the upper bound.
+
+When a response is cut short by a lowered cap, that task's cap is doubled for
+later calls, and `_request_llm` asks again once with the configured cap.
+
+Usage:
+    python -m modules.token_limits report
+"""
+
+import argparse
+import logging
+import math
+import sys
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from modules import ledger
+from modules.config import (
+    ADAPTIVE_TOKEN_FLOOR,
+    ADAPTIVE_TOKEN_HEADROOM,
+    ADAPTIVE_TOKEN_LEDGER_LINES,
+    ADAPTIVE_TOKEN_MIN_SAMPLES,
+    ADAPTIVE_TOKEN_PERCENTILE,
+    ADAPTIVE_TOKEN_WINDOW,
+    ENABLE_ADAPTIVE_TOKEN_LIMITS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Caps are rounded up to a multiple of this, so they change in steps rather than
+# on every call (each distinct cap is a distinct request for the provider).
+CAP_STEP = 16
+
+# (task, templates, model)
+LimitKey = Tuple[str, str, str]
+
+
+def limit_key(task: str, model: str, templates: Iterable[str]) -> LimitKey:
+    """Key under which output lengths are learned; templates are order-independent."""
+    return task, "+".join(sorted(set(templates))), model
+
+
+class TokenLimiter:
+    """
+    Learns output lengths per key and derives `max_output_tokens` from them.
+
+    Args:
+        percentile: Percentile of observed output lengths the cap is based on.
+        headroom: Fraction added on top of the percentile.
+        min_samples: Observations needed before a cap is lowered.
+        window: Observations kept per key (most recent).
+        floor: Lowest cap ever returned.
+    """
+
+    def __init__(
+        self,
+        percentile: float = ADAPTIVE_TOKEN_PERCENTILE,
+        headroom: float = ADAPTIVE_TOKEN_HEADROOM,
+        min_samples: int = ADAPTIVE_TOKEN_MIN_SAMPLES,
+        window: int = ADAPTIVE_TOKEN_WINDOW,
+        floor: int = ADAPTIVE_TOKEN_FLOOR,
+    ):
+        self.percentile = percentile
+        self.headroom = headroom
+        self.min_samples = max(1, min_samples)
+        self.window = max(1, window)
+        self.floor = floor
+        self._samples: Dict[LimitKey, Deque[int]] = {}
+        self._raised: Dict[LimitKey, int] = {}
+        self._learned: Dict[LimitKey, Optional[int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: LimitKey, output_tokens: int, cap: Optional[int] = None, truncated: bool = False) -> None:
+        """
+        Record the output length of one call.
+
+        A truncated output only shows that the task needed more than `cap`:
+        the cap counts as the observed length, and the key's cap is raised to
+        at least twice `cap`.
+        """
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            if truncated and cap:
+                samples.append(cap)
+                self._raised[key] = max(self._raised.get(key, 0), 2 * cap)
+            else:
+                samples.append(output_tokens)
+            self._learned.pop(key, None)
+
+    def load(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Learn from usage ledger records.
+
+        Cache hits and calls whose output length says nothing about the task
+        (the repeat after a truncation carries no templates) are skipped.
+
+        Returns:
+            int: Number of records learned from.
+        """
+        count = 0
+        for record in records:
+            if record.get("task") in (None, "cache_hit") or record.get("cap_retry") or "out" not in record:
+                continue
+            key = limit_key(record["task"], record.get("model", ""), record.get("tpl", []))
+            self.observe(key, record["out"], record.get("cap"), bool(record.get("trunc")))
+            count += 1
+        return count
+
+    def limit(self, key: LimitKey, ceiling: int) -> int:
+        """
+        Return `max_output_tokens` for the next call under `key`.
+
+        Args:
+            key: Task, templates and model of the call.
+            ceiling: The configured cap, which is never exceeded.
+
+        Returns:
+            int: The learned cap, or `ceiling` until enough outputs were observed.
+        """
+        with self._lock:
+            if key not in self._learned:
+                self._learned[key] = self._compute(key)
+            learned = self._learned[key]
+        if learned is None:
+            return ceiling
+        return min(ceiling, learned)
+
+    def _compute(self, key: LimitKey) -> Optional[int]:
+        # Called with self._lock held
+        samples = self._samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        # Nearest-rank percentile
+        rank = max(1, math.ceil(self.percentile / 100 * len(ordered)))
+        cap = math.ceil(ordered[rank - 1] * (1 + self.headroom))
+        cap = math.ceil(cap / CAP_STEP) * CAP_STEP
+        return max(self.floor, cap, self._raised.get(key, 0))
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per key: observations, median and percentile output length, learned cap and raised cap."""
+        rows = []
+        with self._lock:
+            for key, samples in sorted(self._samples.items()):
+                ordered = sorted(samples)
+                rank = max(1, math.ceil(self.percentile / 100 * len(ordered)))
+                rows.append({
+                    "task": key[0],
+                    "templates": key[1],
+                    "model": key[2],
+                    "samples": len(ordered),
+                    "p50": ordered[(len(ordered) - 1) // 2],
+                    "percentile": ordered[rank - 1],
+                    "cap": self._compute(key),
+                    "raised": self._raised.get(key),
+                })
+        return rows
+
+
+_limiter: Optional[TokenLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> TokenLimiter:
+    """
+    Return the process-wide limiter, learning from the most recent
+    `ADAPTIVE_TOKEN_LEDGER_LINES` usage ledger records on first use.
+    """
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                limiter = TokenLimiter()
+                count = limiter.load(ledger.read_ledger(ledger.USAGE_LEDGER_PATH, last=ADAPTIVE_TOKEN_LEDGER_LINES))
+                logger.info(f"Learned output lengths from {count} ledger records")
+                _limiter = limiter
+    return _limiter
+
+
+def current_key(task: str, model: str) -> LimitKey:
+    """Key for a call about to be made from this thread, with the templates rendered for it."""
+    return limit_key(task, model, ledger.pending_templates())
+
+
+def output_cap(key: LimitKey, ceiling: int) -> int:
+    """Return the adaptive cap for a call, or `ceiling` when adaptive limits are disabled."""
+    if not ENABLE_ADAPTIVE_TOKEN_LIMITS or not ceiling:
+        return ceiling
+    return get_limiter().limit(key, ceiling)
+
+
+def observe(key: LimitKey, output_tokens: int, cap: int, truncated: bool) -> None:
+    """Record a completed call's output length (no-op when adaptive limits are disabled)."""
+    if not ENABLE_ADAPTIVE_TOKEN_LIMITS:
+        return
+    get_limiter().observe(key, output_tokens, cap, truncated)
+    if truncated:
+        logger.warning(f"Output of task={key[0]} hit its cap of {cap} tokens; raising the cap")
+
+
+# ---------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------
+def format_stats(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'task':<14}{'model':<16}{'calls':>7}{'p50':>7}{'pct':>7}{'cap':>7}  templates"]
+    for row in rows:
+        cap = row["cap"] if row["cap"] is not None else "-"
+        lines.append(
+            f"{row['task']:<14}{row['model']:<16}{row['samples']:>7}{row['p50']:>7}"
+            f"{row['percentile']:>7}{cap:>7}  {row['templates'] or '-'}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: `python -m modules.token_limits report`."""
+    parser = argparse.ArgumentParser(description="Adaptive output token caps learned from the usage ledger")
+    parser.add_argument("--path", default=ledger.USAGE_LEDGER_PATH, help="Usage ledger file")
+    parser.add_argument("--lines", type=int, default=ADAPTIVE_TOKEN_LEDGER_LINES, help="Most recent ledger lines to read")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("report", help="Show observed output lengths and learned caps per task")
+    args = parser.parse_args(argv)
+
+    limiter = TokenLimiter()
+    if not limiter.load(ledger.read_ledger(args.path, last=args.lines)):
+        print(f"No calls in {args.path}")
+        return 1
+    print(f"Caps: p{limiter.percentile:g} of output tokens + {limiter.headroom:.0%} "
+          f"(at least {limiter.floor}, after {limiter.min_samples} calls)\n")
+    print(format_stats(limiter.stats()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
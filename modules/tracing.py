@@ -0,0 +1,564 @@
+"""
+tracing.py
+
+Lightweight request tracing.
+
+Each user action (Start, Submit, Finish, Restart) and each rerun opens a
+trace. Within it, spans time prompt building and template rendering, every
+LLM call and each of its attempts (tenacity retries are span events), JSON
+parsing and UI rendering. Work submitted to the shared executor inherits the
+span it was submitted from, so background calls appear in the right trace.
+
+The session, trace and span IDs of the current context are added to every log
+record (`TraceContextFilter`), whether or not tracing is enabled. With
+`ENABLE_TRACING=True`, finished traces are exported to `TRACE_PATH` as JSONL
+or, with `TRACE_EXPORTER=otlp`, posted as OTLP/HTTP JSON to
+`TRACE_OTLP_ENDPOINT`. When tracing is off, `span()` costs a single context
+variable lookup.
+
+Usage:
+    python -m modules.tracing report --top 10
+    python -m modules.tracing collect --port 4318   # OTLP/HTTP JSON collector stand-in
+"""
+
+import argparse
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from modules.config import ENABLE_TRACING, TRACE_EXPORTER, TRACE_OTLP_ENDPOINT, TRACE_PATH
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "interview-practice-app"
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("trace_span", default=None)
+
+_lock = threading.Lock()
+# Finished spans of traces whose root is still open
+_pending: Dict[str, List["Span"]] = defaultdict(list)
+_open_roots: set = set()
+
+
+class Span:
+    """
+    A timed operation within a trace.
+
+    Args:
+        name: Operation name (e.g. "llm_attempt").
+        trace_id: 32 hex digits shared by all spans of the trace.
+        parent: Enclosing span (None for the root of a trace).
+        session_id: Session the trace belongs to.
+        attributes: Initial attributes.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "session_id", "attributes", "events",
+                 "status", "start", "end", "_started")
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent: Optional["Span"] = None,
+        session_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent is not None else None
+        self.session_id = session_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.status = "ok"
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self._started = time.perf_counter()
+
+    def set(self, **attributes: Any) -> None:
+        """Add or overwrite attributes."""
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        """Record a point-in-time event (e.g. a retry) on this span."""
+        self.events.append({"name": name, "ts": round(time.time(), 6), **attributes})
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        if error is not None:
+            self.status = "error"
+            self.attributes["error"] = f"{type(error).__name__}: {error}"
+        self.end = self.start + (time.perf_counter() - self._started)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.time()) - self.start) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        record: Dict[str, Any] = {
+            "trace": self.trace_id,
+            "span": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "sid": self.session_id,
+            "ts": round(self.start, 6),
+            "ms": round(self.duration_ms, 2),
+            "status": self.status,
+        }
+        if self.attributes:
+            record["attrs"] = self.attributes
+        if self.events:
+            record["events"] = self.events
+        return record
+
+
+class _NoopSpan:
+    """Stand-in yielded by `span()` when tracing is off, so call sites need no checks."""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def current_span() -> Optional[Span]:
+    """Return the innermost open span (or trace root) of this context."""
+    return _current.get()
+
+
+# ---------------------------------------------------------------------
+# Traces and spans
+# ---------------------------------------------------------------------
+def _is_control_flow(exc: BaseException) -> bool:
+    # st.rerun() / st.stop() end a script run by raising; that is not an error
+    return not isinstance(exc, Exception)
+
+
+@contextmanager
+def trace(name: str, session_id: Optional[str] = None, **attributes: Any) -> Iterator[Span]:
+    """
+    Open a new trace for a user action or rerun.
+
+    The trace's IDs are added to log records even when tracing is off; its
+    spans are only recorded and exported when it is on.
+
+    Args:
+        name: Action name (e.g. "submit_answer").
+        session_id: Session the action belongs to (defaults to the enclosing trace's).
+        **attributes: Initial attributes of the root span.
+    """
+    outer = _current.get()
+    if session_id is None and outer is not None:
+        session_id = outer.session_id
+    root = Span(name, uuid.uuid4().hex, session_id=session_id, attributes=attributes)
+    if outer is not None:
+        root.attributes["outer_trace"] = outer.trace_id
+    if ENABLE_TRACING:
+        with _lock:
+            _open_roots.add(root.trace_id)
+    token = _current.set(root)
+    error: Optional[BaseException] = None
+    try:
+        yield root
+    except BaseException as exc:
+        if not _is_control_flow(exc):
+            error = exc
+        raise
+    finally:
+        _current.reset(token)
+        root.finish(error)
+        if ENABLE_TRACING:
+            _end_root(root)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Time the enclosed block as a child of the current span.
+
+    Outside a trace, the span starts a trace of its own (e.g. CLI and
+    benchmark runs). Yields a no-op span when tracing is off.
+    """
+    if not ENABLE_TRACING:
+        yield _NOOP
+        return
+
+    parent = _current.get()
+    if parent is None:
+        with trace(name, **attributes) as root:
+            yield root
+        return
+
+    child = Span(name, parent.trace_id, parent=parent, session_id=parent.session_id, attributes=attributes)
+    token = _current.set(child)
+    error: Optional[BaseException] = None
+    try:
+        yield child
+    except BaseException as exc:
+        if not _is_control_flow(exc):
+            error = exc
+        raise
+    finally:
+        _current.reset(token)
+        child.finish(error)
+        _end_span(child)
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of `span()`."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_retry(retry_state: Any) -> None:
+    """tenacity `before_sleep` hook: note a failed attempt on the current span."""
+    current = _current.get()
+    outcome = retry_state.outcome
+    error = outcome.exception() if outcome is not None else None
+    wait_s = retry_state.next_action.sleep if retry_state.next_action is not None else 0
+    logger.warning(f"Attempt {retry_state.attempt_number} failed ({error}); retrying in {wait_s:.1f} s")
+    if current is None or not ENABLE_TRACING:
+        return
+    current.set(retries=current.attributes.get("retries", 0) + 1)
+    current.add_event("retry", attempt=retry_state.attempt_number, wait_s=round(wait_s, 3), error=str(error))
+
+
+def next_attempt() -> int:
+    """Return the 1-based number of the next attempt under the current span (counts its retries)."""
+    current = _current.get()
+    return (current.attributes.get("retries", 0) + 1) if current is not None else 1
+
+
+# ---------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------
+def _end_span(finished: Span) -> None:
+    with _lock:
+        if finished.trace_id in _open_roots:
+            _pending[finished.trace_id].append(finished)
+            return
+    # Background work that outlived its trace's root is exported on its own
+    export([finished])
+
+
+def _end_root(root: Span) -> None:
+    with _lock:
+        _open_roots.discard(root.trace_id)
+        spans = _pending.pop(root.trace_id, [])
+    export([root, *spans])
+
+
+def export(spans: List[Span]) -> None:
+    """Export finished spans with the configured exporter."""
+    if not spans:
+        return
+    if TRACE_EXPORTER == "otlp":
+        from modules.executor import submit
+
+        submit(_post_otlp, to_otlp(spans), TRACE_OTLP_ENDPOINT)
+        return
+    lines = "".join(json.dumps(s.to_dict(), separators=(",", ":"), default=str) + "\n" for s in spans)
+    try:
+        with _lock:
+            os.makedirs(os.path.dirname(TRACE_PATH) or ".", exist_ok=True)
+            with open(TRACE_PATH, "a", encoding="utf-8") as f:
+                f.write(lines)
+    except OSError as e:
+        logger.warning(f"Could not write trace spans: {e}")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp(spans: List[Span]) -> Dict[str, Any]:
+    """Convert spans to an OTLP/HTTP JSON `ExportTraceServiceRequest`."""
+    otlp_spans = []
+    for s in spans:
+        attributes = dict(s.attributes)
+        if s.session_id:
+            attributes["session.id"] = s.session_id
+        otlp_spans.append({
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "parentSpanId": s.parent_id or "",
+            "name": s.name,
+            "kind": 1,
+            "startTimeUnixNano": str(int(s.start * 1e9)),
+            "endTimeUnixNano": str(int((s.end or s.start) * 1e9)),
+            "attributes": _otlp_attributes(attributes),
+            "events": [
+                {
+                    "name": event["name"],
+                    "timeUnixNano": str(int(event["ts"] * 1e9)),
+                    "attributes": _otlp_attributes({k: v for k, v in event.items() if k not in ("name", "ts")}),
+                }
+                for event in s.events
+            ],
+            "status": {"code": 2 if s.status == "error" else 1},
+        })
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": otlp_spans}],
+        }]
+    }
+
+
+def _post_otlp(payload: Dict[str, Any], endpoint: str) -> None:
+    request = urllib.request.Request(
+        endpoint,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=2):
+            pass
+    except OSError as e:
+        logger.debug(f"Could not export spans to {endpoint}: {e}")
+
+
+def from_otlp(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Convert an OTLP/HTTP JSON request back to span records (the JSONL format)."""
+    def value(v: Dict[str, Any]) -> Any:
+        if "intValue" in v:
+            return int(v["intValue"])
+        return next(iter(v.values()), None)
+
+    records = []
+    for resource_spans in payload.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for s in scope_spans.get("spans", []):
+                attributes = {a["key"]: value(a["value"]) for a in s.get("attributes", [])}
+                start = int(s["startTimeUnixNano"]) / 1e9
+                end = int(s["endTimeUnixNano"]) / 1e9
+                record = {
+                    "trace": s["traceId"],
+                    "span": s["spanId"],
+                    "parent": s.get("parentSpanId") or None,
+                    "name": s["name"],
+                    "sid": attributes.pop("session.id", None),
+                    "ts": round(start, 6),
+                    "ms": round((end - start) * 1000, 2),
+                    "status": "error" if s.get("status", {}).get("code") == 2 else "ok",
+                }
+                if attributes:
+                    record["attrs"] = attributes
+                events = [
+                    {"name": e["name"], "ts": int(e["timeUnixNano"]) / 1e9,
+                     **{a["key"]: value(a["value"]) for a in e.get("attributes", [])}}
+                    for e in s.get("events", [])
+                ]
+                if events:
+                    record["events"] = events
+                records.append(record)
+    return records
+
+
+# ---------------------------------------------------------------------
+# Log correlation
+# ---------------------------------------------------------------------
+class TraceContextFilter(logging.Filter):
+    """Add `session_id`, `trace_id` and `span_id` of the current context to log records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        current = _current.get()
+        if current is None:
+            record.session_id = record.trace_id = record.span_id = "-"
+        else:
+            record.session_id = current.session_id or "-"
+            record.trace_id = current.trace_id
+            record.span_id = current.span_id
+        return True
+
+
+# ---------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------
+def load_spans(path: str = TRACE_PATH, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Load span records from a JSONL file, optionally for one session."""
+    if not os.path.exists(path):
+        return []
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if session_id is None or record.get("sid") == session_id:
+                spans.append(record)
+    return spans
+
+
+def critical_path(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Return the spans that determined a trace's duration, in start order.
+
+    Walks back from the end of each span through the children that finished
+    last before the previous one started (sequential steps), and recurses into
+    them; concurrent children that finished earlier are off the critical path.
+    """
+    children: Dict[Optional[str], List[Dict[str, Any]]] = defaultdict(list)
+    for s in spans:
+        children[s["parent"]].append(s)
+
+    def end(s: Dict[str, Any]) -> float:
+        return s["ts"] + s["ms"] / 1000
+
+    def walk(node: Dict[str, Any]) -> List[Dict[str, Any]]:
+        chain = []
+        remaining = sorted(children.get(node["span"], []), key=end)
+        # Background work may outlive the span it was started from
+        limit = max([end(node)] + [end(s) for s in remaining])
+        while remaining:
+            last = remaining.pop()
+            if end(last) <= limit + 1e-6:
+                chain.append(last)
+                limit = last["ts"]
+                remaining = [s for s in remaining if end(s) <= limit + 1e-6]
+        path = [node]
+        for child in reversed(chain):
+            path.extend(walk(child))
+        return path
+
+    roots = children.get(None) or sorted(spans, key=lambda s: s["ts"])[:1]
+    return walk(max(roots, key=lambda s: s["ms"])) if roots else []
+
+
+def _label(s: Dict[str, Any]) -> str:
+    attrs = s.get("attrs", {})
+    detail = attrs.get("task") or attrs.get("template")
+    label = f"{s['name']}({detail})" if detail else s["name"]
+    if "attempt" in attrs:
+        label += f"#{attrs['attempt']}"
+    return label
+
+
+def format_report(spans: List[Dict[str, Any]], top: int = 10) -> str:
+    """Format the slowest traces with their critical paths, span statistics and retries."""
+    if not spans:
+        return "No spans found."
+
+    traces: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for s in spans:
+        traces[s["trace"]].append(s)
+
+    def trace_ms(group: List[Dict[str, Any]]) -> float:
+        return max(s["ts"] + s["ms"] / 1000 for s in group) * 1000 - min(s["ts"] for s in group) * 1000
+
+    lines = [f"{len(traces)} traces, {len(spans)} spans", "", "Slowest traces (critical path):"]
+    for trace_id, group in sorted(traces.items(), key=lambda item: -trace_ms(item[1]))[:top]:
+        path = critical_path(group)
+        root = path[0] if path else group[0]
+        lines.append(f"  {trace_ms(group):>8.0f} ms  {root['name']:<20} sid={root.get('sid')}  trace={trace_id[:12]}")
+        # Steps under 1% of the trace are left out
+        steps = [s for s in path[1:] if s["ms"] >= trace_ms(group) / 100]
+        lines.append("      " + " > ".join(f"{_label(s)} {s['ms']:.0f}ms" for s in steps))
+
+    by_name: Dict[str, List[float]] = defaultdict(list)
+    errors: Counter = Counter()
+    for s in spans:
+        by_name[_label(s).split("#")[0]].append(s["ms"])
+        errors[_label(s).split("#")[0]] += s["status"] == "error"
+    lines += ["", f"{'span':<48}{'count':>7}{'mean ms':>10}{'max ms':>10}{'errors':>8}"]
+    for name, values in sorted(by_name.items(), key=lambda item: -sum(item[1])):
+        lines.append(f"{name[:47]:<48}{len(values):>7}{sum(values) / len(values):>10.1f}{max(values):>10.1f}{errors[name]:>8}")
+
+    retries: Counter = Counter()
+    for s in spans:
+        retries[_label(s)] += sum(1 for e in s.get("events", []) if e["name"] == "retry")
+    retries = +retries
+    if retries:
+        lines += ["", "Retries:"]
+        for name, count in retries.most_common():
+            lines.append(f"  {name:<46}{count:>7}")
+    return "\n".join(lines)
+
+
+def make_collector(path: str) -> type:
+    """Return an HTTP handler that appends OTLP/HTTP JSON spans to `path` (a collector stand-in)."""
+    write_lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                records = from_otlp(json.loads(self.rfile.read(length)))
+            except (ValueError, KeyError) as e:
+                self.send_error(400, str(e))
+                return
+            with write_lock, open(path, "a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.debug(format % args)
+
+    return Handler
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: `python -m modules.tracing report|collect`."""
+    parser = argparse.ArgumentParser(description="Request traces")
+    parser.add_argument("--path", default=TRACE_PATH, help="Span file (JSONL)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="Slowest traces, critical paths and retries")
+    report.add_argument("--session", help="Only include this session ID")
+    report.add_argument("--top", type=int, default=10, help="Number of traces to show")
+    collect = sub.add_parser("collect", help="Receive OTLP/HTTP JSON spans and append them to --path")
+    collect.add_argument("--host", default="127.0.0.1")
+    collect.add_argument("--port", type=int, default=4318)
+    args = parser.parse_args(argv)
+
+    if args.command == "report":
+        print(format_report(load_spans(args.path, args.session), args.top))
+        return 0
+
+    server = ThreadingHTTPServer((args.host, args.port), make_collector(args.path))
+    print(f"Collecting spans on http://{args.host}:{args.port}/v1/traces into {args.path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""
+transcript.py
+
+Compact per-session interview transcript.
+
+Each question/answer/feedback exchange is one `Turn` record with `__slots__`,
+kept in a single `Transcript` container stored in `st.session_state`. For long
+interviews, older turns can be spilled to a per-session JSONL file while a small
+window of recent turns stays in memory (`TRANSCRIPT_MEMORY_WINDOW`), and an idle
+sweeper spills whole transcripts of sessions that have not been used for
+`TRANSCRIPT_IDLE_TTL_SECONDS`.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+from modules.config import (
+    TRANSCRIPT_MEMORY_WINDOW,
+    TRANSCRIPT_SPILL_DIR,
+    TRANSCRIPT_IDLE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Guards spill files and in-memory turn lists against the idle sweeper thread.
+_lock = threading.RLock()
+_registry: "weakref.WeakValueDictionary[str, Transcript]" = weakref.WeakValueDictionary()
+
+
+class Turn:
+    """
+    One interview exchange: a question and, once answered, the answer and feedback.
+
+    `feedbacks` holds the feedback per persona when the answer was evaluated
+    under several personas; `feedback` is then the selected persona's.
+    """
+
+    __slots__ = ("question", "answer", "feedback", "feedbacks")
+
+    def __init__(
+        self,
+        question: str,
+        answer: Optional[str] = None,
+        feedback: Optional[str] = None,
+        feedbacks: Optional[Dict[str, str]] = None,
+    ):
+        self.question = question
+        self.answer = answer
+        self.feedback = feedback
+        self.feedbacks = feedbacks
+
+    def feedback_for(self, persona: str) -> Optional[str]:
+        """Return the feedback of `persona` if it was evaluated, otherwise the stored feedback."""
+        if self.feedbacks and persona in self.feedbacks:
+            return self.feedbacks[persona]
+        return self.feedback
+
+    def to_dict(self) -> dict:
+        data = {"q": self.question, "a": self.answer, "f": self.feedback}
+        if self.feedbacks:
+            data["fs"] = self.feedbacks
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Turn":
+        return cls(data["q"], data.get("a"), data.get("f"), data.get("fs"))
+
+
+class Transcript:
+    """
+    Ordered interview turns for one session.
+
+    Turns older than the memory window are appended to a spill file and read
+    back only when the full transcript is needed.
+
+    Args:
+        session_id: Session the transcript belongs to (names the spill file).
+        window: Number of recent turns kept in memory; 0 keeps everything in memory.
+    """
+
+    __slots__ = ("session_id", "window", "last_access", "_turns", "_spilled", "__weakref__")
+
+    def __init__(self, session_id: str, window: int = TRANSCRIPT_MEMORY_WINDOW):
+        self.session_id = session_id
+        self.window = window
+        self.last_access = time.time()
+        self._turns: List[Turn] = []
+        self._spilled = 0
+        _registry[session_id] = self
+
+    # --- state ---
+    def __len__(self) -> int:
+        return self._spilled + len(self._turns)
+
+    @property
+    def answered_count(self) -> int:
+        """Number of answered questions (the index of the current question)."""
+        with _lock:
+            if self._turns and self._turns[-1].answer is None:
+                return len(self) - 1
+            return len(self)
+
+    @property
+    def current_turn(self) -> Optional[Turn]:
+        """The last turn if it is still waiting for an answer, otherwise None."""
+        with _lock:
+            if self._turns and self._turns[-1].answer is None:
+                return self._turns[-1]
+            return None
+
+    def touch(self) -> None:
+        """Mark the transcript as used now (resets the idle timer)."""
+        self.last_access = time.time()
+
+    # --- mutation ---
+    def add_question(self, question: str) -> None:
+        """Start a new turn with the given question."""
+        with _lock:
+            self._turns.append(Turn(question))
+        self.touch()
+
+    def answer_current(self, answer: str, feedback: str, feedbacks: Optional[Dict[str, str]] = None) -> None:
+        """
+        Store the answer and feedback on the current turn and spill old turns if needed.
+
+        Args:
+            answer: The candidate's answer.
+            feedback: Feedback of the selected persona.
+            feedbacks: Feedback per persona, if the answer was evaluated under several.
+
+        Raises:
+            ValueError: If there is no unanswered question.
+        """
+        with _lock:
+            turn = self.current_turn
+            if turn is None:
+                raise ValueError("No open question to answer.")
+            turn.answer = answer
+            turn.feedback = feedback
+            turn.feedbacks = feedbacks
+            if self.window and len(self._turns) > self.window:
+                self.spill(keep=self.window)
+        self.touch()
+
+    def clear(self) -> None:
+        """Drop all turns, including any spilled to disk."""
+        with _lock:
+            self._turns = []
+            self._spilled = 0
+            try:
+                os.remove(self.spill_path)
+            except FileNotFoundError:
+                pass
+        self.touch()
+
+    # --- spill to disk ---
+    @property
+    def spill_path(self) -> str:
+        return os.path.join(TRANSCRIPT_SPILL_DIR, f"{self.session_id}.jsonl")
+
+    def spill(self, keep: int = 0) -> int:
+        """
+        Move answered turns to the spill file, keeping the `keep` most recent turns in memory.
+
+        Returns:
+            int: Number of turns spilled.
+        """
+        with _lock:
+            count = max(0, len(self._turns) - keep)
+            # Never spill the open question; it is needed on every rerun.
+            if self._turns and self._turns[-1].answer is None:
+                count = min(count, len(self._turns) - 1)
+            if count <= 0:
+                return 0
+
+            os.makedirs(TRANSCRIPT_SPILL_DIR, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for turn in self._turns[:count]:
+                    f.write(json.dumps(turn.to_dict(), ensure_ascii=False) + "\n")
+            del self._turns[:count]
+            self._spilled += count
+
+        logger.debug(f"Spilled {count} turns of session {self.session_id} to disk")
+        return count
+
+    def _load_spilled(self) -> List[Turn]:
+        if not self._spilled:
+            return []
+        with open(self.spill_path, encoding="utf-8") as f:
+            return [Turn.from_dict(json.loads(line)) for line in f]
+
+    # --- read access ---
+    def turns(self) -> List[Turn]:
+        """Return all turns in order, reading spilled turns back from disk."""
+        with _lock:
+            return self._load_spilled() + list(self._turns)
+
+    def questions(self) -> List[str]:
+        return [turn.question for turn in self.turns()]
+
+    def answers(self) -> List[str]:
+        return [turn.answer for turn in self.turns() if turn.answer is not None]
+
+    def feedbacks(self) -> List[str]:
+        return [turn.feedback for turn in self.turns() if turn.answer is not None]
+
+    def answered_pairs(self) -> List[Tuple[str, str]]:
+        """Return (question, answer) for every answered turn."""
+        return [(turn.question, turn.answer) for turn in self.turns() if turn.answer is not None]
+
+
+# ---------------------------------------------------------------------
+# Idle sweeper
+# ---------------------------------------------------------------------
+def sweep_idle_transcripts(ttl_seconds: float = TRANSCRIPT_IDLE_TTL_SECONDS) -> int:
+    """
+    Spill every turn of transcripts idle for longer than `ttl_seconds`, and remove
+    spill files of sessions that no longer exist.
+
+    Returns:
+        int: Number of transcripts trimmed.
+    """
+    now = time.time()
+    trimmed = 0
+    for transcript in list(_registry.values()):
+        if now - transcript.last_access > ttl_seconds and transcript.spill(keep=0):
+            trimmed += 1
+
+    if os.path.isdir(TRANSCRIPT_SPILL_DIR):
+        live = set(_registry.keys())
+        for name in os.listdir(TRANSCRIPT_SPILL_DIR):
+            path = os.path.join(TRANSCRIPT_SPILL_DIR, name)
+            session_id = name.rsplit(".", 1)[0]
+            try:
+                if session_id not in live and now - os.path.getmtime(path) > ttl_seconds:
+                    os.remove(path)
+            except OSError:
+                continue
+
+    if trimmed:
+        logger.info(f"Idle sweeper trimmed {trimmed} transcript(s)")
+    return trimmed
+
+
+_sweeper: Optional[threading.Thread] = None
+
+
+def start_idle_sweeper(ttl_seconds: float = TRANSCRIPT_IDLE_TTL_SECONDS) -> None:
+    """Start the background idle sweeper once per process (no-op if the TTL is 0)."""
+    global _sweeper
+    if ttl_seconds <= 0 or _sweeper is not None:
+        return
+
+    def run() -> None:
+        interval = max(1.0, min(60.0, ttl_seconds / 4))
+        while True:
+            time.sleep(interval)
+            try:
+                sweep_idle_transcripts(ttl_seconds)
+            except Exception:
+                logger.exception("Idle transcript sweep failed")
+
+    with _lock:
+        if _sweeper is None:
+            _sweeper = threading.Thread(target=run, name="transcript-sweeper", daemon=True)
+            _sweeper.start()
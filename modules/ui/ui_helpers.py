@@ -7,6 +7,7 @@ Includes job title input, question type dropdown, and difficulty level dropdown.
 
 import streamlit as st
 from modules.config import OPENAI_MODELS
+from modules.session_state import get_document_index
 
 def advanced_settings_ui(use_sidebar: bool = False):
     """
@@ -45,6 +46,28 @@ def advanced_settings_ui(use_sidebar: bool = False):
             help="Maximum length of the AI's response. Bigger = longer answers."
         )
 
+DOCUMENT_SOURCES = {"job_description": "Job description", "resume": "Resume"}
+
+
+def documents_ui():
+    """
+    Displays optional job description and resume inputs (upload or paste).
+    Changed documents are indexed for the session; questions and feedback then
+    draw on the most relevant excerpts.
+    """
+    with st.expander("Job Description & Resume (optional)", expanded=False):
+        index = get_document_index()
+        for source, label in DOCUMENT_SOURCES.items():
+            uploaded = st.file_uploader(f"{label} file", type=["txt", "md"], key=f"{source}_file")
+            pasted = st.text_area(f"...or paste the {label.lower()}", key=f"{source}_text", height=120)
+            text = uploaded.getvalue().decode("utf-8", errors="replace") if uploaded is not None else pasted
+            index.update(source, text)
+
+        if len(index):
+            labels = ", ".join(DOCUMENT_SOURCES.get(source, source) for source in index.sources)
+            st.caption(f"{labels}: {len(index)} excerpts indexed. Prompts include only the most relevant ones.")
+
+
 def display_job_title_input() -> str:
     """
     Displays the job title input with validation feedback.
@@ -6,27 +6,58 @@ Renders interview questions, collects answers, provides feedback, and shows summ
 """
 
 import streamlit as st
-from modules.config import EVALUATION_PERSONAS
+from typing import Dict, Optional, Tuple
+from modules.config import (
+    EVALUATION_PERSONAS,
+    ENABLE_PERSONA_FANOUT,
+    ENABLE_RUBRIC_SCORES,
+    JOB_POLL_INTERVAL_SECONDS,
+    MAX_FANOUT_PERSONAS,
+)
+from modules.session_state import get_transcript, get_user_id, clear_turn_widgets
+from modules.rubric import get_history, progress
+from modules.profiling import phase
+from modules import jobs, tracing
 from modules.ui.ui_sidebar import display_sidebar, handle_sidebar_restart
 from modules.interview_logic import (
+    initialize_interview_session,
+    restart_interview,
     evaluate_answer_and_generate_next,
+    evaluate_answer_personas,
+    evaluation_personas,
     generate_interview_summary,
     parse_summary,
-    generate_next_question
+    generate_next_question,
+    take_prefetched_question,
+    QUESTION_FAILED,
 )
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Shown while a job of this kind runs
+JOB_LABELS = {
+    "start": "Checking the job title",
+    "restart": "Checking the job title",
+    "first_question": "Preparing your first question",
+    "evaluate": "Evaluating your answer",
+    "summary": "Writing your interview summary",
+}
+
 
 def render_interview_ui() -> None:
     """
     Render the main interview UI in Streamlit.
     """
+    # --- Apply finished background jobs (a restart may change the sidebar) ---
+    apply_finished_jobs()
+
     # --- Sidebar ---
-    job_title, question_type, difficulty, should_restart = display_sidebar()
+    with phase("display_sidebar"):
+        job_title, question_type, difficulty, should_restart = display_sidebar()
     if should_restart:
-        handle_sidebar_restart()
+        with tracing.trace("restart_interview"):
+            handle_sidebar_restart()
         logger.info("Sidebar restart triggered. Feedbacks reset.")
 
     # --- Header ---
@@ -48,38 +79,50 @@ def render_interview_ui() -> None:
     st.info(EVALUATION_PERSONAS[selected_persona], icon="ℹ️")
     st.session_state.evaluation_style = selected_persona
 
-    # --- Initialize session lists ---
-    st.session_state.setdefault("questions", [])
-    st.session_state.setdefault("answers", [])
-    st.session_state.setdefault("feedbacks", [])
-    st.session_state.setdefault("current_question_index", 0)
+    # --- Compare feedback styles (answers are evaluated under each; switching shows stored feedback) ---
+    if ENABLE_PERSONA_FANOUT:
+        st.multiselect(
+            "Compare feedback styles:",
+            options=list(EVALUATION_PERSONAS.keys()),
+            key="fanout_personas",
+            max_selections=MAX_FANOUT_PERSONAS,
+            help="Each answer is also evaluated in these styles; switch the style above to see their feedback.",
+        )
+
+    transcript = get_transcript()
 
-    # --- Generate first question if needed ---
-    if st.session_state.get("started", False) and len(st.session_state.questions) == 0:
-        first_question = generate_next_question()
-        st.session_state.questions.append(first_question)
-        logger.info("First question generated.")
+    # --- Jobs still running ---
+    running = jobs.session_jobs()
+    running_kinds = {job.kind for job in running}
+
+    # --- Generate first question if needed (in the background) ---
+    if st.session_state.get("started", False) and len(transcript) == 0 and not running:
+        running.append(jobs.submit_job("first_question", _first_question))
+        running_kinds.add("first_question")
 
     # --- Chat Container ---
     chat_container = st.container()
     with chat_container:
 
         # Render previous Q/A + feedback
-        for i, q in enumerate(st.session_state.questions):
-            st.markdown(f"**Q{i+1}: {q}**")
-            if i < len(st.session_state.answers):
-                st.markdown(f"**A{i+1}:** {st.session_state.answers[i]}")
-            if i < len(st.session_state.feedbacks):
-                st.markdown(f"**Feedback:** {st.session_state.feedbacks[i]}")
+        for i, turn in enumerate(transcript.turns()):
+            st.markdown(f"**Q{i+1}: {turn.question}**")
+            if turn.answer is not None:
+                st.markdown(f"**A{i+1}:** {turn.answer}")
+            if turn.feedbacks and selected_persona in turn.feedbacks:
+                st.markdown(f"**Feedback ({selected_persona}):** {turn.feedbacks[selected_persona]}")
+            elif turn.feedback is not None:
+                st.markdown(f"**Feedback:** {turn.feedback}")
 
         # Current question input + buttons
-        current_index = st.session_state.current_question_index
+        current_index = transcript.answered_count
 
-        if current_index < len(st.session_state.questions):
+        if transcript.current_turn is not None:
             answer_key = f"answer_{current_index}"
             user_answer = st.text_area(
                 f"Your answer for Q{current_index+1}:",
-                key=answer_key
+                key=answer_key,
+                disabled=bool(running),
             )
 
             # --- Buttons ---
@@ -87,29 +130,27 @@ def render_interview_ui() -> None:
 
             with col_submit:
                 submit_key = f"submit_{current_index}"
-                submit_disabled = len(user_answer.strip()) == 0
+                submit_disabled = len(user_answer.strip()) == 0 or bool(running)
 
                 if st.button("Submit Answer", key=submit_key, disabled=submit_disabled):
-                    feedback, next_question = evaluate_answer_and_generate_next(user_answer)
-
-                    st.session_state.answers.append(user_answer)
-                    st.session_state.feedbacks.append(feedback)
-
-                    if next_question:
-                        st.session_state.questions.append(next_question)
-
-                    st.session_state.current_question_index += 1
-                    logger.info("Answer submitted and next question generated.")
+                    with tracing.trace("submit_answer", turn=current_index):
+                        jobs.submit_job("evaluate", _evaluate_answer, user_answer, evaluation_personas())
+                    logger.info("Answer submitted for evaluation.")
                     st.rerun()
 
             with col_finish:
-                if st.button("Finish Interview"):
-                    raw_summary = generate_interview_summary()
-                    st.session_state["interview_finished"] = True
-                    st.session_state["raw_summary"] = raw_summary
-                    logger.info("Interview finished. Summary generated.")
+                # Finishing cancels an evaluation still in flight
+                if st.button("Finish Interview", disabled="summary" in running_kinds):
+                    with tracing.trace("finish_interview", turns=current_index):
+                        jobs.cancel_session_jobs()
+                        jobs.submit_job("summary", generate_interview_summary)
+                    logger.info("Interview finished. Generating summary.")
                     st.rerun()
 
+        # --- Progress of background work (polls until it is done) ---
+        for job in running:
+            render_job_status(job.id)
+
     # --- Scroll to bottom ---
     st.markdown('<div id="bottom"></div>', unsafe_allow_html=True)
     st.markdown("""
@@ -138,9 +179,138 @@ def render_interview_ui() -> None:
         for i, rec in enumerate(recommendations, start=1):
             st.write(f"{i}. {rec}")
 
+        if ENABLE_RUBRIC_SCORES:
+            render_progress()
+
     # --- Token + Cost tracking ---
     render_token_usage_box()
 
+# ---------------------------------------------------------------------
+# Background jobs
+# ---------------------------------------------------------------------
+def _first_question() -> str:
+    return take_prefetched_question() or generate_next_question()
+
+
+def _evaluate_answer(user_answer: str, personas: list) -> Tuple[str, str, Optional[Dict[str, str]], Optional[str]]:
+    if len(personas) > 1:
+        feedbacks, next_question = evaluate_answer_personas(user_answer, personas)
+        feedback = feedbacks[personas[0]]
+    else:
+        feedbacks = None
+        feedback, next_question = evaluate_answer_and_generate_next(user_answer)
+    return user_answer, feedback, feedbacks, next_question
+
+
+def apply_finished_jobs() -> None:
+    """
+    Apply the results of the session's finished jobs to the interview and forget them.
+    """
+    transcript = get_transcript()
+    for job in jobs.session_jobs():
+        # Skip jobs not yet finished, and jobs a restart applied in this loop has cancelled
+        if not job.finished or job.id not in st.session_state.get("jobs", []):
+            continue
+        jobs.forget(job)
+        if job.status == jobs.FAILED:
+            st.error(getattr(job.error, "user_message", "Something went wrong. Please try again."))
+            if job.kind == "first_question":
+                transcript.add_question(QUESTION_FAILED)
+            continue
+        if job.status != jobs.DONE:
+            continue
+
+        if job.kind in ("start", "restart"):
+            apply_start_validation(job.kind, *job.result)
+        elif job.kind == "first_question":
+            transcript.add_question(job.result)
+            logger.info("First question generated.")
+        elif job.kind == "evaluate":
+            user_answer, feedback, feedbacks, next_question = job.result
+            transcript.answer_current(user_answer, feedback, feedbacks)
+            if next_question:
+                transcript.add_question(next_question)
+            # Answered widgets are never shown again; drop their state.
+            clear_turn_widgets()
+            logger.info("Answer evaluated and next question generated.")
+        elif job.kind == "summary":
+            st.session_state["interview_finished"] = True
+            st.session_state["raw_summary"] = job.result
+            logger.info("Interview finished. Summary generated.")
+
+
+def apply_start_validation(
+    kind: str, job_title: str, question_type: str, difficulty: str, valid: bool, message: Optional[str]
+) -> None:
+    """
+    Start the interview with validated settings, or ask for a clearer job title.
+
+    Args:
+        kind: "start" (welcome screen) or "restart" (sidebar).
+    """
+    if valid:
+        if kind == "restart":
+            restart_interview()
+        initialize_interview_session(job_title, question_type, difficulty)
+        logger.info(f"Interview {kind}ed for job_title={job_title}")
+    elif kind == "start":
+        st.session_state.needs_clarification = True
+        st.session_state.job_error = message
+        st.session_state.pending_job_title = job_title
+        st.session_state.pending_question_type = question_type
+        st.session_state.pending_difficulty = difficulty
+    else:
+        st.session_state.sidebar_needs_clarification = True
+        st.session_state.sidebar_clarification_message = message
+        st.session_state.pending_sidebar_job_title = job_title
+        st.session_state.pending_question_type = question_type
+        st.session_state.pending_difficulty = difficulty
+        logger.info(f"Job title needs clarification: {message}")
+
+
+@st.fragment(run_every=JOB_POLL_INTERVAL_SECONDS)
+def render_job_status(job_id: str) -> None:
+    """
+    Show a running job's progress; rerun the app once it has finished so its result is applied.
+    """
+    job = jobs.get_job(job_id)
+    if job is None:
+        return
+    if job.finished:
+        st.rerun()
+
+    detail = f" ({job.calls} model calls, {job.input_tokens + job.output_tokens:,} tokens)" if job.calls else ""
+    st.info(f"{JOB_LABELS.get(job.kind, 'Working')}... {job.elapsed():.0f} s{detail}", icon="⏳")
+
+
+def render_progress() -> None:
+    """Show rolling rubric scores, trends and cohort percentiles across this user's sessions."""
+    history = get_history()
+    history.refresh()
+    report = progress(history, get_user_id())
+    if report is None:
+        return
+
+    st.subheader("Your Progress")
+    st.caption(
+        f"Rubric scores (1-5) of your {report['turns']} scored answers: rolling average, "
+        f"trend per answer, and percentile among {report['cohort_users']} users."
+    )
+    dimensions = report["dimensions"]
+    columns = st.columns(len(dimensions))
+    for col, name, latest, trend, percentile in zip(
+        columns, dimensions, report["latest"], report["trend"], report["percentile"]
+    ):
+        col.metric(
+            name.capitalize(),
+            f"{latest:.1f}",
+            delta=f"{trend:+.2f} per answer",
+            help=f"Percentile among all users: {percentile:.0f}",
+        )
+    if report["turns"] > 1:
+        st.line_chart({name.capitalize(): report["rolling"][:, i] for i, name in enumerate(dimensions)})
+
+
 def render_token_usage_box():
     st.markdown("---")
     st.subheader("Token Usage & Cost (Live)")
@@ -8,9 +8,10 @@ Streamlit sidebar for interview settings:
 
 import streamlit as st
 from typing import Tuple
-from modules.interview_logic import initialize_interview_session, generate_next_question, restart_interview
-from modules.validation import validate_job_title_exists, validate_job_title_with_clarification
+from modules.interview_logic import initialize_interview_session
+from modules.validation import validate_job_title_exists, validate_start_settings
 from modules.ui.ui_helpers import advanced_settings_ui
+from modules import jobs, tracing
 import logging
 
 logger = logging.getLogger(__name__)
@@ -45,27 +46,24 @@ def display_sidebar() -> Tuple[str, str, str, bool]:
 
         with col1:
             if st.button("Restart", key="sidebar_clarify_restart"):
-                if new_job_title.strip():
-                    st.session_state.sidebar_needs_clarification = False
-                    st.session_state.sidebar_clarification_message = ""
-                    # Update live session state
-                    st.session_state.job_title = new_job_title.strip()
-                    st.session_state.questions = []
-                    st.session_state.answers = []
-                    st.session_state.feedbacks = []
-                    st.session_state.current_question_index = 0
-                    st.session_state.question_type = st.session_state.pending_question_type
-                    st.session_state.difficulty = st.session_state.pending_difficulty
-
-                    initialize_interview_session(
-                        st.session_state.job_title,
-                        st.session_state.question_type,
-                        st.session_state.difficulty
-                    )
-                    st.session_state.questions.append(generate_next_question())
-                    st.rerun()
-                else:
-                    st.sidebar.error("Please enter a job title.")
+                with tracing.trace("restart_interview", clarified=True):
+                    if new_job_title.strip():
+                        st.session_state.sidebar_needs_clarification = False
+                        st.session_state.sidebar_clarification_message = ""
+                        # Update live session state
+                        st.session_state.job_title = new_job_title.strip()
+                        st.session_state.question_type = st.session_state.pending_question_type
+                        st.session_state.difficulty = st.session_state.pending_difficulty
+
+                        # The interview screen generates the first question in the background
+                        initialize_interview_session(
+                            st.session_state.job_title,
+                            st.session_state.question_type,
+                            st.session_state.difficulty
+                        )
+                        st.rerun()
+                    else:
+                        st.sidebar.error("Please enter a job title.")
 
         with col2:
             if st.button("Cancel", key="sidebar_cancel_clarify"):
@@ -131,8 +129,8 @@ def display_sidebar() -> Tuple[str, str, str, bool]:
 
 def handle_sidebar_restart() -> None:
     """
-    Updates live session state and starts a new interview
-    based on pending sidebar values. Called when Restart button is pressed.
+    Checks the pending sidebar values in a background job; a new interview
+    starts when it has finished. Called when Restart button is pressed.
     """
     job_title = st.session_state.pending_job_title
 
@@ -141,23 +139,13 @@ def handle_sidebar_restart() -> None:
         return
 
     logger.info(f"User requesting restart with job_title={job_title}")
-    valid, message = validate_job_title_with_clarification(job_title)
-
-    if valid:
-        st.session_state.job_title = job_title
-        st.session_state.question_type = st.session_state.pending_question_type
-        st.session_state.difficulty = st.session_state.pending_difficulty
-
-        restart_interview()
-        initialize_interview_session(
-            st.session_state.job_title,
-            st.session_state.question_type,
-            st.session_state.difficulty
-        )
-        st.rerun()
-    else:
-        st.session_state.sidebar_needs_clarification = True
-        st.session_state.sidebar_clarification_message = message
-        st.session_state.pending_sidebar_job_title = job_title
-        logger.info(f"Job title needs clarification: {message}")
-        st.rerun()
+    # Replaces any work of the current interview; the interview screen applies the result
+    jobs.cancel_session_jobs()
+    jobs.submit_job(
+        "restart",
+        validate_start_settings,
+        job_title,
+        st.session_state.pending_question_type,
+        st.session_state.pending_difficulty,
+    )
+    st.rerun()
@@ -6,9 +6,12 @@ Handles job title input, optional clarification workflow, and starting the inter
 """
 
 import streamlit as st
-from modules.validation import validate_job_title_with_clarification, validate_job_title_exists
+from modules.validation import validate_start_settings, validate_job_title_exists, suggest_job_titles
 from modules.interview_logic import initialize_interview_session
-from modules.ui.ui_helpers import advanced_settings_ui
+from modules.config import ENABLE_DOCUMENT_UPLOAD
+from modules.ui.ui_helpers import advanced_settings_ui, documents_ui
+from modules.ui.ui_interview import apply_finished_jobs, render_job_status
+from modules import jobs, tracing
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,6 +28,11 @@ def render_main_screen() -> None:
     )
     st.write("Practice interviews for different roles, question types, and difficulties.")
 
+    # ---- Job title check running in the background ----
+    apply_finished_jobs()
+    if st.session_state.started:
+        st.rerun()
+
     # ---- Clarification Workflow ----
     if st.session_state.needs_clarification:
         _render_clarification_ui()
@@ -37,7 +45,7 @@ def render_main_screen() -> None:
 def _render_normal_start_ui() -> None:
     """
     Render the standard start screen with job title, question type, difficulty selection.
-    Handles starting the interview if all fields are valid.
+    Start checks the job title in a background job; the interview starts when it has finished.
     """
     from modules.ui.ui_helpers import (
         display_job_title_input,
@@ -49,30 +57,28 @@ def _render_normal_start_ui() -> None:
     question_type = display_question_type_dropdown()
     difficulty = display_difficulty_dropdown()
 
+    if ENABLE_DOCUMENT_UPLOAD:
+        documents_ui()
     advanced_settings_ui()
 
-    if st.button("Start Interview", key="main_start_button"):
-        if not validate_job_title_exists(job_title):
-            st.rerun()
-
-        valid, message = validate_job_title_with_clarification(job_title)
+    checking = jobs.session_jobs()
+    if st.button("Start Interview", key="main_start_button", disabled=bool(checking)):
+        with tracing.trace("start_interview", job_title=job_title):
+            if not validate_job_title_exists(job_title):
+                st.rerun()
 
-        if valid:
-            st.session_state.job_title = job_title
-            st.session_state.question_type = question_type
-            st.session_state.difficulty = difficulty
-
-            initialize_interview_session(job_title, question_type, difficulty)
-            logger.info(f"Interview started for job_title={job_title}")
-            st.rerun()
-        else:
-            st.session_state.needs_clarification = True
-            st.session_state.job_error = message
-            st.session_state.pending_job_title = job_title
-            st.session_state.pending_question_type = question_type
-            st.session_state.pending_difficulty = difficulty
+            # Also prepares the first question (prefetched or from a combined call).
+            # The interview starts, or asks for clarification, when the job has finished.
+            jobs.submit_job("start", validate_start_settings, job_title, question_type, difficulty)
+            logger.info(f"Checking job_title={job_title} before starting")
             st.rerun()
 
+    for job in checking:
+        render_job_status(job.id)
+    if checking and st.button("Cancel", key="cancel_start_button"):
+        jobs.cancel_session_jobs()
+        st.rerun()
+
 
 def _render_clarification_ui() -> None:
     """
@@ -85,6 +91,18 @@ def _render_clarification_ui() -> None:
         "Questions might be off if a very unusual job title is chosen."
     )
 
+    # --- "Did you mean" suggestions from the bundled job-title index ---
+    suggestions = suggest_job_titles(st.session_state.pending_job_title)
+    if suggestions:
+        st.write("Did you mean:")
+        for col, suggestion in zip(st.columns(len(suggestions)), suggestions):
+            col.button(
+                suggestion,
+                key=f"suggestion_{suggestion}",
+                on_click=_use_suggestion,
+                args=(suggestion,),
+            )
+
     new_job_title_input = st.text_input(
         "Clarify Job Title",
         value=st.session_state.pending_job_title,
@@ -93,18 +111,27 @@ def _render_clarification_ui() -> None:
     new_job_title = new_job_title_input or ""
 
     if st.button("Start Interview with this Title", key="clarify_start_button"):
-        if not validate_job_title_exists(new_job_title):
-            st.error(st.session_state.job_error)
-        else:
-            st.session_state.job_title = new_job_title.strip()
-            st.session_state.question_type = st.session_state.pending_question_type
-            st.session_state.difficulty = st.session_state.pending_difficulty
-            st.session_state.needs_clarification = False
-
-            initialize_interview_session(
-                st.session_state.job_title,
-                st.session_state.question_type,
-                st.session_state.difficulty,
-            )
-            logger.info(f"Interview started after clarification: {st.session_state.job_title}")
-            st.rerun()
+        with tracing.trace("start_interview", job_title=new_job_title, clarified=True):
+            if not validate_job_title_exists(new_job_title):
+                st.error(st.session_state.job_error)
+            else:
+                st.session_state.job_title = new_job_title.strip()
+                st.session_state.question_type = st.session_state.pending_question_type
+                st.session_state.difficulty = st.session_state.pending_difficulty
+                st.session_state.needs_clarification = False
+
+                initialize_interview_session(
+                    st.session_state.job_title,
+                    st.session_state.question_type,
+                    st.session_state.difficulty,
+                )
+                logger.info(f"Interview started after clarification: {st.session_state.job_title}")
+                st.rerun()
+
+
+def _use_suggestion(suggestion: str) -> None:
+    """Button callback: put a suggested job title into the clarification input."""
+    st.session_state.pending_job_title = suggestion
+    # Drop the widget's own state so it picks up the new default value
+    st.session_state.pop("clarification_input", None)
+
@@ -1,29 +1,73 @@
-import os
+import contextvars
+import time
 import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional, Tuple
 import streamlit as st
-from jinja2 import Environment, FileSystemLoader
-from openai import OpenAI
-from pathlib import Path
-from dotenv import load_dotenv
-from functools import lru_cache
-from modules.config import PROMPTS_TEMPLATE_DIR, COST_PER_1M_INPUT_TOKENS, COST_PER_1M_OUTPUT_TOKENS
+from jinja2 import Environment, FileSystemLoader, Template
+from modules.config import (
+    PROMPTS_TEMPLATE_DIR,
+    COST_PER_1M_INPUT_TOKENS,
+    COST_PER_1M_OUTPUT_TOKENS,
+    COST_PER_1M_CACHED_INPUT_TOKENS,
+    CONTINUATION_MAX_TOKENS,
+    CONTINUATION_TEMPLATE,
+    ENABLE_OUTPUT_RECOVERY,
+)
 from modules.session_state import get_openai_settings
-from tenacity import retry, wait_exponential, stop_after_attempt
+from modules.llm_backends import get_backend
+from modules import jobs, ledger, cassette, prompt_archive, response_cache, structured_output as so, token_limits, tracing
+from modules.errors import JobCancelled
+from modules.profiling import phase
+from tenacity import retry, retry_if_not_exception_type, wait_exponential, stop_after_attempt
 
 
 logger = logging.getLogger(__name__)
 
+# Returned by `openai_call` when the call failed after retries.
+CALL_FAILED = "Error generating response. Please try again."
+
+
 # ---------------------------------------------------------------------
-# Environment and OpenAI client
+# Cost calculation
 # ---------------------------------------------------------------------
-load_dotenv()
-_client: OpenAI = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+def calculate_cost(model: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+    """
+    Calculate the cost of a call in dollars.
+
+    Cached input tokens are billed at the cached rate when the model has one,
+    otherwise at the normal input rate.
+
+    Args:
+        model: Model name.
+        input_tokens: Total input tokens, including cached ones.
+        output_tokens: Output tokens.
+        cached_tokens: Portion of the input tokens served from the prompt cache.
+
+    Returns:
+        float: Cost in dollars.
+    """
+    input_price = COST_PER_1M_INPUT_TOKENS.get(model, 0)
+    cached_price = COST_PER_1M_CACHED_INPUT_TOKENS.get(model, input_price)
+    output_price = COST_PER_1M_OUTPUT_TOKENS.get(model, 0)
+
+    return (
+        ((input_tokens - cached_tokens) * input_price / 1_000_000)
+        + (cached_tokens * cached_price / 1_000_000)
+        + (output_tokens * output_price / 1_000_000)
+    )
 
 
 # ---------------------------------------------------------------------
 # Retry-wrapped low-level OpenAI call
 # ---------------------------------------------------------------------
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=8))
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=2, max=8),
+    retry=retry_if_not_exception_type(JobCancelled),
+    before_sleep=tracing.record_retry,
+)
 def _call_openai(
     sys_instructions: str,
     prompt_text: str,
@@ -31,75 +75,329 @@ def _call_openai(
     temperature: float = 0.2,
     max_tokens: int = 250,
     structured_output: dict | None = None,
+    task: str = "generic",
+    metadata: dict | None = None,
+    prompt_cache_key: str | None = None,
+    use_cache: bool = True,
 ) -> str:
     """
-    Internal low-level call to OpenAI with retry logic.
-    Now also tracks token usage and cost inside Streamlit session state.
+    Internal low-level call to the configured LLM backend with retry logic.
+    See `_request_llm`.
+    """
+    text, _ = _request_llm(
+        sys_instructions=sys_instructions,
+        prompt_text=prompt_text,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        structured_output=structured_output,
+        task=task,
+        metadata=metadata,
+        prompt_cache_key=prompt_cache_key,
+        use_cache=use_cache,
+    )
+    return text
+
+
+def _request_llm(
+    sys_instructions: str,
+    prompt_text: str,
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.2,
+    max_tokens: int = 250,
+    structured_output: dict | None = None,
+    task: str = "generic",
+    metadata: dict | None = None,
+    prompt_cache_key: str | None = None,
+    previous_response_id: str | None = None,
+    adaptive_cap: bool = True,
+    strip: bool = True,
+    use_cache: bool = True,
+) -> Tuple[str, Optional[str]]:
+    """
+    Make one call to the configured LLM backend (no retries).
+    Counts token usage and cost towards the session totals (through the
+    running job, if any; see modules/jobs.py) and records the call in the
+    usage ledger.
+
+    Raises `JobCancelled` instead of calling the model when the job it runs
+    in was cancelled.
+
+    Identical requests are served from the response cache (or share an
+    in-flight call) and are recorded as zero-cost `cache_hit` ledger entries.
+    Calls whose response must not be shared between interviews (generated
+    questions) pass `use_cache=False`.
+
+    `max_tokens` is the configured cap. With `adaptive_cap`, the request asks
+    for the cap learned from this task's output lengths instead (see
+    modules/token_limits.py). If that cap cuts the response short, the call
+    is repeated once with `max_tokens`. A cut-off structured response is
+    first recovered by `_recover_truncated`, which usually needs no repeat.
+
+    With `strip=False` the text is returned with its surrounding whitespace
+    (a continuation may start in the middle of a sentence).
+
+    Returns:
+        (text, response_id)
     """
+    jobs.check_cancelled()
+
+    limit_key = token_limits.current_key(task, model)
+    cap = token_limits.output_cap(limit_key, max_tokens) if adaptive_cap else max_tokens
 
     request_kwargs = {
         "model": model,
         "instructions": sys_instructions,
         "input": prompt_text,
         "temperature": temperature,
-        "max_output_tokens": max_tokens,
+        "max_output_tokens": cap,
     }
 
     if structured_output is not None:
         request_kwargs["text"] = structured_output
+    if prompt_cache_key is not None:
+        request_kwargs["prompt_cache_key"] = prompt_cache_key
+    if previous_response_id is not None:
+        request_kwargs["previous_response_id"] = previous_response_id
 
+    backend = get_backend()
     logger.debug(
-        f"Sending OpenAI request with model={model}, temp={temperature}, max_tokens={max_tokens}"
+        f"Sending {backend.name} request with model={model}, temp={temperature}, max_tokens={cap}"
     )
 
-    response = _client.responses.create(**request_kwargs)
-    
-    # --------
-    # EXTRACT TEXT
-    # --------
-    if hasattr(response, "output_text") and response.output_text:
-        text = response.output_text.strip()
-    elif hasattr(response, "output") and response.output:
-        blocks = response.output[0].get("content", [])
-        text = blocks[0].get("text", "").strip() if blocks else ""
-    else:
-        text = ""
+    ss = st.session_state
+    context = {key: ss.get(key) for key in cassette.CONTEXT_FIELDS} if cassette.RECORD_LLM_TRAFFIC else {}
+
+    cache_key = cassette.request_key(request_kwargs) if use_cache and response_cache.cacheable(temperature) else None
+
+    started = time.perf_counter()
+    try:
+        with phase(f"llm:{task}"), tracing.span(
+            "llm_attempt", task=task, model=model, backend=backend.name, attempt=tracing.next_attempt()
+        ) as attempt_span:
+            if cache_key is None:
+                response, shared = backend.create(**request_kwargs), False
+            else:
+                response, shared = response_cache.get_cache().get_or_create(
+                    cache_key,
+                    lambda: backend.create(**request_kwargs),
+                    should_store=lambda r: r.status == "completed",
+                )
+            attempt_span.set(
+                status=response.status,
+                cache_hit=shared,
+                input_tokens=response.input_tokens,
+                cached_tokens=response.cached_tokens,
+                output_tokens=response.output_tokens,
+            )
+    except Exception as exc:
+        latency_ms = (time.perf_counter() - started) * 1000
+        cassette.record_exchange(ss.get("session_id"), request_kwargs, None, latency_ms, task, context, error=exc)
+        raise
+    latency_ms = (time.perf_counter() - started) * 1000
+
+    if shared:
+        logger.info(f"Response cache hit for task={task} ({latency_ms:.0f} ms)")
+        ledger.record_call(
+            session_id=ss.get("session_id"),
+            task="cache_hit",
+            model=model,
+            input_tokens=0,
+            cached_tokens=0,
+            output_tokens=0,
+            latency_ms=latency_ms,
+            cost=0.0,
+            metadata={**(metadata or {}), "cached_task": task},
+        )
+        return (response.text.strip() if strip else response.text), response.response_id
+
+    cassette.record_exchange(ss.get("session_id"), request_kwargs, response, latency_ms, task, context)
+
+    text = response.text.strip() if strip else response.text
+    truncated = response.status == "incomplete" and response.incomplete_reason == "max_output_tokens"
+    if response.status == "incomplete":
+        logger.warning(f"Response incomplete ({response.incomplete_reason}) for task={task}")
 
     # --------
     # TOKEN USAGE
     # --------
-    prompt_tokens = getattr(getattr(response, "usage", None), "input_tokens", 0)
-    completion_tokens = getattr(getattr(response, "usage", None), "output_tokens", 0)
+    prompt_tokens = response.input_tokens
+    completion_tokens = response.output_tokens
+    cached_tokens = response.cached_tokens
 
-    # --------
-    # MODEL PRICING
-    # --------
-    input_price = COST_PER_1M_INPUT_TOKENS.get(model, 0)
-    output_price = COST_PER_1M_OUTPUT_TOKENS.get(model, 0)
+    cost = calculate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+
+    if adaptive_cap:
+        token_limits.observe(limit_key, completion_tokens, cap, truncated)
 
     # --------
-    # SESSION STATE SAFE INITIALIZATION
+    # SESSION TOTALS (applied when the job ends)
     # --------
-    ss = st.session_state
-    ss.setdefault("input_tokens_total", 0)
-    ss.setdefault("output_tokens_total", 0)
-    ss.setdefault("cost_so_far", 0.0)
+    jobs.record_usage(prompt_tokens, completion_tokens, cost)
 
     # --------
-    # UPDATE TOTAL COUNTS
+    # USAGE LEDGER
     # --------
-    ss.input_tokens_total += prompt_tokens
-    ss.output_tokens_total += completion_tokens
+    ledger.record_call(
+        session_id=ss.get("session_id"),
+        task=task,
+        model=model,
+        input_tokens=prompt_tokens,
+        cached_tokens=cached_tokens,
+        output_tokens=completion_tokens,
+        latency_ms=latency_ms,
+        cost=cost,
+        metadata={**(metadata or {}), "cap": cap, "trunc": truncated or None, "cap_retry": (not adaptive_cap) or None},
+    )
+
+    if truncated and structured_output is not None and ENABLE_OUTPUT_RECOVERY:
+        recovered = _recover_truncated(
+            response, sys_instructions, prompt_text, model, temperature, structured_output,
+            task, metadata, prompt_cache_key, backend.supports_conversation_state,
+            # Partial fields are only kept if asking again with a higher cap is not an option
+            lenient=cap >= max_tokens,
+        )
+        if recovered is not None:
+            return recovered
 
-    # Cost calculation (per 1M tokens)
-    ss.cost_so_far += (
-        (prompt_tokens * input_price / 1_000_000)
-        + (completion_tokens * output_price / 1_000_000)
+    if truncated and cap < max_tokens:
+        # The learned cap was too tight for this response; ask again with the configured cap
+        logger.info(f"Repeating task={task} with max_tokens={max_tokens} after truncation at {cap}")
+        return _request_llm(
+            sys_instructions=sys_instructions,
+            prompt_text=prompt_text,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            structured_output=structured_output,
+            task=task,
+            metadata=metadata,
+            prompt_cache_key=prompt_cache_key,
+            previous_response_id=previous_response_id,
+            adaptive_cap=False,
+            strip=strip,
+            use_cache=use_cache,
+        )
+
+    return text, response.response_id
+
+
+# Characters of the cut-off response quoted in a chained continuation prompt
+# (the model already has the whole response in its conversation state).
+_CONTINUATION_TAIL_CHARS = 200
+
+
+def _recover_truncated(
+    response,
+    sys_instructions: str,
+    prompt_text: str,
+    model: str,
+    temperature: float,
+    structured_output: dict,
+    task: str,
+    metadata: dict | None,
+    prompt_cache_key: str | None,
+    chained: bool,
+    lenient: bool,
+) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Recover a structured response that was cut off at `max_output_tokens`.
+
+    1. Repair the partial JSON locally, keeping only completed fields.
+    2. Otherwise ask for the missing part only (at most `CONTINUATION_MAX_TOKENS`),
+       chained to the cut-off response if the backend keeps conversation state.
+    3. With `lenient`, keep a cut-off string field as a last resort, as long as
+       no field has the wrong type.
+
+    Returns:
+        (text, response_id) of the recovered JSON, or None if it could not be recovered.
+    """
+    validate = so.validator(structured_output)
+    if validate is None:
+        return None
+    partial = response.text
+
+    repaired = so.repair_json(partial)
+    if repaired is not None and so.parse_valid(repaired, validate) is not None:
+        logger.info(f"Repaired truncated output of task={task} locally")
+        return repaired, response.response_id
+
+    continuation, continuation_id = _request_continuation(
+        partial, response.response_id if chained else None, sys_instructions, prompt_text,
+        model, temperature, task, metadata, prompt_cache_key,
     )
+    if continuation is not None:
+        combined = partial + continuation
+        for candidate in (combined, so.repair_json(combined)):
+            if candidate is not None and so.parse_valid(candidate, validate) is not None:
+                logger.info(f"Completed truncated output of task={task} with a continuation")
+                return candidate, continuation_id or response.response_id
+        partial = combined
+
+    if lenient:
+        repaired = so.repair_json(partial, close_strings=True)
+        try:
+            data = so.loads(repaired) if repaired is not None else None
+        except ValueError:
+            data = None
+        if data and all(problem.endswith(": missing") for problem in validate(data)):
+            logger.warning(f"Kept partial output of task={task} after truncation")
+            return repaired, response.response_id
+
+    logger.warning(f"Could not recover truncated output of task={task}")
+    return None
+
+
+def _request_continuation(
+    partial: str,
+    previous_response_id: str | None,
+    sys_instructions: str,
+    prompt_text: str,
+    model: str,
+    temperature: float,
+    task: str,
+    metadata: dict | None,
+    prompt_cache_key: str | None,
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Ask the model for the rest of a cut-off response.
 
-    return text
+    Returns:
+        (continuation text, response_id), or (None, None) if the request failed.
+    """
+    if previous_response_id is not None:
+        prompt = load_prompt(CONTINUATION_TEMPLATE, partial=partial[-_CONTINUATION_TAIL_CHARS:])
+    else:
+        prompt = load_prompt(CONTINUATION_TEMPLATE, partial=partial, original_prompt=prompt_text)
+    try:
+        text, response_id = _request_llm(
+            sys_instructions=sys_instructions,
+            prompt_text=prompt,
+            model=model,
+            temperature=temperature,
+            max_tokens=CONTINUATION_MAX_TOKENS,
+            task="continuation",
+            metadata={**(metadata or {}), "continued_task": task},
+            prompt_cache_key=prompt_cache_key,
+            previous_response_id=previous_response_id,
+            strip=False,
+        )
+    except JobCancelled:
+        raise
+    except Exception as e:
+        logger.warning(f"Continuation of task={task} failed: {e}")
+        return None, None
+    return _strip_code_fence(text), response_id
 
 
+def _strip_code_fence(text: str) -> str:
+    # Models sometimes wrap a continuation in a code fence despite the instructions
+    if text.lstrip().startswith("```"):
+        text = text.lstrip().partition("\n")[2]
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text
+
 
 # ---------------------------------------------------------------------
 # Public API for OpenAI calls
@@ -109,6 +407,10 @@ def openai_call(
     prompt_text: str,
     max_tokens: int | None = None,
     structured_output: dict | None = None,
+    task: str = "generic",
+    metadata: dict | None = None,
+    prompt_cache_key: str | None = None,
+    use_cache: bool = True,
 ) -> str:
     """
     Public wrapper for OpenAI Responses API calls using session-state parameters.
@@ -117,6 +419,11 @@ def openai_call(
         sys_instructions: System-level instructions for the model.
         prompt_text: The main prompt content.
         structured_output: Optional structured output format (dict).
+        task: Short label for the usage ledger (e.g. "evaluation").
+        metadata: Extra ledger fields such as the persona.
+        prompt_cache_key: Routes requests sharing a prompt prefix to the same provider cache.
+        use_cache: Allow the response to be served from the response cache. Pass
+            False when it must differ between interviews (e.g. a generated question).
     
     Returns:
         str: Model response text
@@ -125,29 +432,163 @@ def openai_call(
         # Pull OpenAI parameters from Streamlit session state
         settings = get_openai_settings()
         max_tokens = max_tokens if max_tokens is not None else settings["max_tokens"]
-        return _call_openai(
-            sys_instructions=sys_instructions,
-            prompt_text=prompt_text,
-            model=settings["model"],
-            temperature=settings["temperature"],
-            max_tokens=max_tokens,
-            structured_output=structured_output,
-        )
+        # One span for the call; each attempt (including retries) is a child span
+        with tracing.span("llm_call", task=task):
+            return _call_openai(
+                sys_instructions=sys_instructions,
+                prompt_text=prompt_text,
+                model=settings["model"],
+                temperature=settings["temperature"],
+                max_tokens=max_tokens,
+                structured_output=structured_output,
+                task=task,
+                metadata=metadata,
+                prompt_cache_key=prompt_cache_key,
+                use_cache=use_cache,
+            )
     
 
+    except JobCancelled:
+        raise
     except Exception as e:
         logger.exception(f"Error in openai_call: {e}")
-        return "Error generating response. Please try again."
+        return CALL_FAILED
+
+
+def openai_chained_call(
+    sys_instructions: str,
+    prompt_text: str,
+    previous_response_id: str | None,
+    max_tokens: int | None = None,
+    structured_output: dict | None = None,
+    task: str = "generic",
+    metadata: dict | None = None,
+    use_cache: bool = True,
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Call the model as the next turn of a server-side conversation.
+
+    With `previous_response_id`, the provider supplies the earlier turns, so
+    `prompt_text` only needs the new content (system instructions are not
+    carried over and are always sent). The call is made once without retries,
+    so a broken or expired chain can fall back to a stateless call right away.
+
+    Args:
+        sys_instructions: System-level instructions for the model.
+        prompt_text: New input for this turn.
+        previous_response_id: Response to continue from (None starts a new chain).
+        max_tokens: Output token cap (defaults to the question/summary setting).
+        structured_output: Optional structured output format (dict).
+        task: Short label for the usage ledger.
+        metadata: Extra ledger fields.
+        use_cache: Allow the response to be served from the response cache
+            (see `openai_call`).
+
+    Returns:
+        (text, response_id), or (None, None) if the call failed.
+    """
+    try:
+        settings = get_openai_settings()
+        with tracing.span("llm_call", task=task, chained=previous_response_id is not None):
+            return _request_llm(
+                sys_instructions=sys_instructions,
+                prompt_text=prompt_text,
+                model=settings["model"],
+                temperature=settings["temperature"],
+                max_tokens=max_tokens if max_tokens is not None else settings["max_tokens"],
+                structured_output=structured_output,
+                task=task,
+                metadata={**(metadata or {}), "chained": previous_response_id is not None},
+                previous_response_id=previous_response_id,
+                use_cache=use_cache,
+            )
+    except JobCancelled:
+        raise
+    except Exception as e:
+        logger.warning(f"Chained call failed ({task}): {e}")
+        return None, None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the token count of a text (about 4 characters per token for English).
+
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    return (len(text) + 3) // 4
 
 
 # ---------------------------------------------------------------------
 # Jinja2 Environment for prompt templates
 # ---------------------------------------------------------------------
-env: Environment = Environment(loader=FileSystemLoader(PROMPTS_TEMPLATE_DIR))
+# Compiling is cached in `_PromptVersion` below, so changed files are picked up exactly when invalidated
+env: Environment = Environment(loader=FileSystemLoader(PROMPTS_TEMPLATE_DIR), cache_size=0)
+
+
+class _PromptVersion:
+    """Compiled templates, and the text of templates rendered without variables, by template name."""
+
+    __slots__ = ("templates", "static_renders")
+
+    def __init__(self, templates: Dict[str, Template], static_renders: Dict[str, str]):
+        self.templates = templates
+        self.static_renders = static_renders
+
+
+# Invalidation replaces the current version (copy-on-write), so pinned renders keep the old templates
+_prompt_version = _PromptVersion({}, {})
+_prompt_version_lock = threading.Lock()
+_pinned_prompts: contextvars.ContextVar[Optional[_PromptVersion]] = contextvars.ContextVar("pinned_prompts", default=None)
+
 
+def _current_prompts() -> _PromptVersion:
+    return _pinned_prompts.get() or _prompt_version
 
-@lru_cache(maxsize=128)
-def load_template(template_name: str):
+
+@contextmanager
+def pinned_templates() -> Iterator[None]:
+    """
+    Keep using the templates compiled so far in this context (and work submitted
+    from it), even if they are invalidated meanwhile.
+    """
+    token = _pinned_prompts.set(_current_prompts())
+    try:
+        yield
+    finally:
+        _pinned_prompts.reset(token)
+
+
+def invalidate_templates(template_names: Optional[Iterable[str]] = None) -> int:
+    """
+    Drop compiled and rendered templates so they are reloaded on next use.
+
+    Args:
+        template_names: Template names relative to `PROMPTS_TEMPLATE_DIR` (None drops all).
+
+    Returns:
+        int: Number of cached templates dropped.
+    """
+    global _prompt_version
+    with _prompt_version_lock:
+        current = _prompt_version
+        dropped = set(current.templates)
+        if template_names is not None:
+            dropped &= set(template_names)
+        if not dropped:
+            return 0
+        _prompt_version = _PromptVersion(
+            {name: t for name, t in current.templates.items() if name not in dropped},
+            {name: text for name, text in current.static_renders.items() if name not in dropped},
+        )
+    logger.info(f"Invalidated {len(dropped)} prompt template(s): {', '.join(sorted(dropped))}")
+    return len(dropped)
+
+
+def load_template(template_name: str) -> Template:
     """
     Load and cache a Jinja2 template.
 
@@ -157,11 +598,17 @@ def load_template(template_name: str):
     Returns:
         jinja2.Template: Loaded template object
     """
+    prompts = _current_prompts()
+    template = prompts.templates.get(template_name)
+    if template is not None:
+        return template
     try:
-        return env.get_template(template_name)
+        template = env.get_template(template_name)
     except Exception as e:
         logger.error(f"Failed to load template '{template_name}': {e}")
         raise
+    prompts.templates[template_name] = template
+    return template
 
 
 def render_template(template_name: str, **kwargs) -> str:
@@ -176,17 +623,22 @@ def render_template(template_name: str, **kwargs) -> str:
         str: Rendered template text
     """
     logger.info(f"[PROMPT LOADER] Rendering template: {template_name}")
-    template = load_template(template_name)
-    rendered = template.render(**kwargs)
-
-    try:
-        logger.debug(f"=== FULLY RENDERED PROMPT ({template_name}) ===\n{rendered}")
-    except UnicodeEncodeError:
-        safe_log_file = Path("logs") / "full_prompt.log"
-        safe_log_file.parent.mkdir(exist_ok=True)
-        with safe_log_file.open("w", encoding="utf-8") as f:
-            f.write(rendered)
-        logger.debug(f"Prompt contains unprintable characters. Saved to {safe_log_file}")
+    with tracing.span("render_template", template=template_name) as render_span:
+        if kwargs:
+            rendered = load_template(template_name).render(**kwargs)
+        else:
+            # System instructions have no variables; render them once per template version
+            prompts = _current_prompts()
+            rendered = prompts.static_renders.get(template_name)
+            if rendered is None:
+                rendered = load_template(template_name).render()
+                prompts.static_renders[template_name] = rendered
+        ledger.note_render(template_name, rendered, kwargs)
+
+        # Full text goes to the prompt archive once; look it up with `python -m modules.prompt_archive show <hash>`
+        digest = prompt_archive.archive_prompt(rendered)
+        render_span.set(chars=len(rendered), prompt=digest)
+    logger.debug(f"Rendered prompt {template_name}: {len(rendered)} chars, archive {digest}")
 
     return rendered
 
@@ -221,6 +673,8 @@ def build_prompt(category: str, base_instructions: str, technique: str, **kwargs
     logger.info(
         f"[PROMPT BUILDER] category={category}, base={base_instructions}, technique={technique}"
     )
-    base = load_prompt(f"{category}/{base_instructions}", **kwargs)
-    technique_section = load_prompt(f"{category}/{technique}", **kwargs)
-    return f"{base}\n\n{technique_section}"
\ No newline at end of file
+    # Base and technique come from the same template version even if a reload lands in between
+    with tracing.span("build_prompt", category=category, technique=technique), pinned_templates():
+        base = load_prompt(f"{category}/{base_instructions}", **kwargs)
+        technique_section = load_prompt(f"{category}/{technique}", **kwargs)
+        return f"{base}\n\n{technique_section}"
\ No newline at end of file
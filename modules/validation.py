@@ -1,16 +1,29 @@
+import json
 import streamlit as st
-from modules.config import USE_MOCK_API, ACTIVE_VALIDATION_TECHNIQUE, SYSTEM_PROMPTS, BASE_PROMPTS
-from typing import Tuple, Optional
+from modules.config import (
+    ENABLE_JOB_TITLE_INDEX,
+    VALIDATION_MODE,
+    get_settings,
+)
+from typing import List, Tuple, Optional
 from modules.utils import load_prompt, build_prompt, openai_call
 from modules.error_handling import safe_execute
+from modules.cassette import note_input
+from modules.structured_output import loads as parse_json
+from modules.session_state import get_openai_settings
+from modules.job_titles import get_index
+from modules import tracing
+from modules.interview_logic import (
+    build_question_prompt,
+    first_question_context,
+    first_question_from_bank,
+    prefetch_first_question,
+    store_prefetched_question,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
-# --- MOCK API MODE ---
-MOCK_CLARIFICATION_JOB_TITLES = ["Wizard of Light", "Dragon Tamer"]  # Example titles that need clarification
-MOCK_MESSAGE = "Mock Clarification: This job title seems unusual. Please confirm."
-
 
 def validate_job_title_exists(job_title: Optional[str]) -> bool:
     """
@@ -34,6 +47,42 @@ def validate_job_title_exists(job_title: Optional[str]) -> bool:
     return True
 
 
+def is_known_job_title(job_title: str) -> bool:
+    """
+    Checks the job title against the bundled job-title index.
+
+    Known titles and close misspellings of them need no LLM validation.
+
+    Args:
+        job_title: Job title string to check
+
+    Returns:
+        bool: True if the title (or a close misspelling) is in the index
+    """
+    if not ENABLE_JOB_TITLE_INDEX:
+        return False
+    match = get_index().match(job_title)
+    if match:
+        logger.info(f"Job title '{job_title}' accepted locally as '{match}'")
+    return match is not None
+
+
+def suggest_job_titles(job_title: str, limit: int = 3) -> List[str]:
+    """
+    Returns known job titles similar to the given one, for "did you mean" suggestions.
+
+    Args:
+        job_title: Job title entered by the user
+        limit: Maximum number of suggestions
+
+    Returns:
+        List[str]: Suggested titles, most similar first
+    """
+    if not ENABLE_JOB_TITLE_INDEX:
+        return []
+    return [title for title in get_index().suggest(job_title, limit) if title.lower() != job_title.strip().lower()]
+
+
 def validate_job_title_with_clarification(job_title: str) -> Tuple[bool, Optional[str]]:
     """
     Validates a job title using the LLM with a fail-safe prompt.
@@ -49,29 +98,27 @@ def validate_job_title_with_clarification(job_title: str) -> Tuple[bool, Optiona
     """
     logger.info(f"Validating job title: '{job_title}'")
 
-    # --- MOCK API for testing ---
-    if USE_MOCK_API:
-        if job_title.strip() in MOCK_CLARIFICATION_JOB_TITLES:
-            logger.info(f"Mock clarification needed for job title: '{job_title}'")
-            return False, MOCK_MESSAGE
+    if is_known_job_title(job_title):
         return True, None
 
     try:
         # --- Load system instructions ---
-        sys_instructions = load_prompt(SYSTEM_PROMPTS["job_title_validator"])
+        prompt_settings = get_settings()
+        sys_instructions = load_prompt(prompt_settings.system_prompts["job_title_validator"])
 
         # --- Build full prompt using base + technique ---
         prompt_body = build_prompt(
             category="validation",
-            base_instructions=BASE_PROMPTS["validation"],
-            technique=ACTIVE_VALIDATION_TECHNIQUE,
+            base_instructions=prompt_settings.base_prompts["validation"],
+            technique=prompt_settings.active_validation_technique,
             job_title=job_title
         )
         final_prompt = f"MODE: validate_job_title\n\n{prompt_body}".strip()
+        note_input("job_title", job_title)
         logger.debug(f"Final validation prompt length: {len(final_prompt)}")
 
         # --- Call OpenAI API using centralized error handler ---
-        result = safe_execute(lambda: openai_call(sys_instructions, final_prompt), fallback="Validation failed. Please try again.")
+        result = safe_execute(lambda: openai_call(sys_instructions, final_prompt, task="validation"), fallback="Validation failed. Please try again.")
         if not result:
             logger.warning(f"Validation API returned empty result for '{job_title}'")
             return False, "Validation failed. Please try again."
@@ -87,3 +134,137 @@ def validate_job_title_with_clarification(job_title: str) -> Tuple[bool, Optiona
     except Exception as e:
         logger.error(f"Unexpected error during job title validation: {e}", exc_info=True)
         return False, "Validation failed due to an internal error."
+
+
+def validate_job_title_and_generate_question(
+    job_title: str, question_type: str, difficulty: str
+) -> Tuple[bool, Optional[str], Optional[str]]:
+    """
+    Validates a job title and generates the first interview question in one structured call.
+
+    Args:
+        job_title: Job title string to validate
+        question_type: Behavioral, Technical, or Role-specific
+        difficulty: Selected difficulty level
+
+    Returns:
+        Tuple[bool, Optional[str], Optional[str]]:
+            - bool: True if valid, False if clarification is needed
+            - Optional[str]: Clarification message if needed, otherwise None
+            - Optional[str]: First question if the title is valid, otherwise None
+    """
+    logger.info(f"Validating job title with first question: '{job_title}'")
+
+    try:
+        prompt_settings = get_settings()
+        sys_instructions = load_prompt(prompt_settings.system_prompts["job_title_validator_with_question"])
+
+        validation_body = build_prompt(
+            category="validation",
+            base_instructions=prompt_settings.base_prompts["validation"],
+            technique=prompt_settings.combined_validation_technique,
+            job_title=job_title
+        )
+        question_body = build_question_prompt(
+            job_title, question_type, difficulty, context_snippets=first_question_context(job_title, question_type)
+        )
+        final_prompt = (
+            f"MODE: validate_and_generate_question\n\n{validation_body}\n\n"
+            f"QUESTION GENERATION:\n{question_body}"
+        ).strip()
+        note_input("job_title", job_title)
+        note_input("question_type", question_type)
+        note_input("difficulty", difficulty)
+        logger.debug(f"Final combined validation prompt length: {len(final_prompt)}")
+
+        structured_output = {
+            "format": {
+                "type": "json_schema",
+                "name": "validation_with_question",
+                "strict": True,
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "valid": {"type": "boolean"},
+                        "clarification": {"type": ["string", "null"]},
+                        "question": {"type": ["string", "null"]},
+                    },
+                    "required": ["valid", "clarification", "question"],
+                    "additionalProperties": False,
+                },
+            }
+        }
+        result = openai_call(
+            sys_instructions,
+            final_prompt,
+            max_tokens=get_openai_settings()["max_tokens"],
+            structured_output=structured_output,
+            task="validation",
+            metadata={"mode": "combined"},
+            # The response includes the interview's first question
+            use_cache=False,
+        )
+
+        try:
+            with tracing.span("parse_validation"):
+                data = parse_json(result)
+        except (TypeError, json.JSONDecodeError):
+            logger.warning(f"Combined validation returned no JSON for '{job_title}': {result!r}")
+            return False, "Validation failed. Please try again.", None
+
+        clarification = (data.get("clarification") or "").strip()
+        question = (data.get("question") or "").strip() or None
+        if not data.get("valid") or clarification.lower().startswith("clarification needed"):
+            logger.info(f"Clarification required for job title '{job_title}': {clarification}")
+            return False, clarification or "Clarification needed: Please provide a more specific job title.", None
+
+        logger.debug(f"Job title '{job_title}' validated successfully with first question")
+        return True, None, question
+
+    except Exception as e:
+        logger.error(f"Unexpected error during combined job title validation: {e}", exc_info=True)
+        return False, "Validation failed due to an internal error.", None
+
+
+def validate_job_title_for_start(job_title: str, question_type: str, difficulty: str) -> Tuple[bool, Optional[str]]:
+    """
+    Validates the job title when an interview is started or restarted, and
+    prepares the first question according to `VALIDATION_MODE`.
+
+    In "combined" mode, one call validates the title and returns the first
+    question. Otherwise, and for titles known to the job-title index, the first
+    question is prefetched in the background while the title is validated.
+    Settings covered by the question bank need neither: the first question is
+    drawn from the bank.
+
+    Args:
+        job_title: Job title string to validate
+        question_type: Behavioral, Technical, or Role-specific
+        difficulty: Selected difficulty level
+
+    Returns:
+        Tuple[bool, Optional[str]]: (valid, clarification message)
+    """
+    banked = first_question_from_bank(job_title, question_type, difficulty)
+    if VALIDATION_MODE == "combined" and not banked and not is_known_job_title(job_title):
+        valid, message, question = validate_job_title_and_generate_question(job_title, question_type, difficulty)
+        if valid and question:
+            store_prefetched_question(job_title, question_type, difficulty, question)
+        return valid, message
+
+    prefetch_first_question(job_title, question_type, difficulty)
+    return validate_job_title_with_clarification(job_title)
+
+
+def validate_start_settings(job_title: str, question_type: str, difficulty: str) -> Tuple[str, str, str, bool, Optional[str]]:
+    """
+    Run `validate_job_title_for_start` as the background job of Start or Restart.
+
+    Returns:
+        Tuple[str, str, str, bool, Optional[str]]: (job_title, question_type,
+        difficulty, valid, clarification message); the UI starts the
+        interview with these settings once the job has finished.
+    """
+    valid, message = validate_job_title_for_start(job_title, question_type, difficulty)
+    return job_title, question_type, difficulty, valid, message
+
@@ -0,0 +1,18 @@
+import pytest
+from modules import ledger, prompt_archive, response_cache, rubric, token_limits
+from modules.llm_backends import FakeBackend, set_backend
+
+
+@pytest.fixture(autouse=True)
+def offline_llm(tmp_path, monkeypatch):
+    """Route every test through the offline fake backend, a throwaway usage ledger, prompt archive and score history, an empty response cache and untrained output caps."""
+    monkeypatch.setattr(ledger, "USAGE_LEDGER_PATH", str(tmp_path / "usage_ledger.jsonl"))
+    monkeypatch.setattr(prompt_archive, "PROMPT_ARCHIVE_DIR", str(tmp_path / "prompts"))
+    monkeypatch.setattr(prompt_archive, "_last_touch", {})
+    monkeypatch.setattr(rubric, "RUBRIC_HISTORY_PATH", str(tmp_path / "rubric_scores.bin"))
+    monkeypatch.setattr(token_limits, "_limiter", None)
+    response_cache.get_cache().clear()
+    backend = FakeBackend(seed=0)
+    set_backend(backend)
+    yield backend
+    set_backend(None)
@@ -0,0 +1,53 @@
+import pytest
+import streamlit as st
+from modules.answer_screening import PATTERN_NOTE, classify_answer, screen_answer
+from modules.interview_logic import evaluate_answer_and_generate_next
+from modules.session_state import get_transcript
+
+GOOD_ANSWER = (
+    "In my last role I noticed our release checklist was missing a rollback step, "
+    "so I wrote one with the team and we used it twice that quarter."
+)
+
+
+@pytest.mark.parametrize(
+    "answer, expected",
+    [
+        ("with unicorns", "too_short"),
+        ("", "too_short"),
+        ("ha " * 20, "nonsensical"),
+        (GOOD_ANSWER, None),
+        # Borderline answers are left to the model
+        ("I did it.", None),
+        ("Migré nuestro servicio de facturación a Kubernetes en tres fases, sin tiempo de inactividad.", None),
+        ("Я перевёл сервис оплаты на Kubernetes за три этапа без простоя.", None),
+        ("Kafka, Flink, Debezium CDC, idempotent sinks, exactly-once semantics, p99 SLOs.", None),
+        ("asdf qwer zxcv uiop hjkl vbnm tyui fghj rtyu cvbn dfgh", None),
+    ],
+)
+def test_classify_answer(answer, expected):
+    assert classify_answer(answer) == expected
+
+
+def test_repeated_answer():
+    assert classify_answer(GOOD_ANSWER.upper(), [GOOD_ANSWER]) == "repeated"
+
+
+def test_pattern_of_low_effort_answers():
+    assert PATTERN_NOTE not in screen_answer("no", "Q?", ["idk"])
+    assert PATTERN_NOTE in screen_answer("no", "Q?", [GOOD_ANSWER, "idk", "nope"])
+
+
+def test_screened_answer_skips_llm(monkeypatch, offline_llm):
+    calls = []
+    monkeypatch.setattr(offline_llm, "create", lambda **kw: calls.append(kw))
+    transcript = get_transcript()
+    transcript.clear()
+    transcript.add_question("Tell me about a conflict.")
+    st.session_state.evaluation_style = "Mentor"
+
+    feedback, next_question = evaluate_answer_and_generate_next("lol")
+
+    assert feedback.startswith("Your answer is too brief")
+    assert next_question == "Tell me about a conflict."
+    assert calls == []
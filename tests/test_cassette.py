@@ -0,0 +1,125 @@
+import pytest  # noqa: F401
+import streamlit as st
+from modules import cassette
+from modules.interview_logic import evaluate_answer_and_generate_next, generate_next_question
+from modules.session_state import get_transcript
+from modules.validation import validate_job_title_and_generate_question
+
+
+def test_record_and_replay_session(tmp_path, monkeypatch):
+    monkeypatch.setattr(cassette, "RECORD_LLM_TRAFFIC", True)
+    monkeypatch.setattr(cassette, "CASSETTE_DIR", str(tmp_path))
+
+    st.session_state.session_id = "rec-test"
+    st.session_state.job_title = "Data Analyst"
+    st.session_state.question_type = "Behavioral"
+    st.session_state.difficulty = "Medium"
+    st.session_state.evaluation_style = "Mentor"
+    get_transcript().clear()
+    get_transcript().add_question(generate_next_question())
+    answer = "I built a weekly churn dashboard that helped the retention team cut churn by five percent."
+    evaluate_answer_and_generate_next(answer)
+
+    loaded = cassette.Cassette(cassette.cassette_path("rec-test"))
+    assert [c["task"] for c in loaded.calls] == ["question", "evaluation"]
+    assert loaded.calls[1]["inputs"]["answer"] == answer
+
+    stats = cassette.replay_session(loaded.path, timing_scale=0, strict=True)
+    assert [a["task"] for a in stats["actions"]] == ["question", "evaluation"]
+    assert stats["misses"] == 0
+
+
+def test_replay_combined_validation(tmp_path, monkeypatch):
+    monkeypatch.setattr(cassette, "RECORD_LLM_TRAFFIC", True)
+    monkeypatch.setattr(cassette, "CASSETTE_DIR", str(tmp_path))
+    st.session_state.session_id = "combined-test"
+
+    valid, _, question = validate_job_title_and_generate_question("Nurse", "Technical", "Hard")
+    assert valid
+
+    stats = cassette.replay_session(cassette.cassette_path("combined-test"), timing_scale=0, strict=True)
+    assert [a["task"] for a in stats["actions"]] == ["validation"]
+    assert stats["misses"] == 0
+    assert get_transcript().questions() == [question]
+
+
+def test_cassettes_recorded_under_an_older_key_still_match(tmp_path, monkeypatch):
+    import json
+
+    monkeypatch.setattr(cassette, "RECORD_LLM_TRAFFIC", True)
+    monkeypatch.setattr(cassette, "CASSETTE_DIR", str(tmp_path))
+    st.session_state.session_id = "old-key-test"
+    validate_job_title_and_generate_question("Nurse", "Technical", "Hard")
+
+    # Older recordings hashed max_output_tokens into the stored key
+    path = cassette.cassette_path("old-key-test")
+    with open(path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    with open(path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            if entry["type"] == "call":
+                entry["key"] = "recorded-with-token-cap"
+            f.write(json.dumps(entry) + "\n")
+
+    stats = cassette.replay_session(path, timing_scale=0, strict=True)
+    assert stats["misses"] == 0
+
+
+def test_replay_parallel_evaluation(tmp_path, monkeypatch):
+    from modules import interview_logic
+
+    monkeypatch.setattr(cassette, "RECORD_LLM_TRAFFIC", True)
+    monkeypatch.setattr(cassette, "CASSETTE_DIR", str(tmp_path))
+    monkeypatch.setattr(interview_logic, "EVALUATION_PIPELINE", "parallel")
+    st.session_state.session_id = "parallel-test"
+    st.session_state.job_title = "Nurse"
+    st.session_state.question_type = "Behavioral"
+    st.session_state.difficulty = "Easy"
+    st.session_state.evaluation_style = "Mentor"
+    get_transcript().clear()
+    get_transcript().add_question(generate_next_question())
+    evaluate_answer_and_generate_next("I calmed a distressed patient by explaining each step of the procedure.")
+
+    loaded = cassette.Cassette(cassette.cassette_path("parallel-test"))
+    assert sorted(c["task"] for c in loaded.calls) == ["feedback", "next_question", "question"]
+
+    stats = cassette.replay_session(loaded.path, timing_scale=0, strict=True)
+    assert [a["task"] for a in stats["actions"]] == ["question", "feedback"]
+    assert stats["misses"] == 0
+
+
+def test_replay_persona_fanout(tmp_path, monkeypatch):
+    from modules.interview_logic import evaluate_answer_personas, evaluation_personas
+
+    monkeypatch.setattr(cassette, "RECORD_LLM_TRAFFIC", True)
+    monkeypatch.setattr(cassette, "CASSETTE_DIR", str(tmp_path))
+    st.session_state.session_id = "fanout-test"
+    st.session_state.job_title = "Nurse"
+    st.session_state.question_type = "Behavioral"
+    st.session_state.difficulty = "Easy"
+    st.session_state.evaluation_style = "Mentor"
+    st.session_state.fanout_personas = ["HR Professional"]
+    try:
+        get_transcript().clear()
+        get_transcript().add_question(generate_next_question())
+        evaluate_answer_personas(
+            "I calmed a distressed patient by explaining each step of the procedure.", evaluation_personas()
+        )
+
+        stats = cassette.replay_session(cassette.cassette_path("fanout-test"), timing_scale=0, strict=True)
+    finally:
+        del st.session_state["fanout_personas"]
+
+    assert [a["task"] for a in stats["actions"]] == ["question", "feedback"]
+    assert stats["misses"] == 0
+    assert sorted(get_transcript().turns()[0].feedbacks) == ["HR Professional", "Mentor"]
+
+
+def test_request_key_includes_previous_response_id():
+    from modules.cassette import request_key
+
+    request = {"model": "gpt-4o-mini", "instructions": "sys", "input": "next answer"}
+    assert request_key(request) == request_key({**request, "previous_response_id": None})
+    assert request_key({**request, "previous_response_id": "resp_1"}) != request_key(
+        {**request, "previous_response_id": "resp_2"}
+    )
@@ -0,0 +1,63 @@
+import os
+import pytest
+from jinja2 import Environment, FileSystemLoader
+from modules import config, utils
+from modules.hot_reload import Watcher, pinned
+
+
+@pytest.fixture
+def templates(tmp_path, monkeypatch):
+    template_dir = tmp_path / "templates"
+    (template_dir / "system").mkdir(parents=True)
+    (template_dir / "system" / "question.j2").write_text("Ask one question.")
+    monkeypatch.setattr(utils, "env", Environment(loader=FileSystemLoader(str(template_dir)), cache_size=0))
+    monkeypatch.setattr(utils, "_prompt_version", utils._PromptVersion({}, {}))
+    return template_dir
+
+
+def _edit(path, text):
+    path.write_text(text)
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+
+
+def test_edited_template_is_reloaded_but_pinned_renders_keep_the_old_one(templates):
+    watcher = Watcher(str(templates), "")
+    assert utils.load_prompt("system/question.j2") == "Ask one question."
+
+    with pinned():
+        _edit(templates / "system" / "question.j2", "Ask exactly one short question.")
+        (templates / "system" / "summary.j2").write_text("Summarize.")
+        assert watcher.check() == (["system/question.j2", "system/summary.j2"], False)
+        assert utils.load_prompt("system/question.j2") == "Ask one question."
+
+    assert utils.load_prompt("system/question.j2") == "Ask exactly one short question."
+    assert watcher.check() == ([], False)
+
+
+def test_env_change_reloads_settings_but_process_env_wins(tmp_path, monkeypatch):
+    env_file = tmp_path / ".env"
+    env_file.write_text("ACTIVE_QUESTION_TECHNIQUE=zero_shot.j2\n")
+    for key in ("ACTIVE_QUESTION_TECHNIQUE", "PERSONA_MENTOR"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("PERSONA_MENTOR", "personality_mentor.j2")
+    monkeypatch.setattr(config, "ENV_FILE", str(env_file))
+    monkeypatch.setattr(config, "_PROCESS_ENV", frozenset({"PERSONA_MENTOR"}))
+    monkeypatch.setattr(config, "_env_file_keys", frozenset())
+    monkeypatch.setattr(config, "_settings", config.get_settings())
+    config.reload_settings()
+    watcher = Watcher(str(tmp_path / "templates"), str(env_file))
+
+    with pinned():
+        _edit(env_file, "ACTIVE_QUESTION_TECHNIQUE=few_shot.j2\nPERSONA_MENTOR=personality_sme.j2\n")
+        assert watcher.check() == ([], True)
+        assert config.ACTIVE_QUESTION_TECHNIQUE == "zero_shot.j2"
+
+    settings = config.get_settings()
+    assert settings.active_question_technique == "few_shot.j2"
+    assert settings.persona_map["Mentor"] == "personality_mentor.j2"
+
+    # Removed from .env: back to the default
+    _edit(env_file, "")
+    watcher.check()
+    assert config.get_settings().active_question_technique == "contextual_progression.j2"
@@ -1,6 +1,9 @@
+import time
 import pytest  # noqa: F401
 import streamlit as st
 from modules.interview_logic import generate_next_question, evaluate_answer_and_generate_next
+from modules import ledger
+from modules.session_state import get_transcript
 
 def test_generate_next_question():
     question = generate_next_question()
@@ -9,10 +12,9 @@ def test_generate_next_question():
 
 def test_evaluate_answer_and_generate_next():
     # Initialize required session state keys
-    st.session_state.questions = ["Sample question?"]
-    st.session_state.answers = []
-    st.session_state.feedbacks = []
-    st.session_state.current_question_index = 0
+    transcript = get_transcript()
+    transcript.clear()
+    transcript.add_question("Sample question?")
     st.session_state.evaluation_style = "Hiring Manager"
     st.session_state.job_title = "Software Engineer"
     st.session_state.difficulty = "Medium"  # <-- NEW
@@ -22,3 +24,160 @@ def test_evaluate_answer_and_generate_next():
 
     assert isinstance(feedback, str)
     assert isinstance(next_question, str) or next_question is None
+
+
+def _record_calls(monkeypatch, backend):
+    # (kind, start, end) of each backend request, to check which requests overlapped
+    calls = []
+    create = backend.create
+
+    def timed_create(**request_kwargs):
+        started = time.perf_counter()
+        try:
+            return create(**request_kwargs)
+        finally:
+            kind = "question" if "MODE: generate_question" in request_kwargs["input"] else "feedback"
+            calls.append((kind, started, time.perf_counter()))
+
+    monkeypatch.setattr(backend, "create", timed_create)
+    return calls
+
+
+def _overlap(calls):
+    return max(start for _, start, _ in calls) < min(end for _, _, end in calls)
+
+
+def test_parallel_evaluation_pipeline(monkeypatch, offline_llm):
+    from modules import interview_logic
+
+    monkeypatch.setattr(interview_logic, "EVALUATION_PIPELINE", "parallel")
+    offline_llm.latency_ms = 300
+    transcript = get_transcript()
+    transcript.clear()
+    transcript.add_question("Sample question?")
+    st.session_state.evaluation_style = "Mentor"
+    st.session_state.job_title = "Nurse"
+    st.session_state.difficulty = "Medium"
+    st.session_state.question_type = "Behavioral"
+
+    calls = _record_calls(monkeypatch, offline_llm)
+    feedback, next_question = evaluate_answer_and_generate_next(
+        "I stayed with an anxious patient, explained each step of the procedure and checked in afterwards."
+    )
+
+    assert feedback and "Nurse" in next_question
+    # The evaluation and the next question were requested concurrently
+    assert sorted(kind for kind, _, _ in calls) == ["feedback", "question"]
+    assert _overlap(calls)
+
+
+def test_persona_fanout_evaluates_every_persona_concurrently(monkeypatch, offline_llm):
+    from modules import llm_backends
+    from modules.interview_logic import evaluate_answer_personas, evaluation_personas
+
+    # The shared prefix of the test prompts is shorter than the provider's cache minimum
+    monkeypatch.setattr(llm_backends, "_CACHE_MIN_TOKENS", 256)
+    offline_llm.latency_ms = 300
+    transcript = get_transcript()
+    transcript.clear()
+    transcript.add_question("Sample question?")
+    st.session_state.evaluation_style = "Mentor"
+    st.session_state.fanout_personas = ["Hiring Manager", "Mentor", "HR Professional"]
+    st.session_state.job_title = "Nurse"
+    st.session_state.difficulty = "Medium"
+    st.session_state.question_type = "Behavioral"
+    try:
+        personas = evaluation_personas()
+        calls = _record_calls(monkeypatch, offline_llm)
+        with ledger.collect_usage() as records:
+            feedbacks, next_question = evaluate_answer_personas(
+                "I stayed with an anxious patient, explained each step of the procedure and checked in afterwards.",
+                personas,
+            )
+    finally:
+        del st.session_state["fanout_personas"]
+
+    assert personas == ["Mentor", "Hiring Manager", "HR Professional"]
+    assert sorted(feedbacks) == sorted(personas) and all(feedbacks.values())
+    assert "Nurse" in next_question
+    # The first feedback call ends before the other two start, and those two overlap
+    first, *others = sorted((call for call in calls if call[0] == "feedback"), key=lambda call: call[1])
+    assert len(others) == 2 and first[2] <= min(start for _, start, _ in others)
+    assert _overlap(others)
+    # The next question is generated alongside the first feedback call
+    assert _overlap([first] + [call for call in calls if call[0] == "question"])
+    cached = {r["persona"]: r["cin"] for r in records if r["task"] == "feedback"}
+    # The other personas are sent once the first call has put the shared prefix into the cache
+    assert cached["Mentor"] == 0 and cached["Hiring Manager"] > 0 and cached["HR Professional"] > 0
+
+
+def _start_interview():
+    transcript = get_transcript()
+    transcript.clear()
+    st.session_state.pop("conversation", None)
+    st.session_state.evaluation_style = "Hiring Manager"
+    st.session_state.job_title = "Software Engineer"
+    st.session_state.difficulty = "Medium"
+    st.session_state.question_type = "Behavioral"
+    transcript.add_question("Tell me about a project you led.")
+    return transcript
+
+
+ANSWER = "I led the migration of our billing service, split it into phases and shipped a week early with no downtime."
+
+
+def test_chained_conversation_sends_only_the_new_turn(monkeypatch):
+    from modules import interview_logic, ledger
+
+    monkeypatch.setattr(interview_logic, "CONVERSATION_MODE", "chained")
+    transcript = _start_interview()
+    sent = []
+    for turn in range(4):
+        with ledger.collect_usage() as records:
+            feedback, next_question = evaluate_answer_and_generate_next(f"{ANSWER} (turn {turn})")
+        transcript.answer_current(f"{ANSWER} (turn {turn})", feedback)
+        transcript.add_question(next_question)
+        assert [r["task"] for r in records] == ["evaluation"]
+        # System instructions are sent with every turn; compare the rendered input
+        sent.append(sum(n for name, n in records[0]["chars"].items() if not name.startswith("system/")))
+
+    assert st.session_state.conversation["persona"] == "Hiring Manager"
+    # Later turns only render the short continuation template, whatever the transcript length
+    assert max(sent[1:]) < sent[0] / 3
+    assert max(sent[1:]) - min(sent[1:]) < 50
+
+
+def test_chained_evaluations_are_not_shared_between_interviews(monkeypatch):
+    from modules import interview_logic, ledger
+
+    monkeypatch.setattr(interview_logic, "CONVERSATION_MODE", "chained")
+    response_ids = []
+    with ledger.collect_usage() as records:
+        for _ in range(2):
+            _start_interview()
+            evaluate_answer_and_generate_next(ANSWER)
+            response_ids.append(st.session_state.conversation["response_id"])
+
+    assert [r["task"] for r in records] == ["evaluation", "evaluation"]
+    assert response_ids[0] != response_ids[1]
+
+
+def test_broken_conversation_chain_falls_back_to_stateless_call(monkeypatch, offline_llm):
+    from modules import interview_logic, ledger
+
+    monkeypatch.setattr(interview_logic, "CONVERSATION_MODE", "chained")
+    transcript = _start_interview()
+    feedback, next_question = evaluate_answer_and_generate_next(ANSWER)
+    transcript.answer_current(ANSWER, feedback)
+    transcript.add_question(next_question)
+    first_id = st.session_state.conversation["response_id"]
+
+    offline_llm.forget_responses()
+    with ledger.collect_usage() as records:
+        feedback, next_question = evaluate_answer_and_generate_next(ANSWER + " Again.")
+
+    assert feedback and next_question
+    assert "conversation" not in st.session_state
+    # The chained attempt failed without a ledger record; the stateless call succeeded
+    assert [r["task"] for r in records] == ["evaluation"]
+    assert first_id
@@ -0,0 +1,42 @@
+import pytest
+from modules.job_titles import JobTitleIndex, edit_distance, get_index
+
+TITLES = ["Software Engineer", "Data Scientist", "Nurse", "Registered Nurse", "Product Manager", "Project Manager"]
+
+
+@pytest.fixture
+def index():
+    return JobTitleIndex(TITLES)
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("software engineer", "Software Engineer"),
+        ("Sr. Software Engineer", "Software Engineer"),
+        ("sofware enginer", "Software Engineer"),
+        ("Registred Nurse", "Registered Nurse"),
+        ("nurse", "Nurse"),
+        ("purse", None),
+        ("Dragon Tamer", None),
+        ("Manager", None),
+    ],
+)
+def test_match(index, query, expected):
+    assert index.match(query) == expected
+
+
+def test_suggest(index):
+    assert index.suggest("Prodcut Managr")[0] == "Product Manager"
+    assert index.suggest("Wizard of Light") == []
+
+
+def test_edit_distance_limit():
+    assert edit_distance("kitten", "sitting", 3) == 3
+    assert edit_distance("kitten", "sitting", 2) == 3
+
+
+def test_bundled_index_loads():
+    index = get_index()
+    assert len(index) > 200
+    assert index.match("Software Engineer") == "Software Engineer"
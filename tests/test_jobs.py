@@ -0,0 +1,122 @@
+import threading
+import streamlit as st
+from modules import jobs
+from modules.executor import submit
+from modules.interview_logic import restart_interview
+from modules.utils import openai_call
+
+
+def _call(prompt: str) -> str:
+    return openai_call("You are a test.", prompt, max_tokens=50, task="test")
+
+
+def _reset_totals(monkeypatch):
+    monkeypatch.setitem(st.session_state, "jobs", [])
+    for key, value in [("input_tokens_total", 0), ("output_tokens_total", 0), ("cost_so_far", 0.0)]:
+        monkeypatch.setitem(st.session_state, key, value)
+
+
+def test_usage_reaches_session_totals_when_the_job_ends(monkeypatch):
+    _reset_totals(monkeypatch)
+    release = threading.Event()
+
+    def work():
+        first = _call("one")
+        # Calls the job makes on the shared executor count towards the job too
+        second = submit(_call, "two").result(timeout=5)
+        release.wait(5)
+        return first, second
+
+    job = jobs.submit_job("test", work)
+    for _ in range(500):
+        if job.calls == 2:
+            break
+        threading.Event().wait(0.01)
+    assert job.calls == 2 and job.input_tokens > 0
+    assert st.session_state.input_tokens_total == 0
+
+    release.set()
+    assert job.wait(5) and job.status == jobs.DONE
+    assert st.session_state.input_tokens_total == job.input_tokens
+    assert st.session_state.cost_so_far == job.cost
+    assert [j.id for j in jobs.session_jobs()] == [job.id]
+
+
+def test_cancelled_job_makes_no_further_requests(monkeypatch, offline_llm):
+    _reset_totals(monkeypatch)
+    requests = []
+    real_create = offline_llm.create
+    monkeypatch.setattr(offline_llm, "create", lambda **kw: requests.append(kw["input"]) or real_create(**kw))
+    started, release = threading.Event(), threading.Event()
+
+    def work():
+        _call("first")
+        started.set()
+        release.wait(5)
+        return _call("second")
+
+    job = jobs.submit_job("test", work)
+    assert started.wait(5)
+    restart_interview()
+    release.set()
+
+    assert job.wait(5) and job.status == jobs.CANCELLED and job.result is None
+    assert requests == ["first"]
+    assert jobs.session_jobs() == []
+    # The request that was made is still counted
+    assert st.session_state.input_tokens_total == job.input_tokens > 0
+
+
+def test_queued_job_never_starts(monkeypatch):
+    _reset_totals(monkeypatch)
+    monkeypatch.setattr(jobs, "_pool", None)
+    monkeypatch.setattr(jobs, "JOB_WORKERS", 1)
+    release = threading.Event()
+    blocker = jobs.submit_job("test", release.wait, 5)
+    queued = jobs.submit_job("test", lambda: "ran")
+
+    assert queued.cancel() and queued.status == jobs.CANCELLED
+    release.set()
+    assert blocker.wait(5) and blocker.status == jobs.DONE
+    assert queued.result is None
+
+
+def test_start_validation_runs_as_a_job(monkeypatch):
+    from modules.ui.ui_interview import apply_finished_jobs
+    from modules.validation import validate_start_settings
+
+    _reset_totals(monkeypatch)
+    monkeypatch.setitem(st.session_state, "started", False)
+    monkeypatch.setitem(st.session_state, "needs_clarification", False)
+    invalid = jobs.submit_job("start", validate_start_settings, "Dragon Tamer", "Behavioral", "Easy")
+    assert invalid.wait(5)
+    apply_finished_jobs()
+    assert not st.session_state.started and st.session_state.needs_clarification
+    assert st.session_state.pending_job_title == "Dragon Tamer"
+
+    valid = jobs.submit_job("start", validate_start_settings, "Software Engineer", "Technical", "Hard")
+    assert valid.wait(5)
+    apply_finished_jobs()
+    assert st.session_state.started and st.session_state.job_title == "Software Engineer"
+    assert st.session_state.difficulty == "Hard" and jobs.session_jobs() == []
+
+
+def test_prefetched_question_usage_reaches_session_totals(monkeypatch, offline_llm):
+    from modules import interview_logic, ledger
+    from modules.validation import validate_start_settings
+
+    _reset_totals(monkeypatch)
+    monkeypatch.setattr(interview_logic, "SPECULATIVE_FIRST_QUESTION", True)
+    monkeypatch.setitem(st.session_state, "prefetched_question", None)
+    offline_llm.latency_ms = 100
+    with ledger.collect_usage() as records:
+        job = jobs.submit_job("start", validate_start_settings, "Nurse", "Behavioral", "Easy")
+        assert job.wait(5)
+        # The prefetch outlives the job that started it
+        prefetch = st.session_state.prefetched_question["future"]
+        assert not prefetch.done()
+        assert prefetch.result(timeout=5)
+
+    assert [r["task"] for r in records] == ["question"]
+    assert st.session_state.input_tokens_total == records[0]["in"] > 0
+    assert st.session_state.output_tokens_total == records[0]["out"] > 0
@@ -0,0 +1,51 @@
+import pytest  # noqa: F401
+from modules import ledger
+from modules.utils import render_template
+
+
+def test_find_repeated_variables_flags_evaluation_answer():
+    answer = "I led the migration of our billing system to a new provider."
+    rendered = render_template(
+        "evaluation/base_instructions.j2",
+        question="Tell me about a project you led.",
+        answer=answer,
+        previous_answers=[answer],
+        job_title="Engineer",
+        question_type="Behavioral",
+        difficulty="Easy",
+        max_tokens_eval=250,
+    )
+    repeated = ledger.find_repeated_variables(rendered, {"answer": answer, "previous_answers": [answer], "difficulty": "Easy"})
+    assert repeated["answer"] > 1
+    assert repeated["previous_answers"] == repeated["answer"]
+    assert "difficulty" not in repeated
+
+
+def test_record_call_attaches_renders_and_aggregates(tmp_path, monkeypatch):
+    path = tmp_path / "ledger.jsonl"
+    monkeypatch.setattr(ledger, "USAGE_LEDGER_PATH", str(path))
+    ledger.pop_renders()
+
+    ledger.note_render("system/a.j2", "x" * 300, {})
+    ledger.note_render("evaluation/b.j2", "y" * 100, {})
+    ledger.record_call("abc", "evaluation", "gpt-4o-mini", 400, 0, 50, 120.0, 0.01, {"persona": "Mentor"})
+
+    records = ledger.read_ledger(str(path))
+    assert records[0]["tpl"] == ["system/a.j2", "evaluation/b.j2"]
+    assert ledger.pop_renders() == []
+
+    summary = ledger.aggregate(records)
+    assert summary["templates"]["system/a.j2"]["in"] == pytest.approx(300)
+    assert summary["personas"]["Mentor"]["calls"] == 1
+    assert "By persona" in ledger.format_report(summary)
+
+
+def test_read_ledger_tail_reads_only_the_last_lines(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    path.write_text("".join(f'{{"n": {i}, "pad": "{"x" * (i % 7)}"}}\n' for i in range(1000)), encoding="utf-8")
+
+    assert [r["n"] for r in ledger.read_ledger(str(path), last=3)] == [997, 998, 999]
+    for block_size in (1, 10, 64, 1 << 16):
+        lines = ledger._tail_lines(str(path), 250, block_size=block_size)
+        assert [int(line.split(",")[0][6:]) for line in lines] == list(range(750, 1000))
+    assert len(ledger.read_ledger(str(path), last=5000)) == 1000
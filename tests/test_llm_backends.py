@@ -0,0 +1,84 @@
+import json
+from types import SimpleNamespace
+import pytest
+from modules.errors import LLMError
+from modules.llm_backends import FakeBackend, LLMBackend, OpenAIBackend, create_backend
+from modules.utils import openai_call
+
+SCHEMA = {
+    "format": {
+        "type": "json_schema",
+        "name": "evaluation_result",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "feedback": {"type": "string"},
+                "next_question": {"type": ["string", "null"]},
+            },
+            "required": ["feedback", "next_question"],
+            "additionalProperties": False,
+        },
+    }
+}
+
+
+def test_fake_backend_honors_schema_and_reports_usage():
+    response = FakeBackend(seed=1).create(
+        model="gpt-4o-mini", instructions="sys", input="Job Title: Nurse", max_output_tokens=800, text=SCHEMA
+    )
+    data = json.loads(response.text)
+    assert set(data) == {"feedback", "next_question"}
+    assert "Nurse" in data["next_question"]
+    assert response.input_tokens > 0 and response.output_tokens > 0
+    assert response.status == "completed"
+
+
+def test_fake_backend_truncates_at_max_output_tokens():
+    response = FakeBackend().create(model="m", instructions="", input="x", max_output_tokens=5, text=SCHEMA)
+    assert response.status == "incomplete"
+    assert response.incomplete_reason == "max_output_tokens"
+    assert len(response.text) <= 20
+
+
+def test_fake_backend_injects_errors():
+    with pytest.raises(LLMError):
+        FakeBackend(error_rate=1.0).create(model="m", instructions="", input="x")
+
+
+def test_openai_call_runs_full_path_through_fake_backend():
+    raw = openai_call("system", "Job Title: Chef", structured_output=SCHEMA, task="evaluation")
+    assert json.loads(raw)["feedback"]
+
+
+def test_create_backend_rejects_unknown_name():
+    with pytest.raises(ValueError):
+        create_backend("nope")
+
+
+def test_backend_without_create_cannot_be_instantiated():
+    class Incomplete(LLMBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_openai_backend_reads_text_from_output_items():
+    response = SimpleNamespace(
+        id="resp_1",
+        status="completed",
+        output_text="",
+        output=[
+            SimpleNamespace(type="reasoning", content=None),
+            SimpleNamespace(type="message", content=[SimpleNamespace(type="output_text", text='{"feedback": "Good."}')]),
+        ],
+        usage=SimpleNamespace(input_tokens=12, output_tokens=5, input_tokens_details=None),
+        incomplete_details=None,
+    )
+    backend = OpenAIBackend()
+    backend._client = SimpleNamespace(responses=SimpleNamespace(create=lambda **kwargs: response))
+
+    result = backend.create(model="gpt-4o-mini", input="Evaluate.")
+    assert result.text == '{"feedback": "Good."}'
+    assert (result.input_tokens, result.output_tokens, result.cached_tokens) == (12, 5, 0)
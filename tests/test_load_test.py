@@ -0,0 +1,17 @@
+from benchmarks import load_test
+
+
+def test_simulated_users_complete_an_interview(tmp_path, monkeypatch, capsys):
+    # The levels run in subprocesses; keep their logs out of the working tree
+    for name in ("USAGE_LEDGER_PATH", "RUBRIC_HISTORY_PATH", "TRACE_PATH"):
+        monkeypatch.setenv(name, str(tmp_path / name.lower()))
+    for name in ("PROMPT_ARCHIVE_DIR", "TRANSCRIPT_SPILL_DIR", "CASSETTE_DIR", "PROFILE_DIR"):
+        monkeypatch.setenv(name, str(tmp_path / name.lower()))
+
+    exit_code = load_test.main(
+        ["--users", "2", "--turns", "2", "--latency-ms", "20", "--jitter-ms", "0", "--ms-per-token", "0", "--timeout", "60"]
+    )
+
+    captured = capsys.readouterr()
+    assert exit_code == 0, captured.err
+    assert captured.out.splitlines()[1].split()[0] == "2"
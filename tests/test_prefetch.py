@@ -0,0 +1,48 @@
+import pytest  # noqa: F401
+import streamlit as st
+from modules import interview_logic
+from modules.executor import submit
+from modules.interview_logic import (
+    generate_question,
+    prefetch_first_question,
+    take_prefetched_question,
+)
+
+
+def _set_interview(job_title: str, question_type: str = "Behavioral", difficulty: str = "Easy") -> None:
+    st.session_state.job_title = job_title
+    st.session_state.question_type = question_type
+    st.session_state.difficulty = difficulty
+
+
+def test_submit_runs_with_session_state():
+    st.session_state.executor_marker = "visible"
+    assert submit(lambda: st.session_state.executor_marker).result(timeout=5) == "visible"
+
+
+def test_generate_question_with_explicit_settings():
+    question = generate_question("Nurse", "Behavioral", "Easy")
+    assert isinstance(question, str) and question
+
+
+def test_prefetched_question_is_used_for_matching_settings(monkeypatch):
+    monkeypatch.setattr(interview_logic, "SPECULATIVE_FIRST_QUESTION", True)
+    st.session_state.pop("prefetched_question", None)
+
+    prefetch_first_question(" Nurse ", "Behavioral", "Easy")
+    _set_interview("nurse")
+
+    question = take_prefetched_question()
+    assert isinstance(question, str) and question
+    assert "prefetched_question" not in st.session_state
+
+
+def test_prefetched_question_is_dropped_for_other_settings(monkeypatch):
+    monkeypatch.setattr(interview_logic, "SPECULATIVE_FIRST_QUESTION", True)
+    st.session_state.pop("prefetched_question", None)
+
+    prefetch_first_question("Nurse", "Behavioral", "Easy")
+    _set_interview("Registered Nurse")
+
+    assert take_prefetched_question() is None
+    assert take_prefetched_question() is None
@@ -0,0 +1,49 @@
+import time
+import pytest
+from modules import profiling
+from modules.profiling import hot_functions, load_summaries, merge_collapsed, phase, profile_rerun
+
+
+def _busy(ms: float) -> None:
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+def test_phase_is_noop_without_profile():
+    with phase("anything"):
+        pass
+    with profile_rerun("sid", enabled=False) as profile:
+        assert profile is None
+
+
+@pytest.mark.parametrize("mode", ["sample", "cprofile"])
+def test_profile_rerun_writes_and_reports(tmp_path, monkeypatch, mode):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "PROFILING_MODE", mode)
+    monkeypatch.setattr(profiling, "PROFILING_SAMPLE_INTERVAL_MS", 1)
+
+    with profile_rerun("abc123", enabled=True):
+        with phase("render_interview_ui"):
+            _busy(40)
+
+    summaries = load_summaries(str(tmp_path), session_id="abc123")
+    assert len(summaries) == 1
+    assert summaries[0]["phases"]["render_interview_ui"] >= 30
+    assert "render_interview_ui" in profiling.format_report(summaries)
+
+    if mode == "sample":
+        stacks = merge_collapsed(summaries)
+        assert any(stack.startswith("phase:render_interview_ui;") for stack in stacks)
+        assert any(row["function"].endswith(":_busy") for row in hot_functions(stacks))
+    else:
+        assert (tmp_path / (summaries[0]["stem"].split("/")[-1] + ".prof")).exists()
+
+
+def test_profiling_requested(monkeypatch):
+    monkeypatch.setattr(profiling, "ENABLE_PROFILING", False)
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "secret")
+    assert profiling.profiling_requested({"profile": "secret"})
+    assert not profiling.profiling_requested({"profile": "guess"})
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "")
+    assert not profiling.profiling_requested({"profile": ""})
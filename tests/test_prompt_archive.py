@@ -0,0 +1,62 @@
+import gzip
+import logging
+import os
+import time
+
+import pytest
+
+from modules import prompt_archive
+from modules.utils import render_template
+
+
+def _archived(directory):
+    return sorted(os.path.basename(path) for path, _, _ in prompt_archive._entries(str(directory)))
+
+
+def test_each_distinct_prompt_is_stored_once(tmp_path):
+    first = prompt_archive.archive_prompt("Prompt A", str(tmp_path))
+    again = prompt_archive.archive_prompt("Prompt A", str(tmp_path))
+    other = prompt_archive.archive_prompt("Prompt B", str(tmp_path))
+
+    assert first == again != other
+    assert _archived(tmp_path) == sorted([f"{first}.txt.gz", f"{other}.txt.gz"])
+    with gzip.open(prompt_archive._path(first, str(tmp_path)), "rt", encoding="utf-8") as f:
+        assert f.read() == "Prompt A"
+
+
+def test_load_prompt_by_unique_prefix(tmp_path):
+    digest = prompt_archive.archive_prompt("Tell me about a project you led.", str(tmp_path))
+
+    assert prompt_archive.load_prompt_text(digest[:6], str(tmp_path)) == "Tell me about a project you led."
+    with pytest.raises(KeyError):
+        prompt_archive.load_prompt_text("zz", str(tmp_path))
+
+
+def test_prune_removes_old_then_least_recently_used(tmp_path):
+    old = prompt_archive.archive_prompt("old prompt", str(tmp_path))
+    stale = time.time() - 30 * 86400
+    os.utime(prompt_archive._path(old, str(tmp_path)), (stale, stale))
+    assert prompt_archive.prune(str(tmp_path), retention_days=14, max_mb=0) == 1
+    assert _archived(tmp_path) == []
+
+    digests = [prompt_archive.archive_prompt(os.urandom(2000).hex(), str(tmp_path)) for _ in range(3)]
+    for age, digest in zip((300, 200, 100), digests):
+        os.utime(prompt_archive._path(digest, str(tmp_path)), (time.time() - age,) * 2)
+    size = max(size for _, _, size in prompt_archive._entries(str(tmp_path)))
+
+    # Budget for two prompts: the least recently used one goes
+    assert prompt_archive.prune(str(tmp_path), retention_days=0, max_mb=2.5 * size / 1024 / 1024) == 1
+    assert _archived(tmp_path) == sorted(f"{digest}.txt.gz" for digest in digests[1:])
+
+
+def test_render_template_logs_only_the_hash(caplog):
+    with caplog.at_level(logging.DEBUG, logger="modules.utils"):
+        rendered = render_template(
+            "validation/validate_job_title.j2",
+            job_title="Data Analyst",
+        )
+
+    digest = prompt_archive.prompt_hash(rendered)
+    assert prompt_archive.load_prompt_text(digest) == rendered
+    assert digest in caplog.text
+    assert rendered not in caplog.text
@@ -0,0 +1,16 @@
+import pytest  # noqa: F401
+from benchmarks.prompt_pipeline import compare, load_baseline, measure_sizes
+
+
+def test_prompt_sizes_within_baseline():
+    """Rendered prompts must not grow past the stored baseline (see benchmarks/prompt_pipeline.py)."""
+    regressions = compare({"sizes": measure_sizes()}, load_baseline())
+    assert not regressions, "\n".join(regressions)
+
+
+def test_compare_flags_token_growth():
+    baseline = {"sizes": {"case": {"chars": 400, "tokens": 100}}, "timings_us": {"case": 100.0}}
+    current = {"sizes": {"case": {"chars": 520, "tokens": 130}}, "timings_us": {"case": 110.0}}
+    regressions = compare(current, baseline)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("SIZE")
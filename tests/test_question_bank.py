@@ -0,0 +1,68 @@
+import pytest
+import streamlit as st
+
+from modules import interview_logic, question_bank
+from modules.interview_logic import QUESTION_FAILED, generate_next_question, initialize_interview_session
+from modules.question_bank import QuestionBank, build_bank, pool_key, write_bank
+from modules.session_state import get_transcript
+
+POOL = [
+    "Tell me about a time you resolved a conflict between two teammates.",
+    "Describe a project where you had to learn a new tool quickly.",
+    "How do you prioritize when everything is urgent?",
+]
+
+
+@pytest.fixture
+def bank_path(tmp_path, monkeypatch):
+    path = tmp_path / "bank.bin"
+    write_bank({pool_key("Software Engineer", "Behavioral", "Easy"): POOL}, str(path), {"model": "test"})
+    monkeypatch.setattr(question_bank, "QUESTION_BANK_PATH", str(path))
+    return path
+
+
+def test_bank_roundtrip_and_canonical_titles(bank_path):
+    bank = QuestionBank(str(bank_path))
+
+    assert bank.meta == {"model": "test"}
+    assert bank.questions("Software Engineer", "Behavioral", "Easy") == POOL
+    # Seniority prefixes and misspellings share the canonical title's pool
+    assert bank.has_pool("Sr. Sofware Engineer", "Behavioral", "Easy")
+    assert not bank.has_pool("Software Engineer", "Technical", "Easy")
+    assert bank.draw("Software Engineer", "Behavioral", "Easy", exclude=POOL[:2]) == POOL[2]
+    assert bank.draw("Software Engineer", "Behavioral", "Easy", exclude=POOL) is None
+
+
+def test_first_question_comes_from_bank_without_repeats(bank_path):
+    st.session_state.pop("bank_served", None)
+    seen = []
+    for _ in range(len(POOL)):
+        initialize_interview_session("Software Engineer", "Behavioral", "Easy")
+        seen.append(generate_next_question())
+    assert sorted(seen) == sorted(POOL)
+
+    # Pool used up: generated live
+    initialize_interview_session("Software Engineer", "Behavioral", "Easy")
+    assert generate_next_question() not in POOL
+
+
+def test_bank_is_fallback_when_generation_fails(bank_path, monkeypatch):
+    st.session_state.pop("bank_served", None)
+    monkeypatch.setattr(interview_logic, "generate_question", lambda *args, **kwargs: QUESTION_FAILED)
+    initialize_interview_session("Software Engineer", "Behavioral", "Easy")
+    get_transcript().add_question("Live question?")
+    get_transcript().answer_current("Answer", "Feedback")
+
+    assert generate_next_question() in POOL
+
+
+def test_build_bank_deduplicates(tmp_path):
+    pools = build_bank(["Nurse"], ["Behavioral"], ["Easy", "Hard"], per_pool=4, workers=2)
+
+    assert sorted(pools) == [pool_key("Nurse", "Behavioral", "Easy"), pool_key("Nurse", "Behavioral", "Hard")]
+    for questions in pools.values():
+        assert 0 < len(questions) <= 4
+        assert not any(question_bank.is_duplicate(q, questions[:i]) for i, q in enumerate(questions))
+
+    write_bank(pools, str(tmp_path / "bank.bin"))
+    assert len(QuestionBank(str(tmp_path / "bank.bin"))) == sum(len(q) for q in pools.values())
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+import streamlit as st
+
+from modules import ledger
+from modules.response_cache import ResponseCache
+from modules.utils import openai_call
+
+
+def test_concurrent_identical_requests_share_one_call():
+    cache = ResponseCache(max_entries=10, ttl_seconds=0)
+    calls = []
+
+    def create():
+        calls.append(1)
+        time.sleep(0.1)
+        return "response"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_create("k", create))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert cache.get_or_create("k", create) == ("response", True)
+
+
+def test_eviction_failures_and_unstorable_values():
+    cache = ResponseCache(max_entries=2, ttl_seconds=0.05)
+    for key in ("a", "b", "c"):
+        cache.get_or_create(key, lambda: key.upper())
+    assert cache.get_or_create("a", lambda: "fresh") == ("fresh", False)  # evicted as least recently used
+
+    time.sleep(0.06)
+    assert cache.get_or_create("a", lambda: "newer") == ("newer", False)  # expired
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_create("x", fail)
+    assert cache.get_or_create("x", lambda: "ok") == ("ok", False)
+
+    cache.get_or_create("y", lambda: "partial", should_store=lambda value: False)
+    assert cache.get_or_create("y", lambda: "full") == ("full", False)
+
+
+def test_openai_call_reuses_response_below_temperature_cutoff():
+    st.session_state.temperature = 0.2
+    with ledger.collect_usage() as records:
+        first = openai_call("You are terse.", "MODE: generate_question\nJob title: Nurse", task="question")
+        second = openai_call("You are terse.", "MODE: generate_question\nJob title: Nurse", task="question")
+    assert first == second
+    assert [r["task"] for r in records] == ["question", "cache_hit"]
+    assert records[1]["cost"] == 0 and records[1]["cached_task"] == "question"
+
+    st.session_state.temperature = 0.9
+    try:
+        with ledger.collect_usage() as records:
+            openai_call("You are terse.", "MODE: generate_question\nJob title: Nurse", task="question")
+    finally:
+        st.session_state.temperature = 0.2
+    assert [r["task"] for r in records] == ["question"]
+
+
+def test_generated_questions_are_not_shared_between_interviews():
+    from modules.interview_logic import generate_question
+
+    st.session_state.temperature = 0.2
+    with ledger.collect_usage() as records:
+        generate_question("Nurse", "Behavioral", "Easy", task="question")
+        generate_question("Nurse", "Behavioral", "Easy", task="question")
+    assert [r["task"] for r in records] == ["question", "question"]
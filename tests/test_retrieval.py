@@ -0,0 +1,75 @@
+import pytest
+import streamlit as st
+from modules import interview_logic
+from modules.retrieval import DocumentIndex, chunk_text, tokenize
+from modules.session_state import get_transcript
+
+RESUME = """Jordan Example - Site Reliability Engineer
+
+Experience
+- Migrated 40 services from virtual machines to Kubernetes, cutting deploy time from hours to minutes.
+- Led the on-call rotation for the payments platform; reduced pages by 60% with better alert thresholds.
+- Built Terraform modules for multi-region PostgreSQL failover.
+"""
+
+# Tens of pages of unrelated filler around one relevant requirement
+FILLER = "\n".join(f"Section {i}: the company offers flexible hours, a learning budget and team offsites." for i in range(2000))
+JOB_DESCRIPTION = FILLER + "\nRequirement: hands-on experience with incident response and postmortems.\n" + FILLER
+
+
+def test_chunks_are_bounded_and_long_lines_overlap():
+    words = " ".join(f"w{i}" for i in range(250))
+    chunks = chunk_text("short line\n\n" + words, chunk_words=100, overlap_words=20)
+    assert chunks[0] == "short line"
+    assert all(len(chunk.split()) <= 100 for chunk in chunks)
+    assert chunks[1].split()[-20:] == chunks[2].split()[:20]
+    assert tokenize("Projects in C++ and Node.js") == ["project", "c++", "node.js"]
+
+
+def test_search_ranks_relevant_chunks_and_snippets_stay_in_budget():
+    index = DocumentIndex(chunk_words=80, overlap_words=20)
+    index.add("resume", RESUME)
+    index.add("job_description", JOB_DESCRIPTION)
+
+    (score, best), *_ = index.search("Tell me about an incident postmortem you ran")
+    assert best.source == "job_description" and "postmortems" in best.text
+    assert index.search("kubernetes migration")[0][1].source == "resume"
+
+    snippets = index.snippets("flexible hours learning budget", k=10, max_chars=600)
+    assert 0 < len(snippets) and sum(len(s) for s in snippets) <= 600
+    assert all(s.startswith("[job_description] ") for s in snippets)
+
+
+def test_updates_are_incremental():
+    index = DocumentIndex()
+    assert index.update("resume", RESUME)
+    chunks = len(index)
+    assert not index.update("resume", RESUME + "\n")
+    assert index.update("job_description", "Requirement: Kubernetes")
+    assert len(index) == chunks + 1
+
+    assert index.update("resume", "")
+    assert index.sources == ["job_description"]
+    assert [chunk.source for _, chunk in index.search("Kubernetes terraform")] == ["job_description"]
+
+
+def test_uploaded_documents_ground_the_question_prompt(monkeypatch):
+    prompts = []
+    real_call = interview_logic.openai_call
+
+    def spy(sys_instructions, prompt_text, **kwargs):
+        prompts.append(prompt_text)
+        return real_call(sys_instructions, prompt_text, **kwargs)
+
+    monkeypatch.setattr(interview_logic, "openai_call", spy)
+    monkeypatch.setattr(interview_logic, "get_bank", lambda: pytest.fail("bank used despite uploaded documents"))
+    index = DocumentIndex()
+    index.add("resume", RESUME)
+    monkeypatch.setitem(st.session_state, "documents", index)
+    get_transcript().clear()
+    st.session_state.job_title = "Site Reliability Engineer"
+    st.session_state.question_type = "Behavioral"
+    st.session_state.difficulty = "Medium"
+
+    assert interview_logic.generate_next_question()
+    assert "CANDIDATE DOCUMENTS" in prompts[-1] and "[resume] " in prompts[-1]
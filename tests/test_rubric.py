@@ -0,0 +1,101 @@
+import time
+import numpy as np
+import streamlit as st
+from modules import rubric
+from modules.interview_logic import evaluate_answer_and_generate_next
+from modules.rubric import ScoreHistory, get_history, progress, rolling_mean, synthetic_records, trends
+from modules.session_state import get_transcript
+
+ANSWER = (
+    "In my last role I owned the migration of our billing service. I split the work into three "
+    "phases, agreed checkpoints with finance and support, and we shipped a week early."
+)
+
+
+def test_vectorized_statistics_match_the_definitions():
+    scores = np.array([[1, 5], [2, 4], [3, 3], [5, 1]], dtype=float)
+    assert rolling_mean(scores, 2).tolist() == [[1, 5], [1.5, 4.5], [2.5, 3.5], [4, 2]]
+    assert np.allclose(trends(scores), [np.polyfit(range(4), scores[:, i], 1)[0] for i in range(2)])
+
+    history = ScoreHistory()
+    for user, score in [("a", [1, 1, 1, 1]), ("b", [3, 3, 3, 3]), ("c", [5, 5, 5, 5]), ("b", [5, 5, 5, 1])]:
+        history.append(user, score, "Behavioral")
+    report = progress(history, "b", window=2)
+    assert report["turns"] == 2 and report["cohort_users"] == 3
+    assert report["latest"].tolist() == [4, 4, 4, 2]
+    assert report["percentile"].tolist() == [50, 50, 50, 50]
+    assert progress(history, "b", question_type="Technical") is None
+
+
+def test_history_is_persisted_and_shared_between_processes(tmp_path):
+    path = str(tmp_path / "scores.bin")
+    writer = ScoreHistory(path)
+    reader = ScoreHistory(path)
+    writer.append("alice", [4, 5, 3, 2], "Technical", "Mentor")
+
+    assert reader.refresh() == 1
+    reloaded = ScoreHistory(path)
+    assert len(reloaded) == 1
+    assert reloaded.column("scores").tolist() == [[4, 5, 3, 2]]
+    assert reloaded.column("user")[0] == rubric.user_key("alice")
+    assert reloaded.column("persona")[0] == rubric.PERSONAS.index("Mentor")
+
+
+def test_progress_over_tens_of_thousands_of_turns():
+    history = ScoreHistory()
+    history.extend(synthetic_records(50_000, users=500))
+    progress(history, "user-0")
+
+    started = time.perf_counter()
+    report = progress(history, "user-0", question_type="Behavioral")
+    assert (time.perf_counter() - started) < 0.25
+    assert report["rolling"].shape == (report["turns"], len(rubric.RUBRIC_DIMENSIONS))
+    assert report["cohort_users"] == 500
+
+
+def test_evaluations_record_rubric_scores(monkeypatch):
+    from modules import interview_logic
+
+    monkeypatch.setattr(interview_logic, "ENABLE_RUBRIC_SCORES", True)
+    transcript = get_transcript()
+    transcript.clear()
+    transcript.add_question("Tell me about a project you led.")
+    st.session_state.evaluation_style = "Hiring Manager"
+    st.session_state.job_title = "Software Engineer"
+    st.session_state.question_type = "Behavioral"
+    st.session_state.difficulty = "Medium"
+    monkeypatch.setitem(st.session_state, "user_id", "rubric-test")
+
+    feedback, _ = evaluate_answer_and_generate_next(ANSWER)
+
+    history = get_history()
+    assert feedback and len(history) == 1
+    scores = history.column("scores")[0]
+    assert all(rubric.SCORE_MIN <= s <= rubric.SCORE_MAX for s in scores)
+    assert progress(history, "rubric-test")["turns"] == 1
+
+
+def test_prompt_names_the_dimensions_the_schema_requires(monkeypatch):
+    from modules import interview_logic
+
+    monkeypatch.setattr(interview_logic, "ENABLE_RUBRIC_SCORES", True)
+    monkeypatch.setattr(rubric, "RUBRIC_DIMENSIONS", ("structure", "clarity"))
+    transcript = get_transcript()
+    transcript.clear()
+    transcript.add_question("Tell me about a project you led.")
+    st.session_state.evaluation_style = "Mentor"
+
+    prompt = interview_logic._build_evaluation_prompt(ANSWER, {"max_tokens_eval": 250})
+    assert "- structure: clear, logical flow" in prompt and "- clarity\n" in prompt
+    assert "- impact" not in prompt
+    assert rubric.rubric_schema()["required"] == ["structure", "clarity"]
+
+
+def test_progress_link_token_is_issued_by_the_server(monkeypatch):
+    from modules import session_state
+
+    params = {"progress": "alice"}
+    monkeypatch.setattr(st, "query_params", params)
+    token = session_state._progress_token()
+    assert token != "alice" and params["progress"] == token and len(token) >= 22
+    assert session_state._progress_token() == token
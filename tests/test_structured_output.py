@@ -0,0 +1,115 @@
+import json
+import pytest
+from modules import ledger
+from modules.interview_logic import parse_evaluation_response
+from modules.structured_output import compile_schema, repair_json
+from modules.utils import openai_call
+
+SCHEMA = {
+    "format": {
+        "type": "json_schema",
+        "name": "evaluation_result",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "feedback": {"type": "string"},
+                "next_question": {"type": ["string", "null"]},
+                "notes": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": ["feedback", "next_question"],
+            "additionalProperties": False,
+        },
+    }
+}
+
+FEEDBACK = "Clear structure and a measurable result. " * 20
+
+
+@pytest.mark.parametrize("text, repaired, lenient", [
+    ('{"feedback": "Good", "next_question": "Tell me', '{"feedback": "Good"}',
+     '{"feedback": "Good", "next_question": "Tell me"}'),
+    ('{"scores": {"clarity": 3, "depth": 4', '{"scores": {"clarity": 3}}', '{"scores": {"clarity": 3}}'),
+    ('{"notes": ["a", "b"], "next_question":', '{"notes": ["a", "b"]}', '{"notes": ["a", "b"]}'),
+    ('{"feedback": "Say \\"hi\\', '{}', '{"feedback": "Say \\"hi"}'),
+    ('Sure: {"feedback": "ok"} done', '{"feedback": "ok"}', '{"feedback": "ok"}'),
+    ("no JSON here", None, None),
+])
+def test_repair_keeps_completed_fields(text, repaired, lenient):
+    assert repair_json(text) == repaired
+    assert repair_json(text, close_strings=True) == lenient
+
+
+def test_compiled_schema_reports_problems():
+    validate = compile_schema(SCHEMA["format"]["schema"])
+    assert validate({"feedback": "ok", "next_question": None}) == []
+    assert validate({"feedback": 1, "notes": ["a", 2], "extra": True}) == [
+        "$.next_question: missing",
+        "$.feedback: expected string, got int",
+        "$.notes[1]: expected string, got int",
+        "$.extra: not allowed",
+    ]
+
+
+def _long_evaluation(monkeypatch, backend):
+    full = json.dumps({"feedback": FEEDBACK, "next_question": "What would you do differently?"})
+    real_text = backend._fake_text
+    monkeypatch.setattr(
+        backend, "_fake_text",
+        lambda kwargs: real_text(kwargs) if "MODE: continue_output" in kwargs["input"] else full,
+    )
+    requests = []
+    real_create = backend.create
+    monkeypatch.setattr(backend, "create", lambda **kw: requests.append(kw) or real_create(**kw))
+    return requests
+
+
+@pytest.mark.parametrize("chained", [True, False])
+def test_truncated_evaluation_is_completed_by_a_continuation(monkeypatch, offline_llm, chained):
+    offline_llm.supports_conversation_state = chained
+    requests = _long_evaluation(monkeypatch, offline_llm)
+
+    with ledger.collect_usage() as records:
+        raw = openai_call("You are a test.", "Evaluate this answer.", max_tokens=150,
+                          structured_output=SCHEMA, task="evaluation")
+
+    assert parse_evaluation_response(raw) == (FEEDBACK, "What would you do differently?")
+    assert [r["task"] for r in records] == ["evaluation", "continuation"]
+    assert records[0]["trunc"] and records[1]["continued_task"] == "evaluation"
+    continuation = requests[1]
+    assert continuation["max_output_tokens"] == 256 and "text" not in continuation
+    assert bool(continuation.get("previous_response_id")) == chained
+    # Without conversation state the original prompt is sent again; with it, only the tail of the cut response
+    assert ("Evaluate this answer." in continuation["input"]) != chained
+
+
+def test_truncation_after_required_fields_is_repaired_without_a_request(monkeypatch, offline_llm):
+    text = json.dumps({"feedback": "Good.", "next_question": None, "notes": ["a" * 40] * 20})
+    monkeypatch.setattr(offline_llm, "_fake_text", lambda kwargs: text)
+
+    with ledger.collect_usage() as records:
+        raw = openai_call("You are a test.", "Evaluate.", max_tokens=60, structured_output=SCHEMA, task="evaluation")
+
+    assert [r["task"] for r in records] == ["evaluation"]
+    data = json.loads(raw)
+    assert data["feedback"] == "Good." and 0 < len(data["notes"]) < 20
+
+
+def test_truncated_summary_keeps_completed_recommendations():
+    from modules.interview_logic import parse_summary
+
+    text = '{"summary": "Solid answers.", "recommendations": ["Use STAR.", "Quantify impact.", "Keep answers sh'
+    assert parse_summary(text) == ("Solid answers.", ["Use STAR.", "Quantify impact.", "Keep answers sh"])
+
+
+@pytest.mark.parametrize("response, question", [
+    ('{"question": "Tell me about a conflict you resolved."', "Tell me about a conflict you resolved."),
+    ('{"question": "Tell me about a conf', None),
+    ('Here is a question: {"quest', None),
+])
+def test_malformed_question_json_is_repaired_or_rejected(monkeypatch, response, question):
+    from modules import interview_logic
+
+    monkeypatch.setattr(interview_logic, "openai_call", lambda *args, **kwargs: response)
+    generated = interview_logic.generate_question("Nurse", "Behavioral", "Easy")
+    assert generated == (question or interview_logic.QUESTION_FAILED)
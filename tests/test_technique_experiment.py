@@ -0,0 +1,43 @@
+from benchmarks import technique_experiment
+from modules import ledger
+
+
+def test_diversity_metrics_flag_repeats_and_overlap():
+    varied = technique_experiment.diversity_metrics([
+        "Tell me about a time you resolved a conflict on your team.",
+        "How would you design a rate limiter for a public API?",
+    ])
+    repetitive = technique_experiment.diversity_metrics([
+        "Tell me about a time you resolved a conflict on your team.",
+        "Tell me about a time you resolved a conflict on your team!",
+    ])
+    assert varied["repeats"] == 0 and repetitive["repeats"] == 1
+    assert varied["mean_similarity"] < repetitive["mean_similarity"] == 1.0
+    assert varied["distinct_2"] > repetitive["distinct_2"]
+
+
+def test_collect_usage_sees_only_its_own_calls():
+    with ledger.collect_usage() as outer:
+        ledger.record_call("s", "question", "gpt-4o-mini", 100, 0, 10, 5.0, 0.001)
+        with ledger.collect_usage() as inner:
+            ledger.record_call("s", "question", "gpt-4o-mini", 200, 0, 20, 5.0, 0.002)
+    ledger.record_call("s", "question", "gpt-4o-mini", 300, 0, 30, 5.0, 0.003)
+
+    assert [r["in"] for r in outer] == [100]
+    assert [r["in"] for r in inner] == [200]
+
+
+def test_run_experiment_measures_every_cell():
+    cells = technique_experiment.run_experiment(
+        ["zero_shot.j2", "few_shot.j2"], ["Data Analyst"], ["Behavioral", "Technical"], ["Easy"], questions=2, workers=4
+    )
+
+    assert [(c["technique"], c["question_type"]) for c in cells] == [
+        ("zero_shot.j2", "Behavioral"), ("zero_shot.j2", "Technical"),
+        ("few_shot.j2", "Behavioral"), ("few_shot.j2", "Technical"),
+    ]
+    assert all(c["calls"] == 2 and len(c["questions"]) == 2 and c["in_tokens"] > 0 for c in cells)
+
+    rows = {row["technique"]: row for row in technique_experiment.summarize(cells)}
+    # Few-shot examples make its prompt longer than zero-shot
+    assert rows["few_shot.j2"]["in_per_call"] > rows["zero_shot.j2"]["in_per_call"]
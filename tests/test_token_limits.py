@@ -0,0 +1,51 @@
+from modules import ledger, token_limits
+from modules.token_limits import TokenLimiter, limit_key
+from modules.utils import openai_call
+
+KEY = limit_key("question", "gpt-4o-mini", ["questions/zero_shot.j2", "questions/base_instructions.j2"])
+
+
+def test_cap_follows_a_high_percentile_of_observed_lengths():
+    limiter = TokenLimiter(percentile=99, headroom=0.25, min_samples=20, floor=64)
+    for tokens in range(1, 19):
+        limiter.observe(KEY, tokens)
+    assert limiter.limit(KEY, 800) == 800
+
+    for tokens in range(19, 101):
+        limiter.observe(KEY, tokens)
+    # p99 = 99 tokens, +25% = 124, rounded up to 128
+    assert limiter.limit(KEY, 800) == 128
+    assert limiter.limit(KEY, 100) == 100
+    assert limiter.limit(limit_key("question", "gpt-4o", []), 800) == 800
+
+    limiter.observe(KEY, 0, cap=128, truncated=True)
+    assert limiter.limit(KEY, 800) == 256
+
+
+def test_calls_learn_their_cap_and_truncation_is_repaired(monkeypatch, offline_llm):
+    requests = []
+    real_create = offline_llm.create
+
+    def create(**kwargs):
+        requests.append(kwargs["max_output_tokens"])
+        return real_create(**kwargs)
+
+    monkeypatch.setattr(offline_llm, "create", create)
+    for i in range(20):
+        openai_call("You are a test.", f"Prompt {i}", max_tokens=800, task="test")
+    assert requests == [800] * 20
+
+    openai_call("You are a test.", "Prompt 20", max_tokens=800, task="test")
+    assert requests[-1] == 64
+
+    # A response longer than the learned cap is asked again with the configured cap
+    monkeypatch.setattr(offline_llm, "_fake_text", lambda kwargs: "word " * 400)
+    text = openai_call("You are a test.", "Prompt 21", max_tokens=800, task="test")
+    assert requests[-2:] == [64, 800] and len(text.split()) == 400
+    assert token_limits.get_limiter().limit(limit_key("test", "gpt-4o-mini", []), 800) == 128
+
+    # A new process learns the same caps from the ledger
+    records = ledger.read_ledger(ledger.USAGE_LEDGER_PATH)
+    assert [r.get("trunc") for r in records[-2:]] == [True, None] and records[-1]["cap_retry"]
+    monkeypatch.setattr(token_limits, "_limiter", None)
+    assert token_limits.get_limiter().limit(limit_key("test", "gpt-4o-mini", []), 800) == 128
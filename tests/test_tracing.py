@@ -0,0 +1,105 @@
+import logging
+import pytest
+from tenacity import wait_none
+from modules import tracing, utils
+from modules.executor import submit
+from modules.llm_backends import FakeBackend, set_backend
+from modules.tracing import critical_path, from_otlp, load_spans, span, to_otlp, trace
+
+
+@pytest.fixture
+def traces(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(tracing, "ENABLE_TRACING", True)
+    monkeypatch.setattr(tracing, "TRACE_PATH", str(path))
+    return path
+
+
+def test_trace_ids_reach_log_records_even_when_tracing_is_off(tmp_path, caplog):
+    caplog.handler.addFilter(tracing.TraceContextFilter())
+    with trace("submit_answer", session_id="abc123") as root:
+        with span("build_prompt") as child:
+            child.set(chars=10)
+            logging.getLogger("modules.interview_logic").warning("inside")
+    logging.getLogger("modules.interview_logic").warning("outside")
+
+    inside, outside = caplog.records[-2:]
+    assert (inside.session_id, inside.trace_id) == ("abc123", root.trace_id)
+    assert (outside.session_id, outside.trace_id) == ("-", "-")
+    assert not (tmp_path / "traces.jsonl").exists()
+
+
+def _background_call():
+    with span("llm_call", task="next_question"):
+        pass
+
+
+def test_spans_are_exported_with_their_trace(traces):
+    with trace("submit_answer", session_id="abc123", turn=0):
+        with span("build_prompt"):
+            with span("render_template", template="questions/zero_shot.j2"):
+                pass
+        # Background work keeps its parent span
+        submit(_background_call).result()
+        with span("parse_evaluation"):
+            pass
+
+    spans = load_spans(str(traces), session_id="abc123")
+    by_name = {s["name"]: s for s in spans}
+    assert set(by_name) == {"submit_answer", "build_prompt", "render_template", "llm_call", "parse_evaluation"}
+    assert len({s["trace"] for s in spans}) == 1
+    assert by_name["submit_answer"]["parent"] is None
+    assert by_name["render_template"]["parent"] == by_name["build_prompt"]["span"]
+    assert by_name["llm_call"]["parent"] == by_name["submit_answer"]["span"]
+    assert by_name["submit_answer"]["attrs"]["turn"] == 0
+
+
+def test_llm_retries_are_spans_and_events(traces, monkeypatch, offline_llm):
+    class FlakyBackend(FakeBackend):
+        failures = 2
+
+        def create(self, **request_kwargs):
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("connection reset")
+            return super().create(**request_kwargs)
+
+    set_backend(FlakyBackend(seed=0))
+    monkeypatch.setattr(utils, "_call_openai", utils._call_openai.retry_with(wait=wait_none()))
+
+    with trace("finish_interview", session_id="retry-test"):
+        assert utils.openai_call("sys", "Summarize.", task="summary") != utils.CALL_FAILED
+
+    spans = load_spans(str(traces), session_id="retry-test")
+    attempts = sorted((s for s in spans if s["name"] == "llm_attempt"), key=lambda s: s["attrs"]["attempt"])
+    call = next(s for s in spans if s["name"] == "llm_call")
+    assert [a["attrs"]["attempt"] for a in attempts] == [1, 2, 3]
+    assert [a["status"] for a in attempts] == ["error", "error", "ok"]
+    assert all(a["parent"] == call["span"] for a in attempts)
+    assert [e["attempt"] for e in call["events"]] == [1, 2]
+    assert "Retries:" in tracing.format_report(spans)
+
+
+def test_otlp_round_trip_and_critical_path(traces):
+    with trace("start_interview", session_id="otlp"):
+        with span("validation"):
+            pass
+        with span("llm_call", task="question"):
+            with span("llm_attempt", task="question", attempt=1):
+                pass
+    spans = load_spans(str(traces))
+
+    root = tracing.Span("submit_answer", "0" * 32, session_id="otlp")
+    child = tracing.Span("llm_attempt", root.trace_id, parent=root, attributes={"attempt": 2})
+    child.add_event("retry", attempt=1, wait_s=2.0)
+    for s in (child, root):
+        s.finish()
+    records = from_otlp(to_otlp([root, child]))
+    assert [(r["name"], r["parent"], r["sid"]) for r in records] == [
+        ("submit_answer", None, "otlp"),
+        ("llm_attempt", root.span_id, None),
+    ]
+    assert records[1]["attrs"] == {"attempt": 2} and records[1]["events"][0]["wait_s"] == 2.0
+
+    path = [s["name"] for s in critical_path(spans)]
+    assert path == ["start_interview", "validation", "llm_call", "llm_attempt"]
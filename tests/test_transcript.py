@@ -0,0 +1,80 @@
+import os
+import pytest
+import streamlit as st
+from modules import transcript as transcript_module
+from modules.session_state import clear_turn_widgets
+from modules.transcript import Transcript, sweep_idle_transcripts
+
+
+@pytest.fixture
+def spill_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcript_module, "TRANSCRIPT_SPILL_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _answered(transcript: Transcript, turns: int) -> None:
+    for i in range(turns):
+        transcript.add_question(f"Q{i}")
+        transcript.answer_current(f"A{i}", f"F{i}")
+
+
+def test_window_spills_old_turns(spill_dir):
+    transcript = Transcript("window-test", window=2)
+    _answered(transcript, 5)
+    transcript.add_question("Q5")
+
+    assert len(transcript) == 6
+    assert transcript.answered_count == 5
+    assert transcript.current_turn.question == "Q5"
+    assert len(transcript._turns) <= 3
+    assert os.path.exists(transcript.spill_path)
+    assert transcript.questions() == [f"Q{i}" for i in range(6)]
+    assert transcript.answered_pairs()[0] == ("Q0", "A0")
+    assert transcript.feedbacks()[-1] == "F4"
+
+    transcript.clear()
+    assert len(transcript) == 0
+    assert not os.path.exists(transcript.spill_path)
+
+
+def test_persona_feedbacks_survive_spill(spill_dir):
+    transcript = Transcript("personas", window=1)
+    transcript.add_question("Q0")
+    transcript.answer_current("A0", "F-mentor", {"Mentor": "F-mentor", "HR Professional": "F-hr"})
+    _answered(transcript, 2)
+
+    first = transcript.turns()[0]
+    assert first.feedback_for("HR Professional") == "F-hr"
+    assert first.feedback_for("Hiring Manager") == "F-mentor"
+    assert transcript.turns()[1].feedbacks is None
+
+
+def test_answer_without_open_question_fails(spill_dir):
+    transcript = Transcript("no-open")
+    with pytest.raises(ValueError):
+        transcript.answer_current("A", "F")
+
+
+def test_idle_sweep_keeps_open_question(spill_dir):
+    transcript = Transcript("idle-test")
+    _answered(transcript, 3)
+    transcript.add_question("Q3")
+    transcript.last_access -= 3600
+
+    assert sweep_idle_transcripts(ttl_seconds=60) >= 1
+    assert transcript._turns[0].question == "Q3"
+    assert transcript.answers() == ["A0", "A1", "A2"]
+
+
+def test_clear_turn_widgets():
+    st.session_state["answer_0"] = "old"
+    st.session_state["submit_0"] = True
+    st.session_state["answer_1"] = "current"
+    st.session_state["job_title"] = "Engineer"
+
+    clear_turn_widgets(keep_index=1)
+
+    assert "answer_0" not in st.session_state
+    assert "submit_0" not in st.session_state
+    assert st.session_state["answer_1"] == "current"
+    assert st.session_state["job_title"] == "Engineer"
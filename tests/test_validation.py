@@ -0,0 +1,52 @@
+import pytest  # noqa: F401
+import streamlit as st
+from modules import validation
+from modules.interview_logic import take_prefetched_question
+from modules.validation import (
+    validate_job_title_and_generate_question,
+    validate_job_title_for_start,
+    validate_job_title_with_clarification,
+)
+
+
+def test_two_call_validation():
+    assert validate_job_title_with_clarification("Software Engineer") == (True, None)
+    valid, message = validate_job_title_with_clarification("Dragon Tamer")
+    assert not valid and message.startswith("Clarification needed")
+
+
+def test_combined_validation_returns_question():
+    valid, message, question = validate_job_title_and_generate_question("Nurse", "Behavioral", "Easy")
+    assert valid and message is None
+    assert "Nurse" in question
+
+
+def test_combined_validation_needs_clarification():
+    valid, message, question = validate_job_title_and_generate_question("Dragon Tamer", "Behavioral", "Easy")
+    assert not valid
+    assert message.startswith("Clarification needed")
+    assert question is None
+
+
+def test_combined_start_stores_first_question(monkeypatch, offline_llm):
+    monkeypatch.setattr(validation, "VALIDATION_MODE", "combined")
+    st.session_state.pop("prefetched_question", None)
+    calls = []
+    original_create = offline_llm.create
+    monkeypatch.setattr(offline_llm, "create", lambda **kw: calls.append(kw) or original_create(**kw))
+
+    assert validate_job_title_for_start("Perfumer", "Technical", "Hard") == (True, None)
+
+    st.session_state.job_title = "Perfumer"
+    st.session_state.question_type = "Technical"
+    st.session_state.difficulty = "Hard"
+    assert "Perfumer" in take_prefetched_question()
+    assert len(calls) == 1
+
+
+def test_known_title_skips_llm(monkeypatch, offline_llm):
+    calls = []
+    monkeypatch.setattr(offline_llm, "create", lambda **kw: calls.append(kw))
+
+    assert validate_job_title_with_clarification("Senior Sofware Engineer") == (True, None)
+    assert calls == []